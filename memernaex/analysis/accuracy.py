@@ -0,0 +1,147 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+from memernaex.analysis.structure import Pairs, Structure
+from memernaex.analysis.workqueue import WorkQueue
+
+# Structures per work queue task. Fixed, so an interrupted run resubmits the same tasks.
+_QUEUE_BATCH = 5000
+
+
+@dataclass(kw_only=True)
+class AccuracyScores:
+    sensitivity: npt.NDArray[np.float64]
+    ppv: npt.NDArray[np.float64]
+    f1: npt.NDArray[np.float64]
+
+
+def _pair_keys(
+    pairs: list[Pairs],
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.int64], int]:
+    """Returns i, j (i < j) of every pair over all structures concatenated, and which structure
+    each belongs to."""
+    if not pairs:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, 2
+    lengths = np.array([len(p) for p in pairs], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    flat = np.concatenate(pairs).astype(np.int64)
+    owner = np.repeat(np.arange(len(pairs)), lengths)
+    i = np.flatnonzero(flat > np.arange(len(flat)) - np.repeat(offsets, lengths))
+    j = flat[i] + offsets[owner[i]]
+    return i, j, owner[i], int(lengths.sum()) + 2
+
+
+def _matched(
+    i: npt.NDArray[np.int64],
+    j: npt.NDArray[np.int64],
+    other: npt.NDArray[np.int64],
+    width: int,
+    slip: bool,
+) -> npt.NDArray[np.bool_]:
+    # Pair keys are i * width + j. Pairs never span two structures, so shifting a key by one
+    # base can only match a pair of the same structure.
+    shifts = [(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)] if slip else [(0, 0)]
+    found = np.zeros(len(i), dtype=bool)
+    for di, dj in shifts:
+        found |= np.isin((i + di) * width + j + dj, other, assume_unique=True)
+    return found
+
+
+def score_pairs(ref: list[Pairs], pred: list[Pairs], *, slip: bool = False) -> AccuracyScores:
+    """Scores predicted against reference pair arrays for all structures at once.
+
+    With `slip`, a pair also counts if it matches with one end shifted by one base. When a
+    structure has no reference (or predicted) pairs, its sensitivity (or PPV) is 1."""
+    ri, rj, rowner, width = _pair_keys(ref)
+    pi, pj, powner, _ = _pair_keys(pred)
+    ref_keys = np.sort(ri * width + rj)
+    pred_keys = np.sort(pi * width + pj)
+
+    n = len(ref)
+    ref_found = np.bincount(rowner, _matched(ri, rj, pred_keys, width, slip), minlength=n)
+    pred_found = np.bincount(powner, _matched(pi, pj, ref_keys, width, slip), minlength=n)
+    ref_count = np.bincount(rowner, minlength=n)
+    pred_count = np.bincount(powner, minlength=n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sens = np.where(ref_count > 0, ref_found / ref_count, 1.0)
+        ppv = np.where(pred_count > 0, pred_found / pred_count, 1.0)
+        f1 = np.where(sens + ppv > 0, 2 * sens * ppv / (sens + ppv), 0.0)
+    return AccuracyScores(sensitivity=sens, ppv=ppv, f1=f1)
+
+
+def _score_chunk(pairs: list[tuple[Pairs, Pairs]], slip: bool) -> AccuracyScores:
+    return score_pairs([r for r, _ in pairs], [p for _, p in pairs], slip=slip)
+
+
+def score_structures(
+    refs: list[Structure],
+    preds: list[Structure],
+    *,
+    slip: bool = False,
+    jobs: int = 1,
+    queue: WorkQueue | None = None,
+) -> AccuracyScores:
+    """Scores matched lists of structures, split into chunks across `jobs` processes, or
+    into fixed-size batches run by the workers of `queue`."""
+    for ref, pred in zip(refs, preds, strict=True):
+        if len(ref.pairs) != len(pred.pairs):
+            raise ValueError(
+                f"Predicted length {len(pred.pairs)} does not match reference length "
+                f"{len(ref.pairs)} for {ref.name}."
+            )
+    items = [(r.pairs, p.pairs) for r, p in zip(refs, preds, strict=True)]
+    if len(items) < 2 or (jobs == 1 and queue is None):
+        return _score_chunk(items, slip)
+    if queue is not None:
+        chunks = [items[k : k + _QUEUE_BATCH] for k in range(0, len(items), _QUEUE_BATCH)]
+        results = queue.map(f"{__name__}:_score_chunk", [(c, slip) for c in chunks])
+    else:
+        size = -(-len(items) // (jobs * 4))
+        chunks = [items[k : k + size] for k in range(0, len(items), size)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(partial(_score_chunk, slip=slip), chunks))
+    return AccuracyScores(
+        sensitivity=np.concatenate([r.sensitivity for r in results]),
+        ppv=np.concatenate([r.ppv for r in results]),
+        f1=np.concatenate([r.f1 for r in results]),
+    )
+
+
+def family_of(name: str) -> str:
+    # Dataset names such as ArchiveII's are prefixed by their family.
+    return name.split("_", 1)[0]
+
+
+def accuracy_frame(
+    refs: list[Structure],
+    scores: AccuracyScores,
+    *,
+    dataset: str,
+    program: str,
+    families: dict[str, str] | None = None,
+    real_sec: list[float] | None = None,
+    maxrss_bytes: list[int] | None = None,
+) -> pl.DataFrame:
+    """Builds rows in the schema FoldAccuracyPlotter reads. Timings are null if not given."""
+    families = families or {}
+    return pl.DataFrame(
+        {
+            "dataset": [dataset] * len(refs),
+            "program": [program] * len(refs),
+            "name": [r.name for r in refs],
+            "family": [families.get(r.name, family_of(r.name)) for r in refs],
+            "length": [len(r.seq) for r in refs],
+            "sensitivity": scores.sensitivity,
+            "ppv": scores.ppv,
+            "f1": scores.f1,
+            "real_sec": real_sec,
+            "maxrss_bytes": maxrss_bytes,
+        },
+        schema_overrides={"real_sec": pl.Float64, "maxrss_bytes": pl.Int64},
+    )
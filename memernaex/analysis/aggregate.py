@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+
+import polars as pl
+
+from memernaex.profiling import span
+
+AGGREGATIONS = ("mean", "median", "trimmed", "min", "mad")
+
+# Scales the MAD to the standard deviation of a normal distribution.
+_MAD_SCALE = 1.4826
+
+
+@dataclass(frozen=True, kw_only=True)
+class Aggregation:
+    """How to collapse repeats of a cell into one value.
+
+    trimmed drops `trim` of the values from each tail before taking the mean. mad takes the
+    mean of values within `mad_threshold` scaled MADs of the median. Cells whose coefficient
+    of variation exceeds `cv_threshold` in any value are flagged as noisy.
+    """
+
+    method: str = "mean"
+    trim: float = 0.1
+    mad_threshold: float = 3.5
+    cv_threshold: float = 0.1
+
+
+def aggregate_expr(col: str, agg: Aggregation) -> pl.Expr:
+    """Aggregation expression over the values of `col` within a group."""
+    x = pl.col(col)
+    match agg.method:
+        case "mean":
+            expr = x.mean()
+        case "median":
+            expr = x.median()
+        case "min":
+            expr = x.min()
+        case "trimmed":
+            k = (pl.len() * agg.trim).floor().cast(pl.Int64)
+            expr = x.sort().slice(k, pl.len().cast(pl.Int64) - 2 * k).mean()
+        case "mad":
+            dev = (x - x.median()).abs()
+            expr = x.filter(dev <= agg.mad_threshold * _MAD_SCALE * dev.median()).mean()
+        case _:
+            raise ValueError(f"Unknown aggregation: {agg.method}")
+    return expr.alias(col)
+
+
+def cv_expr(col: str) -> pl.Expr:
+    # One repeat has no spread. Engines disagree on its std, so it is null explicitly.
+    std = pl.when(pl.col(col).count() > 1).then(pl.col(col).std())
+    return (std / pl.col(col).mean().abs()).fill_nan(0.0).alias(f"{col}_cv")
+
+
+def aggregate_lazy(
+    lf: pl.LazyFrame, keys: list[str], values: list[str], agg: Aggregation
+) -> pl.LazyFrame:
+    """The query of aggregate, which the streaming engine can run over scanned input while
+    holding only per cell state."""
+    return (
+        lf.group_by(keys)
+        .agg(
+            *(aggregate_expr(v, agg) for v in values),
+            *(cv_expr(v) for v in values),
+            pl.len().alias("runs"),
+        )
+        .with_columns(
+            pl.any_horizontal(pl.col(f"{v}_cv") > agg.cv_threshold for v in values)
+            .fill_null(False)
+            .alias("noisy")
+        )
+    )
+
+
+def aggregate(
+    df: pl.DataFrame, keys: list[str], values: list[str], agg: Aggregation
+) -> pl.DataFrame:
+    """Collapses repeats per cell of `keys` in one pass. Adds the raw repeat count `runs`, a
+    `<value>_cv` column per value and a `noisy` flag for cells worth re-running."""
+    with span("aggregate", cat="aggregate", rows=len(df), method=agg.method):
+        return aggregate_lazy(df.lazy(), keys, values, agg).collect()
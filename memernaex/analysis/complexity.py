@@ -1,20 +1,18 @@
 import logging
 import re
 from collections.abc import Callable
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, cast
 
 import lmfit
 import numpy as np
 import numpy.typing as npt
 import polars as pl
-from matplotlib import pyplot as plt
-from matplotlib.figure import Figure
-from matplotlib.lines import Line2D
-from matplotlib.patches import Patch
-from mpl_toolkits.mplot3d import Axes3D
 
 from memernaex.analysis.data import Var
-from memernaex.plot.util import set_up_figure_2d, set_up_figure_3d
+from memernaex.profiling import span, traced
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
 log = logging.getLogger(__name__)
 
@@ -136,13 +134,23 @@ class ComplexityFitter:
                     params[param_name].set(value=1.0)
 
             try:
-                results[name] = model.fit(y_data, params, x=x_data)
+                with span(f"fit {name}", cat="fit", rows=len(y_data)):
+                    results[name] = model.fit(y_data, params, x=x_data)
             except Exception:
                 log.exception(f"Error fitting model {name}")
                 continue
         return results
 
-    def _plot2d(self, result: lmfit.model.ModelResult) -> Figure:
+    def _plot2d(self, result: lmfit.model.ModelResult) -> "Figure":
+        # Plotting imports are deferred so fitting alone, e.g. in adaptive benchmarks, does not
+        # pay for them.
+        from matplotlib import pyplot as plt  # noqa: PLC0415
+        from matplotlib.lines import Line2D  # noqa: PLC0415
+        from matplotlib.patches import Patch  # noqa: PLC0415
+        from mpl_toolkits.mplot3d import Axes3D  # noqa: PLC0415
+
+        from memernaex.plot.util import set_up_figure_3d  # noqa: PLC0415
+
         x0_data = self.df[self.xs[0].id].cast(pl.Float64).to_numpy()
         x1_data = self.df[self.xs[1].id].cast(pl.Float64).to_numpy()
         y_data = self.df[self.y.id].cast(pl.Float64).to_numpy()
@@ -176,9 +184,20 @@ class ComplexityFitter:
         set_up_figure_3d(f, varz=(self.xs[0], self.xs[1], self.y))
         return f
 
-    def _plot1d(self, result: lmfit.model.ModelResult) -> Figure:
+    def _plot1d(self, result: lmfit.model.ModelResult) -> "Figure":
+        from matplotlib import pyplot as plt  # noqa: PLC0415
+
+        from memernaex.plot.util import set_up_figure_2d  # noqa: PLC0415
+
+        x_data = self.df[self.xs[0].id].cast(pl.Float64).to_numpy()
+        y_data = self.df[self.y.id].cast(pl.Float64).to_numpy()
+        x_fit = np.sort(x_data)
+        # The model takes a tuple of variables, which ModelResult.plot does not support.
+        fit_y = np.asarray(result.eval(result.params, x=(x_fit,)), dtype=np.float64)
+
         f, ax = plt.subplots(1)
-        result.plot()
+        ax.scatter(x_data, y_data, color="red", label="Data")
+        ax.plot(x_fit, np.broadcast_to(fit_y, x_fit.shape), color="blue", label="Fit")
         set_up_figure_2d(f, varz=(self.xs[0], self.y))
         return f
 
@@ -197,7 +216,8 @@ class ComplexityFitter:
             raise ValueError("Only 1D and 2D models are supported.")
         return self._best_model(self.results)
 
-    def plot(self, model_name: str) -> Figure:
+    @traced("figure")
+    def plot(self, model_name: str) -> "Figure":
         model = self.results[model_name]
         if len(self.xs) == 1:
             return self._plot1d(model)
@@ -1,6 +1,6 @@
 import inspect
 from collections.abc import Iterable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from types import ModuleType
 from typing import Any
@@ -8,14 +8,26 @@ from typing import Any
 import polars as pl
 from matplotlib import ticker
 
+from memernaex.profiling import span
+
 
 @dataclass(frozen=True, eq=True, order=True, kw_only=True)
 class Var:
     id: str
     name: str
     dtype: type[pl.DataType]
-    derived: bool = False
     formatter: ticker.FuncFormatter | None = None
+    # Derived vars are computed from other columns by this expression instead of being read.
+    expr: pl.Expr | None = field(default=None, compare=False)
+
+    @property
+    def derived(self) -> bool:
+        return self.expr is not None
+
+    @property
+    def deps(self) -> tuple[str, ...]:
+        """Columns the defining expression reads, which may themselves be derived vars."""
+        return tuple(self.expr.meta.root_names()) if self.expr is not None else ()
 
 
 def _get_vars(source: type | ModuleType | Iterable[Any]) -> list[Var]:
@@ -24,11 +36,69 @@ def _get_vars(source: type | ModuleType | Iterable[Any]) -> list[Var]:
     return [v for v in source if isinstance(v, Var)]
 
 
-def read_var_data(var_source: type | ModuleType | Iterable[Var], path: Path) -> pl.DataFrame:
-    df = pl.read_ndjson(path)
+def find_var(var_source: type | ModuleType | Iterable[Var], var_id: str) -> Var | None:
+    return next((v for v in _get_vars(var_source) if v.id == var_id), None)
+
+
+def _cast_vars(lf: pl.LazyFrame, var_source: type | ModuleType | Iterable[Var]) -> pl.LazyFrame:
     varz = _get_vars(var_source)
-    for var in varz:
-        if var.derived:
-            continue
-        df = df.with_columns(pl.col(var.id).cast(var.dtype, strict=True).alias(var.id))
+    return lf.with_columns(
+        pl.col(var.id).cast(var.dtype, strict=True).alias(var.id) for var in varz if not var.derived
+    )
+
+
+def scan_var_data(var_source: type | ModuleType | Iterable[Var], path: Path) -> pl.LazyFrame:
+    return _cast_vars(pl.scan_ndjson(path), var_source)
+
+
+def parse_var_data(var_source: type | ModuleType | Iterable[Var], data: bytes) -> pl.DataFrame:
+    """Like read_var_data, for NDJSON already in memory."""
+    return _cast_vars(pl.read_ndjson(data).lazy(), var_source).collect()
+
+
+def empty_var_data(var_source: type | ModuleType | Iterable[Var]) -> pl.DataFrame:
+    """Like parse_var_data, for no records."""
+    return pl.DataFrame(schema={v.id: v.dtype for v in _get_vars(var_source) if not v.derived})
+
+
+def collect(lf: pl.LazyFrame, *, streaming: bool = False) -> pl.DataFrame:
+    """Runs a query. The streaming engine works through the input in batches, so memory use
+    follows the query's state, such as one entry per group, rather than its input."""
+    return lf.collect(engine="streaming" if streaming else "auto")
+
+
+def read_var_data(var_source: type | ModuleType | Iterable[Var], path: Path) -> pl.DataFrame:
+    with span("read_var_data", cat="io", path=str(path)) as s:
+        df = scan_var_data(var_source, path).collect()
+        s.rows = len(df)
     return df
+
+
+def with_vars(
+    lf: pl.LazyFrame, var_source: type | ModuleType | Iterable[Var], ids: Iterable[str]
+) -> pl.LazyFrame:
+    """Adds the derived vars in `ids`, and any derived vars they depend on, to the query plan.
+    Columns already in `lf` are left alone, so only what is asked for is computed."""
+    varz = [v for v in _get_vars(var_source) if v.expr is not None]
+    exprs = {v.id: v.expr.cast(v.dtype).alias(v.id) for v in varz if v.expr is not None}
+    deps = {v.id: v.deps for v in varz}
+    present = set(lf.collect_schema().names())
+    levels: dict[str, int] = {}
+
+    def level(var_id: str, path: tuple[str, ...]) -> int:
+        if var_id in present or var_id not in exprs:
+            return -1
+        if var_id in path:
+            raise ValueError(
+                f"Derived var {var_id} depends on itself: {' -> '.join((*path, var_id))}."
+            )
+        if var_id not in levels:
+            levels[var_id] = 1 + max((level(d, (*path, var_id)) for d in deps[var_id]), default=-1)
+        return levels[var_id]
+
+    for var_id in ids:
+        level(var_id, ())
+    # Vars on the same level only depend on earlier levels, so each level is one projection.
+    for lvl in range(max(levels.values(), default=-1) + 1):
+        lf = lf.with_columns(exprs[var_id] for var_id, var_lvl in levels.items() if var_lvl == lvl)
+    return lf
@@ -0,0 +1,160 @@
+import math
+import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+_READ_BLOCK_BYTES = 1 << 22
+# Target number of matrix elements processed per block of rows.
+_BLOCK_ELEMENTS = 1 << 22
+
+
+def _parse_floats(tokens: list[str], dtype: type[np.floating], path: Path) -> np.ndarray:
+    try:
+        return np.array(tokens, dtype=dtype)
+    except ValueError as exc:
+        raise ValueError(f"Invalid numeric value in {path}.") from exc
+
+
+def iter_float_chunks(
+    path: Path, dtype: type[np.floating], chunk_size: int
+) -> Iterator[np.ndarray]:
+    """Yields values in chunks of `chunk_size`; only the last chunk may be shorter."""
+    tokens: list[str] = []
+    tail = ""
+    with path.open() as f:
+        while block := f.read(_READ_BLOCK_BYTES):
+            parts = (tail + block).split()
+            # The last token may continue into the next block.
+            tail = parts.pop() if parts and not block[-1].isspace() else ""
+            tokens.extend(parts)
+            while len(tokens) >= chunk_size:
+                yield _parse_floats(tokens[:chunk_size], dtype, path)
+                del tokens[:chunk_size]
+    if tail:
+        tokens.append(tail)
+    if tokens:
+        yield _parse_floats(tokens, dtype, path)
+
+
+def load_square_matrix(path: Path, scratch_dir: Path, chunk_size: int = 1 << 20) -> np.ndarray:
+    """Memory maps a square matrix from a .npy file, or from a whitespace separated text file
+    which is first streamed into a raw float64 file in `scratch_dir`."""
+    if path.suffix == ".npy":
+        matrix: np.ndarray = np.load(path, mmap_mode="r")
+    else:
+        count = 0
+        with tempfile.NamedTemporaryFile(suffix=".f64", dir=scratch_dir, delete=False) as f:
+            for chunk in iter_float_chunks(path, np.float64, chunk_size):
+                chunk.tofile(f)
+                count += len(chunk)
+        n = math.isqrt(count)
+        if count == 0 or n * n != count:
+            raise ValueError(f"{path} has {count} values, which is not a square matrix.")
+        matrix = np.memmap(f.name, dtype=np.float64, mode="r", shape=(n, n))
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError(f"{path} is not a square matrix: {matrix.shape}.")
+    return matrix
+
+
+@dataclass(kw_only=True)
+class MatrixDiffReport:
+    n: int
+    rms: float
+    largest_diff: float
+    largest_rel_diff: float
+    # Worst positions with i <= j, sorted by descending absolute difference.
+    top_i: npt.NDArray[np.int64]
+    top_j: npt.NDArray[np.int64]
+    top_p0: npt.NDArray[np.float64]
+    top_p1: npt.NDArray[np.float64]
+    # Per row i, over all j.
+    row_rms: npt.NDArray[np.float64]
+    row_max: npt.NDArray[np.float64]
+    # Per pair span j - i, over i <= j.
+    span_rms: npt.NDArray[np.float64]
+    span_max: npt.NDArray[np.float64]
+    # Max absolute difference pooled into `heatmap_factor` sized square cells.
+    heatmap: npt.NDArray[np.float64]
+    heatmap_factor: int
+
+
+def compare_matrices(
+    m0: np.ndarray, m1: np.ndarray, *, top_k: int = 10, heatmap_size: int = 1024
+) -> MatrixDiffReport:
+    if m0.shape != m1.shape:
+        raise ValueError(f"Matrix shapes do not match: {m0.shape} vs {m1.shape}.")
+    n = m0.shape[0]
+    factor = math.ceil(n / heatmap_size)
+    pooled_n = math.ceil(n / factor)
+    # Blocks hold whole heatmap cells so pooling never straddles blocks.
+    block_rows = max(factor, _BLOCK_ELEMENTS // n // factor * factor)
+
+    cols = np.arange(n)
+    sum_sq = 0.0
+    largest_rel_diff = 0.0
+    row_sq = np.zeros(n)
+    row_max = np.zeros(n)
+    span_sq = np.zeros(n)
+    span_max = np.zeros(n)
+    heatmap = np.zeros((pooled_n, pooled_n))
+    top_vals = np.empty(0)
+    top_flat = np.empty(0, dtype=np.int64)
+
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        b0 = np.asarray(m0[start:stop], dtype=np.float64)
+        b1 = np.asarray(m1[start:stop], dtype=np.float64)
+        diff = np.abs(b0 - b1)
+        sq = diff * diff
+
+        sum_sq += float(sq.sum())
+        denom = np.maximum(np.abs(b0), np.abs(b1))
+        rel = np.divide(diff, denom, out=np.zeros_like(diff), where=denom > 0)
+        largest_rel_diff = max(largest_rel_diff, float(rel.max()))
+        row_sq[start:stop] = sq.sum(axis=1)
+        row_max[start:stop] = diff.max(axis=1)
+
+        span = cols[None, :] - np.arange(start, stop)[:, None]
+        upper = span >= 0
+        span_sq += np.bincount(span[upper], weights=sq[upper], minlength=n)
+        np.maximum.at(span_max, span[upper], diff[upper])
+
+        masked = np.where(upper, diff, -1.0).ravel()
+        k = min(top_k, masked.size)
+        cand = np.argpartition(masked, -k)[-k:]
+        top_vals = np.concatenate([top_vals, masked[cand]])
+        top_flat = np.concatenate([top_flat, cand + start * n])
+        if len(top_vals) > top_k:
+            keep = np.argpartition(top_vals, -top_k)[-top_k:]
+            top_vals, top_flat = top_vals[keep], top_flat[keep]
+
+        rows_pad = math.ceil((stop - start) / factor) * factor
+        padded = np.zeros((rows_pad, pooled_n * factor))
+        padded[: stop - start, :n] = diff
+        pooled = padded.reshape(rows_pad // factor, factor, pooled_n, factor).max(axis=(1, 3))
+        heatmap[start // factor : start // factor + len(pooled)] = pooled
+
+    order = np.argsort(-top_vals, kind="stable")
+    top_flat = top_flat[order][top_vals[order] >= 0]
+    top_i, top_j = np.divmod(top_flat, n)
+    span_count = n - cols
+    return MatrixDiffReport(
+        n=n,
+        rms=math.sqrt(sum_sq / (n * n)),
+        largest_diff=float(row_max.max()),
+        largest_rel_diff=largest_rel_diff,
+        top_i=top_i,
+        top_j=top_j,
+        top_p0=np.asarray(m0[top_i, top_j], dtype=np.float64),
+        top_p1=np.asarray(m1[top_i, top_j], dtype=np.float64),
+        row_rms=np.sqrt(row_sq / n),
+        row_max=row_max,
+        span_rms=np.sqrt(span_sq / span_count),
+        span_max=span_max,
+        heatmap=heatmap,
+        heatmap_factor=factor,
+    )
@@ -0,0 +1,514 @@
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import tomllib
+from collections import Counter
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import polars as pl
+from matplotlib.figure import Figure
+
+from memernaex.analysis.aggregate import AGGREGATIONS, Aggregation, aggregate
+from memernaex.analysis.complexity import ComplexityFitter
+from memernaex.analysis.data import Var, find_var, scan_var_data, with_vars
+from memernaex.analysis.workqueue import WorkQueue
+from memernaex.plot.plots import plot_mean_log_quantity, plot_mean_quantity
+from memernaex.plot.util import save_figure, set_style
+from memernaex.profiling import span
+
+# Var sources by schema name. Other sources can be given as module or module:attr.
+VAR_SOURCES = {
+    "fold-perf": "memernaex.experiments.fold.perf_plotter:FoldPerfPlotter",
+    "fold-accuracy": "memernaex.experiments.fold.accuracy_plotter:FoldAccuracyPlotter",
+    "subopt": "memernaex.experiments.subopt.perf_plotter",
+}
+FIGURE_KINDS = ("mean", "log")
+
+_AGGREGATION_PARAMS = ("method", "trim", "mad_threshold", "cv_threshold")
+# Required and optional parameters of each op, besides input, output and cache.
+_PARAMS: dict[str, tuple[set[str], set[str]]] = {
+    "read": ({"path", "vars"}, {"derive"}),
+    "filter": ({"expr"}, set()),
+    "aggregate": ({"keys", "values"}, set(_AGGREGATION_PARAMS)),
+    "fit": ({"x", "y"}, {"group_by", "plot"}),
+    "figure": ({"group", "x", "y"}, {"kind", "split_by", "aggregation"}),
+}
+# Filters are cheaper to recompute than to write out, so they are not cached unless asked.
+_CACHED_BY_DEFAULT = {"read", "aggregate", "fit", "figure"}
+# Ops that write files named after the step, so the step name is part of their cache key.
+_FILE_OPS = {"fit", "figure"}
+# Bump when what a step computes changes, so older cache entries are not reused.
+_CACHE_VERSION = 1
+
+# pyplot has global state, so figures are drawn one at a time while other steps run.
+_PLOT_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True, kw_only=True)
+class Step:
+    name: str
+    op: str
+    input: str | None
+    params: dict[str, Any]
+    # CSV file in the output directory to write the step's frame to.
+    output: str | None = None
+    cache: bool = True
+
+
+@dataclass(frozen=True, kw_only=True)
+class _Result:
+    df: pl.DataFrame | None = None
+    files: tuple[Path, ...] = ()
+
+
+@dataclass(frozen=True, kw_only=True)
+class _StepContext:
+    step: Step
+    df: pl.DataFrame
+    var_source: type | ModuleType
+    # How workers find the var source, as vars do not pickle.
+    var_spec: str
+    file_dir: Path
+    queue: WorkQueue | None = None
+
+
+def _load_var_source(spec: str) -> type | ModuleType:
+    module, _, attr = VAR_SOURCES.get(spec, spec).partition(":")
+    source = importlib.import_module(module)
+    return getattr(source, attr) if attr else source
+
+
+def _as_list(value: str | list[str]) -> list[str]:
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _var(var_source: type | ModuleType, var_id: str) -> Var:
+    # Columns added by steps, like runs from aggregate, have no declared var.
+    return find_var(var_source, var_id) or Var(id=var_id, name=var_id, dtype=pl.Float64)
+
+
+def _columns(ctx: _StepContext, ids: list[str]) -> pl.DataFrame:
+    """The input frame with any derived vars in `ids` that it lacks computed."""
+    missing = [i for i in ids if i not in ctx.df.columns]
+    if not missing:
+        return ctx.df
+    return with_vars(ctx.df.lazy(), ctx.var_source, missing).collect()
+
+
+def _split(df: pl.DataFrame, by: list[str]) -> list[tuple[tuple[Any, ...], pl.DataFrame]]:
+    if not by:
+        return [((), df)]
+    return list(df.sort(by).partition_by(by, as_dict=True, maintain_order=True).items())
+
+
+def _file_name(step: Step, group: tuple[Any, ...]) -> str:
+    return "_".join([step.name, *(str(v) for v in group)]) + ".png"
+
+
+def _read(ctx: _StepContext) -> _Result:
+    params = ctx.step.params
+    with span("read", cat="io", path=params["path"]) as s:
+        lf = scan_var_data(ctx.var_source, Path(params["path"]))
+        df = with_vars(lf, ctx.var_source, params.get("derive", [])).collect()
+        s.rows = len(df)
+    return _Result(df=df)
+
+
+def _filter(ctx: _StepContext) -> _Result:
+    expr = pl.sql_expr(ctx.step.params["expr"])
+    return _Result(df=_columns(ctx, expr.meta.root_names()).filter(expr))
+
+
+def _aggregate(ctx: _StepContext) -> _Result:
+    params = ctx.step.params
+    keys, values = params["keys"], params["values"]
+    agg = Aggregation(**{k: params[k] for k in _AGGREGATION_PARAMS if k in params})
+    return _Result(df=aggregate(_columns(ctx, [*keys, *values]), keys, values, agg))
+
+
+def _png(draw: Callable[[], Figure]) -> bytes:
+    with _PLOT_LOCK, tempfile.TemporaryDirectory() as tmp:
+        set_style()
+        path = Path(tmp) / "figure.png"
+        save_figure(draw(), path)
+        return path.read_bytes()
+
+
+def _fit_group(
+    var_spec: str, df: pl.DataFrame, xs: list[str], y: str, plot: bool
+) -> tuple[dict[str, Any], bytes | None]:
+    source = _load_var_source(var_spec)
+    fitter = ComplexityFitter(df=df, xs=tuple(_var(source, x) for x in xs), y=_var(source, y))
+    model, result = fitter.fit()
+    row = {
+        "model": model,
+        "rows": len(df),
+        "bic": result.bic,
+        "aic": result.aic,
+        "redchi": result.redchi,
+        "params": json.dumps({k: p.value for k, p in result.params.items()}),
+    }
+    return row, _png(lambda: fitter.plot(model)) if plot else None
+
+
+def _figure_split(var_spec: str, df: pl.DataFrame, params: dict[str, Any]) -> bytes:
+    source = _load_var_source(var_spec)
+    group, x = _var(source, params["group"]), _var(source, params["x"])
+    y_vars = tuple(_var(source, y) for y in _as_list(params["y"]))
+    agg = Aggregation(method=params.get("aggregation", "mean"))
+    if params.get("kind", "mean") == "mean":
+        return _png(lambda: plot_mean_quantity(df, group, x, y_vars, aggregation=agg))
+    return _png(lambda: plot_mean_log_quantity(df, group, x, y_vars[0], aggregation=agg))
+
+
+def _map(ctx: _StepContext, fn: Callable[..., Any], args: Sequence[tuple[Any, ...]]) -> list[Any]:
+    """Runs a fit or figure per group, here or, with a work queue, on any of its workers."""
+    if ctx.queue is None:
+        return [fn(*a) for a in args]
+    return ctx.queue.map(f"{__name__}:{fn.__name__}", args)
+
+
+def _fit(ctx: _StepContext) -> _Result:
+    params = ctx.step.params
+    xs, group_by = _as_list(params["x"]), params.get("group_by", [])
+    plot = params.get("plot", False)
+    df = _columns(ctx, [*xs, params["y"], *group_by])
+    groups = _split(df, group_by)
+    fits = _map(
+        ctx, _fit_group, [(ctx.var_spec, group_df, xs, params["y"], plot) for _, group_df in groups]
+    )
+    rows = []
+    files = []
+    for (group, _), (row, png) in zip(groups, fits, strict=True):
+        rows.append({**dict(zip(group_by, group, strict=True)), **row})
+        if png is not None:
+            path = ctx.file_dir / _file_name(ctx.step, group)
+            path.write_bytes(png)
+            files.append(path)
+    return _Result(df=pl.DataFrame(rows), files=tuple(files))
+
+
+def _figure(ctx: _StepContext) -> _Result:
+    params = ctx.step.params
+    split_by = params.get("split_by", [])
+    df = _columns(ctx, [params["group"], params["x"], *_as_list(params["y"]), *split_by])
+    splits = _split(df, split_by)
+    pngs = _map(ctx, _figure_split, [(ctx.var_spec, split_df, params) for _, split_df in splits])
+    files = []
+    for (split, _), png in zip(splits, pngs, strict=True):
+        path = ctx.file_dir / _file_name(ctx.step, split)
+        path.write_bytes(png)
+        files.append(path)
+    return _Result(files=tuple(files))
+
+
+_OPS = {"read": _read, "filter": _filter, "aggregate": _aggregate, "fit": _fit, "figure": _figure}
+
+
+def _parse_step(name: str, op: str, table: dict[str, Any], base_dir: Path) -> Step:
+    if op not in _PARAMS:
+        raise ValueError(f"Step {name} has unknown op {op}, expected one of {list(_PARAMS)}.")
+    required, optional = _PARAMS[op]
+    params = {k: v for k, v in table.items() if k not in {"op", "input", "output", "cache"}}
+    if unknown := set(params) - required - optional:
+        raise ValueError(f"Step {name} has unknown parameters {sorted(unknown)}.")
+    if missing := required - set(params):
+        raise ValueError(f"Step {name} is missing parameters {sorted(missing)}.")
+    if op != "read" and "input" not in table:
+        raise ValueError(f"Step {name} needs an input.")
+    if op == "read":
+        params["path"] = str((base_dir / params["path"]).resolve())
+    if op == "aggregate" and params.get("method", "mean") not in AGGREGATIONS:
+        raise ValueError(f"Step {name} has unknown method, expected one of {AGGREGATIONS}.")
+    if op == "figure":
+        kind = params.get("kind", "mean")
+        if kind not in FIGURE_KINDS:
+            raise ValueError(
+                f"Step {name} has unknown kind {kind}, expected one of {FIGURE_KINDS}."
+            )
+        if kind == "log" and len(_as_list(params["y"])) != 1:
+            raise ValueError(f"Step {name} plots one y for the log kind.")
+        if params.get("aggregation", "mean") not in AGGREGATIONS:
+            raise ValueError(
+                f"Step {name} has unknown aggregation, expected one of {AGGREGATIONS}."
+            )
+    if op == "fit" and len(_as_list(params["x"])) > 2:
+        raise ValueError(f"Step {name} fits at most two x variables.")
+    return Step(
+        name=name,
+        op=op,
+        input=table.get("input"),
+        params=params,
+        output=table.get("output"),
+        cache=table.get("cache", op in _CACHED_BY_DEFAULT),
+    )
+
+
+@dataclass(kw_only=True)
+class _Schedule:
+    """Which steps run and which are loaded from the cache, and how many pending steps still
+    read each step's result."""
+
+    modes: dict[str, str] = field(default_factory=dict)
+    readers: Counter[str] = field(default_factory=Counter)
+
+
+class Pipeline:
+    """Runs an analysis declared in a TOML file as a DAG of steps:
+
+        output_dir = "report"
+        cache_dir = ".analysis-cache"
+
+        [inputs.fold]
+        path = "fold.ndjson"
+        vars = "fold-perf"
+
+        [steps.random]
+        op = "filter"
+        input = "fold"
+        expr = "dataset = 'random'"
+
+        [steps.random_time]
+        op = "figure"
+        input = "random"
+        group = "program"
+        x = "length"
+        y = "real_sec"
+
+    Inputs are read once and steps share frames by reference, which Polars never copies.
+    Independent steps run concurrently. Cacheable steps are stored under a hash of their
+    parameters and their inputs' contents, so unchanged steps are loaded instead of run, and
+    their upstream steps are not run at all. Paths are relative to the config file. With a
+    work queue, each group of a fit and each split of a figure is a task that any worker of
+    the queue can run.
+    """
+
+    steps: dict[str, Step]
+    output_dir: Path
+    cache_dir: Path | None
+    jobs: int
+    queue: WorkQueue | None
+    _keys: dict[str, str]
+    _sources: dict[str, type | ModuleType]
+    _specs: dict[str, str]
+
+    def __init__(
+        self,
+        config_path: Path,
+        *,
+        output_dir: Path | None = None,
+        cache_dir: Path | None = None,
+        use_cache: bool = True,
+        jobs: int | None = None,
+        queue: WorkQueue | None = None,
+    ) -> None:
+        with config_path.open("rb") as f:
+            config = tomllib.load(f)
+        base_dir = config_path.parent
+        if unknown := set(config) - {"output_dir", "cache_dir", "jobs", "inputs", "steps"}:
+            raise ValueError(f"Unknown config keys {sorted(unknown)}.")
+        if output_dir is None:
+            if "output_dir" not in config:
+                raise ValueError("No output_dir in the config.")
+            output_dir = base_dir / config["output_dir"]
+        if cache_dir is None and "cache_dir" in config:
+            cache_dir = base_dir / config["cache_dir"]
+        self.output_dir = output_dir
+        self.cache_dir = cache_dir if use_cache else None
+        self.jobs = jobs or config.get("jobs") or len(os.sched_getaffinity(0))
+        self.queue = queue
+
+        tables = [(name, "read", t) for name, t in config.get("inputs", {}).items()]
+        tables += [(name, t.get("op", ""), t) for name, t in config.get("steps", {}).items()]
+        self.steps = {}
+        for name, op, table in tables:
+            if name in self.steps:
+                raise ValueError(f"Step {name} is defined more than once.")
+            self.steps[name] = _parse_step(name, op, table, base_dir)
+        self._sources = {}
+        self._specs = {}
+        for name in self.steps:
+            self._source(name, ())
+        self._keys = {}
+        set_style()
+
+    def _source(self, name: str, path: tuple[str, ...]) -> type | ModuleType:
+        """The var source of the input a step descends from. Also checks the DAG."""
+        if name in path:
+            raise ValueError(f"Step {name} depends on itself: {' -> '.join((*path, name))}.")
+        if name not in self._sources:
+            step = self.steps[name]
+            if step.input is None:
+                self._specs[name] = step.params["vars"]
+                self._sources[name] = _load_var_source(step.params["vars"])
+            elif step.input not in self.steps:
+                raise ValueError(f"Step {name} has unknown input {step.input}.")
+            else:
+                self._sources[name] = self._source(step.input, (*path, name))
+                self._specs[name] = self._specs[step.input]
+        return self._sources[name]
+
+    def _digest(self, path: Path) -> str:
+        """Content hash of an input, remembered by size and modification time so unchanged
+        inputs are not read again."""
+        assert self.cache_dir is not None
+        memo_path = self.cache_dir / "inputs.json"
+        memo = json.loads(memo_path.read_text()) if memo_path.exists() else {}
+        stat = path.stat()
+        entry = memo.get(str(path))
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return str(entry["digest"])
+        with span("hash input", cat="io", path=str(path)), path.open("rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        memo[str(path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+        memo_path.write_text(json.dumps(memo, indent=2))
+        return digest
+
+    def _key(self, name: str) -> str:
+        if name not in self._keys:
+            step = self.steps[name]
+            payload: dict[str, Any] = {"version": _CACHE_VERSION, "op": step.op, **step.params}
+            if step.op == "read":
+                # Inputs are identified by content, so moving a file keeps its cache entry.
+                payload["path"] = self._digest(Path(step.params["path"]))
+            if step.op in _FILE_OPS:
+                payload["name"] = step.name
+            if step.input is not None:
+                payload["input"] = self._key(step.input)
+            self._keys[name] = hashlib.sha256(
+                json.dumps(payload, sort_keys=True).encode()
+            ).hexdigest()
+        return self._keys[name]
+
+    def _entry(self, name: str) -> Path | None:
+        if self.cache_dir is None or not self.steps[name].cache:
+            return None
+        return self.cache_dir / self._key(name)
+
+    def targets(self) -> list[str]:
+        """Steps with results outside the pipeline: figures, fits and steps with an output."""
+        return [s.name for s in self.steps.values() if s.output or s.op in _FILE_OPS]
+
+    def _schedule(self, targets: list[str]) -> _Schedule:
+        schedule = _Schedule()
+
+        def visit(name: str) -> None:
+            if name in schedule.modes:
+                return
+            entry = self._entry(name)
+            if entry is not None and entry.exists():
+                schedule.modes[name] = "load"
+                return
+            schedule.modes[name] = "run"
+            step = self.steps[name]
+            if step.input is not None:
+                schedule.readers[step.input] += 1
+                visit(step.input)
+
+        for name in targets:
+            if name not in self.steps:
+                raise ValueError(f"Unknown step {name}.")
+            visit(name)
+        return schedule
+
+    def _store(self, result: _Result, scratch: Path, entry: Path) -> _Result:
+        if result.df is not None:
+            result.df.write_parquet(scratch / "frame.parquet")
+        try:
+            scratch.rename(entry)
+        except OSError:
+            # An identical step finished first, and its entry is just as good.
+            shutil.rmtree(scratch)
+        return _Result(df=result.df, files=tuple(entry / p.name for p in result.files))
+
+    def _discard(self, scratch: Path, entry: Path | None) -> None:
+        # Without a cache entry, files were written straight to the output directory.
+        if entry is not None:
+            shutil.rmtree(scratch)
+
+    def _execute(self, name: str, mode: str, input_result: _Result | None) -> _Result:
+        step = self.steps[name]
+        entry = self._entry(name)
+        if mode == "load":
+            assert entry is not None
+            frame = entry / "frame.parquet"
+            result = _Result(
+                df=pl.read_parquet(frame) if frame.exists() else None,
+                files=tuple(sorted(entry.glob("*.png"))),
+            )
+        else:
+            scratch = self.output_dir
+            if entry is not None:
+                scratch = Path(tempfile.mkdtemp(prefix=f"{entry.name}.", dir=self.cache_dir))
+            df = input_result.df if input_result is not None else None
+            ctx = _StepContext(
+                step=step,
+                df=df if df is not None else pl.DataFrame(),
+                var_source=self._sources[name],
+                var_spec=self._specs[name],
+                file_dir=scratch,
+                queue=self.queue,
+            )
+            try:
+                with span(name, cat=step.op):
+                    result = _OPS[step.op](ctx)
+            except (ValueError, pl.exceptions.PolarsError) as exc:
+                self._discard(scratch, entry)
+                raise ValueError(f"Step {name} failed: {exc}") from exc
+            except BaseException:
+                self._discard(scratch, entry)
+                raise
+            if entry is not None:
+                result = self._store(result, scratch, entry)
+        if step.output and result.df is not None:
+            result.df.write_csv(self.output_dir / step.output)
+        for path in result.files:
+            if path.parent != self.output_dir:
+                shutil.copyfile(path, self.output_dir / path.name)
+        return result
+
+    def run(self, targets: list[str] | None = None) -> dict[str, str]:
+        """Produces `targets`, by default all of them. Returns whether each step that was
+        needed was run or loaded from the cache."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        schedule = self._schedule(targets if targets is not None else self.targets())
+        pending = dict(schedule.modes)
+        results: dict[str, _Result] = {}
+        running: dict[Future[_Result], str] = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            try:
+                while pending or running:
+                    for name, mode in list(pending.items()):
+                        inp = self.steps[name].input
+                        if mode == "run" and inp is not None and inp not in results:
+                            continue
+                        del pending[name]
+                        args = (name, mode, results.get(inp) if mode == "run" and inp else None)
+                        running[pool.submit(self._execute, *args)] = name
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        name = running.pop(fut)
+                        result = fut.result()
+                        if schedule.readers[name]:
+                            results[name] = result
+                        inp = self.steps[name].input
+                        if schedule.modes[name] == "run" and inp is not None:
+                            schedule.readers[inp] -= 1
+                            # Drop frames nothing else reads, so memory tracks the live steps.
+                            if schedule.readers[inp] == 0:
+                                results.pop(inp, None)
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                raise
+        return schedule.modes
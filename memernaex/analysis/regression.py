@@ -0,0 +1,91 @@
+import numpy as np
+import polars as pl
+from statsmodels.stats.multitest import multipletests
+
+from memernaex.analysis.stats import paired_t_test
+from memernaex.experiments.subopt.schema import GROUP_VARS, PACKAGE_VARS
+
+METRICS = ("real_sec", "user_sec", "sys_sec", "maxrss_bytes")
+CORRECTIONS = ("holm", "fdr_bh", "bonferroni")
+
+PAIR_KEYS = ["dataset", "program", "name", "length", "run_idx"]
+GROUP_KEYS = ["program", "length_bucket", "metric"]
+
+
+def normalize_runs(df: pl.DataFrame) -> pl.DataFrame:
+    """Maps fold or subopt benchmark rows onto the common columns of PAIR_KEYS, dropping
+    failed runs. Subopt configurations are folded into the program name."""
+    if "program" in df.columns:
+        program = pl.col("program").cast(pl.String)
+        name, length = "name", "length"
+    else:
+        config = [c for c in PACKAGE_VARS + GROUP_VARS if c != "dataset" and c in df.columns]
+        program = pl.concat_str([pl.col(c).cast(pl.String) for c in config], separator="-")
+        name, length = "rna_name", "rna_length"
+    metrics = [pl.col(m).cast(pl.Float64) for m in METRICS if m in df.columns]
+    return df.filter(~pl.col("failed")).select(
+        pl.col("dataset").cast(pl.String),
+        program.alias("program"),
+        pl.col(name).cast(pl.String).alias("name"),
+        pl.col(length).cast(pl.Int64).alias("length"),
+        pl.col("run_idx").cast(pl.Int64),
+        *metrics,
+    )
+
+
+def find_regressions(
+    baseline: pl.DataFrame,
+    candidate: pl.DataFrame,
+    *,
+    metrics: tuple[str, ...] = ("real_sec", "maxrss_bytes"),
+    alpha: float = 0.05,
+    min_effect: float = 0.02,
+    correction: str = "holm",
+) -> pl.DataFrame:
+    """Paired t-tests of candidate against baseline on the log ratio of each metric, per
+    program and power of two length bucket, with p-values corrected across all groups.
+
+    A group is a regression if the difference is significant and the candidate is more than
+    `min_effect` worse as a ratio of geometric means."""
+    pairs = normalize_runs(baseline).join(
+        normalize_runs(candidate), on=PAIR_KEYS, suffix="_candidate"
+    )
+    bucket = pl.col("length").log(2).floor().cast(pl.Int64).alias("length_bucket")
+    log_ratios = pl.concat(
+        pairs.select(
+            pl.col("program"),
+            bucket,
+            pl.lit(m).alias("metric"),
+            (pl.col(f"{m}_candidate").log() - pl.col(m).log()).alias("log_ratio"),
+        )
+        for m in metrics
+    )
+    groups = (
+        log_ratios.filter(pl.col("log_ratio").is_finite())
+        .group_by(GROUP_KEYS)
+        .agg(
+            pl.len().alias("n"),
+            pl.col("log_ratio").mean().alias("mean"),
+            pl.col("log_ratio").std().alias("std"),
+        )
+        .sort(GROUP_KEYS)
+    )
+
+    mean = groups["mean"].to_numpy()
+    t, p = paired_t_test(groups["n"].to_numpy(), mean, groups["std"].to_numpy())
+    reject, p_adj, _, _ = multipletests(p, alpha=alpha, method=correction)
+
+    ratio = np.exp(mean)
+    return groups.select(
+        pl.col("program"),
+        (2 ** pl.col("length_bucket")).alias("length_from"),
+        (2 ** (pl.col("length_bucket") + 1)).alias("length_to"),
+        pl.col("metric"),
+        pl.col("n"),
+        pl.Series("ratio", ratio),
+        pl.Series("t", t),
+        pl.Series("p", p),
+        pl.Series("p_adj", p_adj),
+        pl.Series("regression", reject & (ratio > 1 + min_effect)),
+        pl.Series("improvement", reject & (ratio < 1 / (1 + min_effect))),
+    )
@@ -0,0 +1,210 @@
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+# Caps the size of each index matrix, in elements, so memory use is independent of the number
+# of resamples. Resamples are split into chunks of this budget and run as separate tasks.
+_BATCH_ELEMENTS = 1 << 21
+
+_RESULT_SCHEMA = {
+    "dataset": pl.String,
+    "program_a": pl.String,
+    "program_b": pl.String,
+    "metric": pl.String,
+    "n": pl.Int64,
+    "mean_diff": pl.Float64,
+    "ci_low": pl.Float64,
+    "ci_high": pl.Float64,
+    "p": pl.Float64,
+}
+
+
+@dataclass(frozen=True, kw_only=True)
+class _Differences:
+    """Paired differences for one dataset. Rows are RNAs sorted by family and columns are
+    (program pair, metric) combinations. Missing differences are zero with a zero mask."""
+
+    diffs: npt.NDArray[np.float64]
+    mask: npt.NDArray[np.float64]
+    # Start of each family's rows, followed by the number of rows.
+    offsets: npt.NDArray[np.int64]
+
+
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(groups: list[_Differences]) -> None:
+    _worker["groups"] = groups
+
+
+def _family_blocks(group: _Differences) -> list[tuple[npt.NDArray, npt.NDArray]]:
+    return [
+        (group.diffs[start:stop], group.mask[start:stop])
+        for start, stop in zip(group.offsets[:-1], group.offsets[1:], strict=True)
+    ]
+
+
+def _macro_mean(family_means: list[npt.NDArray[np.float64]]) -> npt.NDArray[np.float64]:
+    # Families with no paired RNAs for a column are NaN and do not count towards its average.
+    stacked = np.stack(family_means)
+    count = (~np.isnan(stacked)).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean: npt.NDArray[np.float64] = np.nansum(stacked, axis=0) / count
+    return mean
+
+
+def _observed(group: _Differences) -> npt.NDArray[np.float64]:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _macro_mean([d.sum(axis=0) / m.sum(axis=0) for d, m in _family_blocks(group)])
+
+
+def _resample(
+    group_idx: int, size: int, seed: np.random.SeedSequence
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Draws `size` family-stratified bootstrap resamples and `size` sign flip permutations
+    of one dataset's differences. Returns the macro mean difference of each, per column."""
+    group: _Differences = _worker["groups"][group_idx]
+    rng = np.random.default_rng(seed)
+    rows = np.arange(size)[:, None]
+    boot_sum = np.zeros((size, group.diffs.shape[1]))
+    boot_count = np.zeros_like(boot_sum)
+    perm_sum = np.zeros_like(boot_sum)
+    perm_count = np.zeros_like(boot_sum)
+    for d, m in _family_blocks(group):
+        nf = len(d)
+        # Bootstrap: turn a batch of index draws into per RNA counts, so each resample's sum
+        # is one row of a matrix product.
+        idx = rng.integers(0, nf, (size, nf)) + rows * nf
+        counts = np.bincount(idx.ravel(), minlength=size * nf).reshape(size, nf).astype(np.float64)
+        signs = rng.integers(0, 2, (size, nf)) * 2.0 - 1.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            boot = (counts @ d) / (counts @ m)
+            perm = (signs @ d) / m.sum(axis=0)
+        boot_sum += np.nan_to_num(boot)
+        boot_count += ~np.isnan(boot)
+        perm_sum += np.nan_to_num(perm)
+        perm_count += ~np.isnan(perm)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return boot_sum / boot_count, perm_sum / perm_count
+
+
+def _differences(
+    df: pl.DataFrame, metrics: list[str]
+) -> tuple[_Differences, list[tuple[str, str]], npt.NDArray[np.int64]]:
+    programs = sorted(df["program"].unique().to_list())
+    rnas = df.select("family", "name").unique().sort("family", "name").with_row_index("row")
+    df = df.join(rnas, on=["family", "name"]).with_columns(
+        pl.col("program").replace_strict(programs, range(len(programs))).alias("program_idx")
+    )
+    if (dups := df.filter(df.select("row", "program_idx").is_duplicated())).height:
+        raise ValueError(
+            f"Each program must have at most one result per RNA, but {len(dups)} rows repeat "
+            f"one, e.g. {dups['program'][0]} on {dups['name'][0]}."
+        )
+    values = np.full((len(rnas), len(programs), len(metrics)), np.nan)
+    values[df["row"].to_numpy(), df["program_idx"].to_numpy()] = df.select(metrics).to_numpy()
+
+    pairs = list(combinations(range(len(programs)), 2))
+    ia, ib = (np.array([p[k] for p in pairs], dtype=np.int64) for k in (0, 1))
+    # Shape (rnas, pairs, metrics), flattened to one column per pair and metric.
+    diffs = (values[:, ia] - values[:, ib]).reshape(len(rnas), -1)
+    mask = ~np.isnan(diffs)
+    n = mask.sum(axis=0)
+
+    families = rnas["family"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, families[1:] != families[:-1]])
+    offsets = np.r_[starts, len(rnas)].astype(np.int64)
+    group = _Differences(
+        diffs=np.where(mask, diffs, 0.0), mask=mask.astype(np.float64), offsets=offsets
+    )
+    return group, [(programs[a], programs[b]) for a, b in pairs], n
+
+
+def resample_comparisons(
+    df: pl.DataFrame,
+    *,
+    metrics: list[str],
+    resamples: int = 10000,
+    alpha: float = 0.05,
+    seed: int = 0,
+    jobs: int = 1,
+) -> pl.DataFrame:
+    """Compares every pair of programs within each dataset on the macro average over families
+    of per RNA metric differences. Confidence intervals come from a bootstrap that resamples
+    RNAs within each family and p-values from a paired sign flip permutation test.
+
+    `df` needs dataset, program, family and name columns plus the metrics. Results do not
+    depend on `jobs` for a fixed seed."""
+    # Datasets with a single program have no pairs to compare.
+    datasets = (
+        df.group_by("dataset")
+        .agg(pl.col("program").n_unique())
+        .filter(pl.col("program") > 1)["dataset"]
+        .sort()
+        .to_list()
+    )
+    if not datasets:
+        return pl.DataFrame(schema=_RESULT_SCHEMA)
+    groups = []
+    pair_lists = []
+    counts = []
+    for dataset in datasets:
+        group, pairs, n = _differences(df.filter(pl.col("dataset") == dataset), metrics)
+        groups.append(group)
+        pair_lists.append(pairs)
+        counts.append(n)
+
+    batch_sizes = [max(1, _BATCH_ELEMENTS // max(len(group.diffs), 1)) for group in groups]
+    tasks = [
+        (group_idx, min(size, resamples - start))
+        for group_idx, size in enumerate(batch_sizes)
+        for start in range(0, resamples, size)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    group_idxs = [group_idx for group_idx, _ in tasks]
+    sizes = [size for _, size in tasks]
+    if jobs == 1:
+        _init_worker(groups)
+        results = list(map(_resample, group_idxs, sizes, seeds))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(groups,)
+        ) as pool:
+            results = list(pool.map(_resample, group_idxs, sizes, seeds))
+
+    frames = []
+    for group_idx, (dataset, group) in enumerate(zip(datasets, groups, strict=True)):
+        own = [r for t, r in zip(tasks, results, strict=True) if t[0] == group_idx]
+        boot = np.concatenate([b for b, _ in own])
+        perm = np.concatenate([p for _, p in own])
+        observed = _observed(group)
+        # Small tolerance so sign flips that reproduce the observed value count as ties.
+        extreme = (np.abs(perm) >= np.abs(observed) - 1e-12).sum(axis=0)
+        p = np.where(np.isnan(observed), np.nan, (1 + extreme) / (1 + len(perm)))
+        with warnings.catch_warnings(action="ignore", category=RuntimeWarning):
+            # Pairs with no RNAs in common have only NaN resamples.
+            low, high = np.nanquantile(boot, [alpha / 2, 1 - alpha / 2], axis=0)
+        pairs = pair_lists[group_idx]
+        frames.append(
+            pl.DataFrame(
+                {
+                    "dataset": dataset,
+                    "program_a": np.repeat([a for a, _ in pairs], len(metrics)),
+                    "program_b": np.repeat([b for _, b in pairs], len(metrics)),
+                    "metric": np.tile(metrics, len(pairs)),
+                    "n": counts[group_idx],
+                    "mean_diff": observed,
+                    "ci_low": low,
+                    "ci_high": high,
+                    "p": p,
+                },
+                schema_overrides={"n": pl.Int64},
+            )
+        )
+    return pl.concat(frames).sort("dataset", "program_a", "program_b", "metric")
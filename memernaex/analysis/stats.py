@@ -0,0 +1,18 @@
+import numpy as np
+import numpy.typing as npt
+from scipy import stats
+
+
+def paired_t_test(
+    n: npt.NDArray[np.integer], mean: npt.NDArray[np.float64], std: npt.NDArray[np.float64]
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Two-sided paired t-tests for many groups at once, from the count, mean and sample
+    standard deviation of each group's differences. Returns t statistics and p-values."""
+    std = np.nan_to_num(std)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = mean / (std / np.sqrt(n))
+        p = 2 * stats.t.sf(np.abs(t), np.maximum(n - 1, 1))
+    # No spread: any consistent difference is certain and no difference is no evidence.
+    p = np.where(std == 0, np.where(mean == 0, 1.0, 0.0), p)
+    p = np.where(n < 2, 1.0, p)
+    return t, p
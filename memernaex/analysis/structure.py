@@ -0,0 +1,117 @@
+import itertools
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+# Bracket pairs allowed in dot-bracket, including pseudoknot levels.
+BRACKETS = (("(", ")"), ("[", "]"), ("{", "}"), ("<", ">"))
+
+Pairs = npt.NDArray[np.int32]
+
+
+@dataclass(frozen=True, kw_only=True)
+class Structure:
+    name: str
+    seq: str
+    # Index of the partner of each base, or -1 if unpaired.
+    pairs: Pairs
+
+
+def dbs_to_pairs(dbs: list[str]) -> list[Pairs]:
+    """Converts dot-brackets to pair arrays without a per-character loop, all in one pass.
+
+    Brackets of one type pair up between consecutive opens and closes at the same nesting
+    depth. Each structure must balance, so depth is zero at every boundary and pairs never
+    span two structures.
+    """
+    if not dbs:
+        return []
+    lengths = np.array([len(db) for db in dbs], dtype=np.int64)
+    ends = np.cumsum(lengths)
+    codes = np.frombuffer("".join(dbs).encode(), dtype=np.uint8)
+    pairs = np.full(len(codes), -1, dtype=np.int64)
+    for op, cl in BRACKETS:
+        step = (codes == ord(op)).astype(np.int64) - (codes == ord(cl))
+        idx = np.flatnonzero(step)
+        if not len(idx):
+            continue
+        depth = np.cumsum(step)
+        # Depth of an open after it, and of a close before it, are the same for a pair.
+        level = depth[idx] + (step[idx] < 0)
+        last = (ends - 1)[lengths > 0]
+        bad = np.concatenate([idx[level < 1], last[depth[last] != 0]])
+        if len(bad):
+            first = int(np.searchsorted(ends, bad.min(), side="right"))
+            raise ValueError(f"Unbalanced {op}{cl} in structure: {dbs[first]}")
+        order = idx[np.lexsort((idx, level))]
+        opens, closes = order[0::2], order[1::2]
+        pairs[opens] = closes
+        pairs[closes] = opens
+    # Back to indices within each structure.
+    starts = np.repeat(ends - lengths, lengths)
+    pairs = np.where(pairs >= 0, pairs - starts, -1).astype(np.int32)
+    return np.split(pairs, ends[:-1])
+
+
+def db_to_pairs(db: str) -> Pairs:
+    return dbs_to_pairs([db])[0]
+
+
+def parse_ct(text: str, name: str) -> Structure:
+    lines = [line.split() for line in text.splitlines() if line.strip()]
+    n = int(lines[0][0])
+    rows = lines[1 : n + 1]
+    if len(rows) != n:
+        raise ValueError(f"ct file for {name} has {len(rows)} bases, expected {n}.")
+    seq = "".join(r[1] for r in rows)
+    # ct pair indices are 1-based with 0 for unpaired.
+    pairs = np.array([int(r[4]) for r in rows], dtype=np.int32) - 1
+    return Structure(name=name, seq=seq, pairs=pairs)
+
+
+def parse_db_records(text: str) -> list[Structure]:
+    """Parses FASTA-like records of a '>' name line, a sequence line and a dot-bracket line.
+    Anything after the dot-bracket, such as an RNAfold energy, is ignored."""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    headers, seqs, dbs = lines[0::3], lines[1::3], [line.split()[0] for line in lines[2::3]]
+    if len(lines) % 3:
+        raise ValueError(f"Malformed dot-bracket record at {headers[-1]!r}.")
+    for header, seq, db in zip(headers, seqs, dbs, strict=True):
+        if not header.startswith(">"):
+            raise ValueError(f"Malformed dot-bracket record at {header!r}.")
+        if len(db) != len(seq):
+            raise ValueError(f"Structure length does not match sequence for {header[1:]}.")
+    return [
+        Structure(name=header[1:].strip(), seq=seq, pairs=pairs)
+        for header, seq, pairs in zip(headers, seqs, dbs_to_pairs(dbs), strict=True)
+    ]
+
+
+def read_structure_file(path: Path) -> list[Structure]:
+    text = path.read_text()
+    if path.suffix == ".ct":
+        return [parse_ct(text, path.stem)]
+    structs = parse_db_records(text)
+    # A single record in its own file may omit a useful name.
+    if path.suffix == ".db" and len(structs) == 1:
+        return [Structure(name=path.stem, seq=structs[0].seq, pairs=structs[0].pairs)]
+    return structs
+
+
+def read_structures(path: Path, jobs: int = 1) -> dict[str, Structure]:
+    """Reads a multi-record dot-bracket file, or a directory of .ct and .db files, which are
+    read across `jobs` processes."""
+    paths = (
+        sorted(p for p in path.iterdir() if p.suffix in {".ct", ".db"}) if path.is_dir() else [path]
+    )
+    results: Iterable[list[Structure]]
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(read_structure_file, paths, chunksize=64))
+    else:
+        results = map(read_structure_file, paths)
+    return {s.name: s for s in itertools.chain.from_iterable(results)}
@@ -0,0 +1,173 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import polars as pl
+
+from memernaex.analysis.data import Var, empty_var_data, parse_var_data
+from memernaex.profiling import span
+
+# inotify events that mean a file in a watched directory was written, created or replaced.
+_IN_MODIFY = 0x2
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+# Events were dropped, so any file may have changed. Always reported, without a name.
+_IN_Q_OVERFLOW = 0x4000
+_IN_EVENT = struct.Struct("iIII")
+
+# Changes closer together than this are handled together, so a burst of appended records
+# causes one update rather than one per record.
+_SETTLE_SEC = 0.2
+
+
+def _load_inotify() -> Any:
+    libc = ctypes.util.find_library("c")
+    lib = ctypes.CDLL(libc, use_errno=True) if libc else None
+    return lib if lib is not None and hasattr(lib, "inotify_init1") else None
+
+
+_inotify = _load_inotify()
+
+
+class FileWatcher:
+    """Waits for changes to files. Uses inotify on the files' directories, so files that are
+    replaced or created later are seen too, and falls back to polling their stat."""
+
+    paths: set[Path]
+    poll_interval: float
+    fd: int | None
+    _stats: dict[Path, tuple[int, int, int] | None]
+
+    def __init__(self, paths: Iterable[Path], *, poll_interval: float = 1.0) -> None:
+        self.paths = {p.resolve() for p in paths}
+        self.poll_interval = poll_interval
+        self.fd = None
+        if _inotify is not None:
+            fd = _inotify.inotify_init1(os.O_CLOEXEC)
+            dirs = {str(p.parent).encode() for p in self.paths}
+            if fd >= 0 and all(_inotify.inotify_add_watch(fd, d, _IN_MASK) >= 0 for d in dirs):
+                self.fd = fd
+            elif fd >= 0:
+                os.close(fd)
+        self._stats = {p: self._stat(p) for p in self.paths}
+
+    @staticmethod
+    def _stat(path: Path) -> tuple[int, int, int] | None:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _poll(self) -> set[Path]:
+        changed = set()
+        for path in self.paths:
+            stat = self._stat(path)
+            if stat != self._stats[path]:
+                self._stats[path] = stat
+                changed.add(path)
+        return changed
+
+    def _read_events(self, timeout: float | None) -> set[str] | None:
+        """Returns the names of changed files, or None if events were lost."""
+        assert self.fd is not None
+        names: set[str] | None = set()
+        while select.select([self.fd], [], [], timeout)[0]:
+            buf = os.read(self.fd, 65536)
+            pos = 0
+            while pos < len(buf):
+                _, mask, _, length = _IN_EVENT.unpack_from(buf, pos)
+                pos += _IN_EVENT.size
+                if mask & _IN_Q_OVERFLOW:
+                    names = None
+                elif names is not None:
+                    names.add(buf[pos : pos + length].rstrip(b"\0").decode(errors="replace"))
+                pos += length
+            timeout = _SETTLE_SEC
+        return names
+
+    def wait(self) -> set[Path]:
+        """Blocks until at least one file changes and returns the files that changed."""
+        while True:
+            if self.fd is not None:
+                names = self._read_events(None)
+                changed = {p for p in self.paths if names is None or p.name in names}
+            else:
+                time.sleep(self.poll_interval)
+                changed = self._poll()
+                if changed:
+                    time.sleep(_SETTLE_SEC)
+                    changed |= self._poll()
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class NdjsonTail:
+    """Reads the complete records appended to an NDJSON file since the last read. The first
+    read starts from the file's size when the tail was created."""
+
+    path: Path
+    var_source: type | ModuleType | Iterable[Var]
+    offset: int
+    inode: int
+
+    def __init__(self, path: Path, var_source: type | ModuleType | Iterable[Var]) -> None:
+        self.path = path
+        self.var_source = var_source
+        st = path.stat()
+        self.offset = st.st_size
+        self.inode = st.st_ino
+
+    def read(self) -> tuple[pl.DataFrame | None, bool]:
+        """Returns the new records, if any, and whether the file was truncated or replaced,
+        in which case they are all of its records."""
+        st = self.path.stat()
+        reset = st.st_ino != self.inode or st.st_size < self.offset
+        if reset:
+            self.offset = 0
+            self.inode = st.st_ino
+        with self.path.open("rb") as f:
+            f.seek(self.offset)
+            data = f.read(st.st_size - self.offset)
+        # A record still being written is left for the next read.
+        data = data[: data.rfind(b"\n") + 1]
+        self.offset += len(data)
+        if not data.strip():
+            # A reset to an empty file still replaces every record.
+            return (empty_var_data(self.var_source) if reset else None), reset
+        with span("read new records", cat="io", path=str(self.path)) as s:
+            df = parse_var_data(self.var_source, data)
+            s.rows = len(df)
+        return df, reset
+
+
+def follow(
+    tail: NdjsonTail, update: Callable[[pl.DataFrame, bool], None], *, poll_interval: float = 1.0
+) -> None:
+    """Calls `update` with the new records and the reset flag of `tail` whenever its file
+    changes, until interrupted. A reset to an empty file gives an empty frame."""
+    watcher = FileWatcher([tail.path], poll_interval=poll_interval)
+    try:
+        while True:
+            df, reset = tail.read()
+            if df is not None:
+                update(df, reset)
+            watcher.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
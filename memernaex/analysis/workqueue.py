@@ -0,0 +1,289 @@
+import contextlib
+import functools
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import pickle
+import random
+import socket
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from memernaex.profiling import span
+
+_STATES = ("pending", "leased", "done", "failed")
+
+
+@dataclass(frozen=True, kw_only=True)
+class _Lease:
+    task_id: str
+    attempt: int
+    path: Path
+
+
+def _split_name(name: str) -> tuple[str, int]:
+    task_id, attempt, *_ = name.split("~")
+    return task_id, int(attempt)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Readers on any host see either no file or all of it.
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    Path(tmp).replace(path)
+
+
+@functools.cache
+def _code_fingerprint(fn: str) -> bytes:
+    """Hashes the source of the top-level package of `fn`, or its module if it is not in a
+    package, so results computed by other code are never mistaken for current ones."""
+    spec = importlib.util.find_spec(fn.partition(":")[0].partition(".")[0])
+    if spec is None or spec.origin is None:
+        raise ValueError(f"Cannot find the module of {fn}.")
+    locations = spec.submodule_search_locations
+    paths = sorted(p for loc in locations for p in Path(loc).rglob("*.py")) if locations else []
+    digest = hashlib.sha256()
+    for path in paths or [Path(spec.origin)]:
+        digest.update(path.name.encode() + b"\0" + path.read_bytes())
+    return digest.digest()
+
+
+def _call(fn: str, args: tuple[Any, ...]) -> Any:
+    module, attr = fn.split(":")
+    return getattr(importlib.import_module(module), attr)(*args)
+
+
+class WorkQueue:
+    """A work queue in a directory, which may be on a filesystem shared between hosts. Needs
+    nothing but atomic rename, so any number of workers on any hosts can share it:
+
+        tasks/<id>          the function and arguments, pickled
+        pending/<id>~<n>    waiting for its nth attempt
+        leased/<id>~<n>~<w> claimed by worker w, which touches it while it runs the task
+        done/<id>           the pickled result
+        failed/<id>         why the last attempt failed
+
+    A worker claims a task by renaming its pending file into leased/, which only one worker
+    can do. A lease not touched for `lease_sec` has a dead worker and goes back to pending,
+    until a task has been tried `max_attempts` times. Tasks are identified by their contents
+    and the source of their function's package, so submitting a task again is free, and so is
+    rerunning a job that was interrupted, but results from older code are never reused. Delete
+    finished tasks with clear_done once no job needs them. A task can run twice if its worker
+    stalls past its lease, so tasks must not have side effects. Tasks are unpickled, so only
+    share the directory with people you trust.
+    """
+
+    root: Path
+    lease_sec: float
+    max_attempts: int
+
+    def __init__(self, root: Path, *, lease_sec: float = 60.0, max_attempts: int = 3) -> None:
+        self.root = root
+        for state in ("tasks", *_STATES, "clock"):
+            (root / state).mkdir(parents=True, exist_ok=True)
+        # The first process to create the queue sets its parameters, so all workers agree.
+        config_path = root / "queue.json"
+        if not config_path.exists():
+            config = {"lease_sec": lease_sec, "max_attempts": max_attempts}
+            _write_atomic(config_path, json.dumps(config).encode())
+        config = json.loads(config_path.read_text())
+        self.lease_sec = config["lease_sec"]
+        self.max_attempts = config["max_attempts"]
+        host = socket.gethostname().replace("~", "-")
+        self._worker = f"{host}.{os.getpid()}.{uuid.uuid4().hex[:8]}"
+
+    def _now(self) -> float:
+        # Lease ages are measured by the filesystem's clock, as hosts' clocks may differ.
+        clock = self.root / "clock" / self._worker
+        clock.touch()
+        return clock.stat().st_mtime
+
+    def _done(self, task_id: str) -> bool:
+        return (self.root / "done" / task_id).exists()
+
+    def _failed(self, task_id: str) -> bool:
+        return (self.root / "failed" / task_id).exists()
+
+    def _names(self, state: str) -> list[str]:
+        return [p.name for p in (self.root / state).iterdir()]
+
+    def _queued(self) -> set[str]:
+        return {_split_name(name)[0] for name in self._names("pending") + self._names("leased")}
+
+    def submit(self, calls: Iterable[tuple[str, tuple[Any, ...]]]) -> list[str]:
+        """Adds calls of functions, given as module:attr, with argument tuples and returns the
+        tasks' ids. Functions and arguments must be importable and picklable on every worker.
+        Tasks that already finished are not run again, but failed tasks are retried."""
+        queued = self._queued()
+        ids = []
+        for fn, args in calls:
+            data = pickle.dumps((fn, args), protocol=pickle.HIGHEST_PROTOCOL)
+            task_id = hashlib.sha256(_code_fingerprint(fn) + data).hexdigest()
+            ids.append(task_id)
+            if self._done(task_id) or task_id in queued:
+                continue
+            task_path = self.root / "tasks" / task_id
+            if not task_path.exists():
+                _write_atomic(task_path, data)
+            (self.root / "failed" / task_id).unlink(missing_ok=True)
+            (self.root / "pending" / f"{task_id}~0").touch()
+            queued.add(task_id)
+        return ids
+
+    def claim(self) -> _Lease | None:
+        names = self._names("pending")
+        random.shuffle(names)
+        for name in names:
+            pending = self.root / "pending" / name
+            lease = self.root / "leased" / f"{name}~{self._worker}"
+            try:
+                # Renaming keeps the modification time, so refresh it first or the lease could
+                # look expired as soon as it is taken.
+                os.utime(pending)
+                pending.rename(lease)
+            except FileNotFoundError:
+                continue
+            task_id, attempt = _split_name(name)
+            if self._done(task_id):
+                # A previous attempt outlived its lease but still finished.
+                lease.unlink(missing_ok=True)
+                continue
+            return _Lease(task_id=task_id, attempt=attempt, path=lease)
+        return None
+
+    def _heartbeat(self, lease: _Lease, stop: threading.Event) -> None:
+        while not stop.wait(self.lease_sec / 4):
+            try:
+                os.utime(lease.path)
+            except FileNotFoundError:
+                return
+
+    def run(self, lease: _Lease) -> None:
+        """Runs a claimed task, keeping its lease alive, and records its result or failure."""
+        fn, args = pickle.loads((self.root / "tasks" / lease.task_id).read_bytes())  # noqa: S301
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(lease, stop), daemon=True)
+        heartbeat.start()
+        error = None
+        try:
+            with span(fn, cat="task", task_id=lease.task_id):
+                result = _call(fn, args)
+        except Exception:
+            error = traceback.format_exc()
+        finally:
+            stop.set()
+            heartbeat.join()
+        if error is not None:
+            self._fail(lease, error)
+            return
+        done = self.root / "done" / lease.task_id
+        if not done.exists():
+            _write_atomic(done, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        lease.path.unlink(missing_ok=True)
+
+    def _fail(self, lease: _Lease, reason: str) -> None:
+        attempt = lease.attempt + 1
+        if attempt < self.max_attempts:
+            with contextlib.suppress(FileNotFoundError):
+                lease.path.rename(self.root / "pending" / f"{lease.task_id}~{attempt}")
+            return
+        # Whoever removes the lease records the failure, so it is recorded once.
+        try:
+            lease.path.unlink()
+        except FileNotFoundError:
+            return
+        _write_atomic(self.root / "failed" / lease.task_id, reason.encode())
+
+    def reap(self) -> int:
+        """Returns tasks whose workers stopped renewing their leases to pending, or fails them
+        if they are out of attempts. Returns how many leases expired."""
+        now = self._now()
+        expired = 0
+        for name in self._names("leased"):
+            path = self.root / "leased" / name
+            try:
+                age = now - path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if age <= self.lease_sec:
+                continue
+            expired += 1
+            task_id, attempt = _split_name(name)
+            worker = name.split("~", 2)[2]
+            lease = _Lease(task_id=task_id, attempt=attempt, path=path)
+            self._fail(lease, f"Worker {worker} stopped renewing its lease after {age:.0f}s.\n")
+        return expired
+
+    def clear_done(self) -> int:
+        """Removes the results and definitions of finished tasks and returns how many there
+        were. Callers still waiting on those tasks would then fail, so only run this when no
+        job is using the queue."""
+        queued = self._queued()
+        cleared = 0
+        for task_id in self._names("done"):
+            if task_id not in queued:
+                (self.root / "tasks" / task_id).unlink(missing_ok=True)
+            (self.root / "done" / task_id).unlink(missing_ok=True)
+            cleared += 1
+        return cleared
+
+    def status(self) -> dict[str, int]:
+        return {state: len(self._names(state)) for state in _STATES}
+
+    def error(self, task_id: str) -> str | None:
+        path = self.root / "failed" / task_id
+        return path.read_text() if path.exists() else None
+
+    def result(self, task_id: str) -> Any:
+        return pickle.loads((self.root / "done" / task_id).read_bytes())  # noqa: S301
+
+    def work(self, *, until: Callable[[], bool] | None = None, poll_interval: float = 1.0) -> int:
+        """Claims and runs tasks until `until` is true, by default until no task is pending or
+        leased, and returns how many tasks it ran."""
+
+        def idle() -> bool:
+            return not self._queued()
+
+        ran = 0
+        while True:
+            if until is not None and until():
+                return ran
+            lease = self.claim()
+            if lease is not None:
+                self.run(lease)
+                ran += 1
+                continue
+            if self.reap():
+                continue
+            if until is None and idle():
+                return ran
+            time.sleep(poll_interval)
+
+    def map(
+        self, fn: str, args: Iterable[tuple[Any, ...]], *, poll_interval: float = 1.0
+    ) -> list[Any]:
+        """Submits a call of `fn` per argument tuple, works on the queue until they have all
+        finished, whoever ran them, and returns their results in order."""
+        ids = self.submit((fn, a) for a in args)
+        remaining = set(ids)
+
+        def finished() -> bool:
+            remaining.difference_update([i for i in remaining if self._done(i) or self._failed(i)])
+            return not remaining
+
+        with span("wait for tasks", cat="task", tasks=len(ids)):
+            self.work(until=finished, poll_interval=poll_interval)
+        for task_id in ids:
+            if (error := self.error(task_id)) is not None:
+                raise ValueError(f"Task {task_id} of {fn} failed:\n{error}")
+        return [self.result(i) for i in ids]
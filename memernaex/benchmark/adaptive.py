@@ -0,0 +1,171 @@
+# Copyright 2026 Eliot Courtney.
+import logging
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+from memernaex.analysis.complexity import ComplexityFitter
+from memernaex.analysis.data import Var
+from memernaex.benchmark.runner import Job, Program, Rna, RunResult
+
+log = logging.getLogger(__name__)
+
+METRICS = ("real_sec", "user_sec", "sys_sec", "maxrss_bytes")
+
+VAR_LENGTH = Var(id="length", name="Length (nuc)", dtype=pl.Int64)
+
+_BASES = np.frombuffer(b"ACGU", dtype=np.uint8)
+
+
+def random_rna(rng: np.random.Generator, length: int, name: str) -> Rna:
+    return Rna(name=name, seq=_BASES[rng.integers(0, len(_BASES), length)].tobytes().decode())
+
+
+def allocate_runs(weights: npt.NDArray[np.float64], total: int) -> npt.NDArray[np.int64]:
+    """Splits `total` runs proportionally to `weights` by largest remainder."""
+    share = weights / weights.sum() * total
+    counts: npt.NDArray[np.int64] = np.floor(share).astype(np.int64)
+    order = np.argsort(-(share - counts), kind="stable")
+    counts[order[: total - int(counts.sum())]] += 1
+    return counts
+
+
+@dataclass(kw_only=True)
+class FitState:
+    model: str = ""
+    # Relative 1 sigma prediction uncertainty at each candidate length.
+    rel_uncertainty: npt.NDArray[np.float64] = field(default_factory=lambda: np.empty(0))
+    # Relative standard error of each fitted parameter.
+    param_rel_stderr: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def max_rel_uncertainty(self) -> float:
+        return float(self.rel_uncertainty.max()) if len(self.rel_uncertainty) else math.inf
+
+
+@dataclass(kw_only=True)
+class ProgramState:
+    program: Program
+    lengths: list[int] = field(default_factory=list)
+    values: list[float] = field(default_factory=list)
+    runs: int = 0
+    fit: FitState = field(default_factory=FitState)
+    done: bool = False
+
+
+def fit_uncertainty(
+    lengths: list[int], values: list[float], candidates: npt.NDArray[np.float64], y: Var
+) -> FitState:
+    """Fits the best complexity model by BIC and returns its prediction uncertainty at
+    `candidates`, which is infinite wherever the fit does not determine it."""
+    df = pl.DataFrame(
+        {VAR_LENGTH.id: lengths, y.id: values}, schema={VAR_LENGTH.id: pl.Int64, y.id: pl.Float64}
+    )
+    name, result = ComplexityFitter(df=df, xs=VAR_LENGTH, y=y).fit()
+    state = FitState(model=name, rel_uncertainty=np.full(len(candidates), np.inf))
+    if result.covar is None:
+        return state
+    pred = np.asarray(result.eval(x=(candidates,)), dtype=np.float64)
+    unc = np.asarray(result.eval_uncertainty(x=(candidates,), sigma=1), dtype=np.float64)
+    rel = np.abs(unc) / np.maximum(np.abs(pred), np.finfo(np.float64).tiny)
+    state.rel_uncertainty = np.where(np.isfinite(rel), rel, np.inf)
+    state.param_rel_stderr = {
+        p.name: abs(p.stderr / p.value) if p.stderr is not None and p.value else math.inf
+        for p in result.params.values()
+    }
+    return state
+
+
+class AdaptiveScheduler:
+    """Chooses benchmark runs per program where they most reduce the uncertainty of the
+    fitted scaling model, until its prediction is within `target` relative uncertainty
+    everywhere in [min_length, max_length]."""
+
+    states: dict[str, ProgramState]
+    candidates: npt.NDArray[np.int64]
+    metric: Var
+    target: float
+    max_runs: int
+    job_kwargs: dict[str, Any]
+    rng: np.random.Generator
+    _counts: Counter[tuple[str, int]]
+
+    def __init__(
+        self,
+        programs: list[Program],
+        *,
+        min_length: int,
+        max_length: int,
+        num_candidates: int = 16,
+        metric: str = "real_sec",
+        target: float = 0.05,
+        max_runs: int = 200,
+        seed: int | None = None,
+        **job_kwargs: Any,
+    ) -> None:
+        self.states = {p.name: ProgramState(program=p) for p in programs}
+        # Scaling is usually polynomial, so spread candidates evenly in log length.
+        self.candidates = np.unique(
+            np.geomspace(min_length, max_length, num_candidates).round().astype(np.int64)
+        )
+        self.metric = Var(id=metric, name=metric, dtype=pl.Float64)
+        self.target = target
+        self.max_runs = max_runs
+        self.job_kwargs = job_kwargs
+        self.rng = np.random.default_rng(seed)
+        self._counts = Counter()
+
+    def _jobs(self, state: ProgramState, lengths: npt.NDArray[np.int64]) -> list[Job]:
+        jobs = []
+        for length in lengths.tolist()[: self.max_runs - state.runs]:
+            # Fresh sequences for each run so the fit averages over sequence effects too.
+            idx = self._counts[state.program.name, length]
+            self._counts[state.program.name, length] += 1
+            rna = random_rna(self.rng, length, f"random_{length}_{idx}")
+            jobs.append(Job(program=state.program, rna=rna, run_idx=idx, **self.job_kwargs))
+        state.runs += len(jobs)
+        return jobs
+
+    def initial_batch(self, num_lengths: int, runs: int) -> list[Job]:
+        idx = np.linspace(0, len(self.candidates) - 1, num_lengths).round().astype(np.int64)
+        lengths = np.repeat(self.candidates[np.unique(idx)], runs)
+        return [job for state in self.states.values() for job in self._jobs(state, lengths)]
+
+    def add(self, job: Job, result: RunResult) -> None:
+        if result.failed:
+            return
+        state = self.states[job.program.name]
+        state.lengths.append(len(job.rna.seq))
+        state.values.append(float(getattr(result, self.metric.id)))
+
+    def next_batch(self, batch_runs: int) -> list[Job]:
+        """Refits every unfinished program and returns its next runs, or [] when all are
+        done. Runs go to candidate lengths in proportion to their prediction variance."""
+        jobs = []
+        for state in self.states.values():
+            if state.done:
+                continue
+            if len(set(state.lengths)) >= 2:
+                state.fit = fit_uncertainty(
+                    state.lengths, state.values, self.candidates.astype(np.float64), self.metric
+                )
+            rel = state.fit.rel_uncertainty
+            if len(rel) and (rel <= self.target).all():
+                state.done = True
+                continue
+            if state.runs >= self.max_runs:
+                log.warning(f"{state.program.name} reached {self.max_runs} runs before converging")
+                state.done = True
+                continue
+            if len(rel) and np.isfinite(rel).any():
+                weights = np.where(rel > self.target, np.minimum(rel, 1e6) ** 2, 0.0)
+            else:
+                weights = np.ones(len(self.candidates))
+            counts = allocate_runs(weights, batch_runs)
+            jobs.extend(self._jobs(state, np.repeat(self.candidates, counts)))
+        return jobs
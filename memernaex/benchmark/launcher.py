@@ -0,0 +1,32 @@
+# Copyright 2026 Eliot Courtney.
+# Small process that runs benchmark jobs read as JSON lines from stdin.
+#
+# Whatever process spawns a program contributes its own resident set to the program's
+# ru_maxrss, because the high-water mark of the pre-exec copy is kept across exec. So jobs are
+# spawned from this process, which only imports the standard library, instead of from the CLI.
+# Its own footprint (~15 MB) is the floor of any reported maxrss_bytes.
+
+import json
+import os
+import sys
+from dataclasses import asdict
+
+from memernaex.benchmark.runner import Job, Program, Rna, run_job
+
+
+def decode_job(data: dict) -> Job:
+    return Job(**{**data, "program": Program(**data["program"]), "rna": Rna(**data["rna"])})
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        # Programs inherit the affinity of the process that spawns them.
+        os.sched_setaffinity(0, {int(sys.argv[1])})
+    for line in sys.stdin:
+        result = run_job(decode_job(json.loads(line)))
+        sys.stdout.write(json.dumps(asdict(result)) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
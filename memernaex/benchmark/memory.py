@@ -0,0 +1,38 @@
+# Copyright 2026 Eliot Courtney.
+import ctypes
+import ctypes.util
+import re
+from pathlib import Path
+from typing import Any
+
+_STATUS = Path("/proc/self/status")
+_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def status_bytes(field: str) -> int:
+    match = re.search(rf"^{field}:\s+(\d+) kB", _STATUS.read_text(), re.MULTILINE)
+    if not match:
+        raise ValueError(f"No {field} in {_STATUS}.")
+    return int(match.group(1)) * 1024
+
+
+def _load_malloc_trim() -> Any:
+    libc = ctypes.util.find_library("c")
+    return getattr(ctypes.CDLL(libc), "malloc_trim", None) if libc else None
+
+
+_malloc_trim = _load_malloc_trim()
+
+
+def reset_peak_rss() -> bool:
+    """Resets this process's VmHWM peak to its current RSS, returning whether that is supported.
+    Afterwards VmHWM minus VmRSS is the peak increase of the code that runs next."""
+    # Give memory freed by earlier work back to the OS, otherwise later work reuses it without
+    # raising the peak. Then writing 5 to clear_refs resets the VmHWM peak to the current RSS.
+    if _malloc_trim:
+        _malloc_trim(0)
+    try:
+        _CLEAR_REFS.write_text("5")
+    except OSError:
+        return False
+    return True
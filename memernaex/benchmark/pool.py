@@ -0,0 +1,97 @@
+# Copyright 2026 Eliot Courtney.
+import contextlib
+import json
+import os
+import queue
+import subprocess
+import sys
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+from typing import Self
+
+from memernaex.benchmark.runner import Job, RunResult
+
+
+class LauncherPool:
+    """Runs jobs on `concurrency` launcher processes, optionally each pinned to its own CPU."""
+
+    # Each idle launcher with the arguments it was started with.
+    launchers: "queue.Queue[tuple[subprocess.Popen[str], list[str]]]"
+    procs: list["subprocess.Popen[str]"]
+
+    def __init__(self, concurrency: int, pin_cpus: bool = False) -> None:
+        cpus: list[int | None] = [None] * concurrency
+        if pin_cpus:
+            available = sorted(os.sched_getaffinity(0))
+            if concurrency > len(available):
+                raise ValueError(f"Cannot pin {concurrency} workers to {len(available)} CPUs.")
+            cpus = list(available[:concurrency])
+        self.launchers = queue.Queue()
+        self.procs = []
+        for cpu in cpus:
+            args = [sys.executable, "-m", "memernaex.benchmark.launcher"]
+            if cpu is not None:
+                args.append(str(cpu))
+            self.launchers.put((self._spawn(args), args))
+
+    def _spawn(self, args: list[str]) -> "subprocess.Popen[str]":
+        proc = subprocess.Popen(
+            args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1
+        )
+        self.procs.append(proc)
+        return proc
+
+    def run(self, job: Job) -> RunResult:
+        proc, args = self.launchers.get()
+        try:
+            assert proc.stdin
+            assert proc.stdout
+            try:
+                proc.stdin.write(json.dumps(asdict(job)) + "\n")
+                line = proc.stdout.readline()
+            except BrokenPipeError:
+                line = ""
+            if not line:
+                code = proc.wait()
+                # Replace the dead launcher so later jobs do not fail on it too.
+                proc = self._spawn(args)
+                raise RuntimeError(
+                    f"Benchmark launcher exited with code {code} running {job.program.name} "
+                    f"on {job.rna.name}."
+                )
+            return RunResult(**json.loads(line))
+        finally:
+            self.launchers.put((proc, args))
+
+    def close(self) -> None:
+        for proc in self.procs:
+            if proc.stdin:
+                # Closing flushes, which fails for a launcher that died with a job unsent.
+                with contextlib.suppress(BrokenPipeError):
+                    proc.stdin.close()
+        for proc in self.procs:
+            proc.wait()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def run_jobs(
+    jobs: list[Job], *, concurrency: int = 1, pin_cpus: bool = False
+) -> Iterator[tuple[Job, RunResult]]:
+    """Runs jobs `concurrency` at a time, yielding results as they finish."""
+    with (
+        LauncherPool(concurrency, pin_cpus) as pool,
+        ThreadPoolExecutor(max_workers=concurrency) as executor,
+    ):
+        futures = {executor.submit(pool.run, job): job for job in jobs}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Do not start the queued jobs if the run stopped early.
+            executor.shutdown(cancel_futures=True)
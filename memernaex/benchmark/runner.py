@@ -0,0 +1,320 @@
+# Copyright 2026 Eliot Courtney.
+import json
+import os
+import shlex
+import signal
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+SCHEMAS = ("fold", "subopt")
+
+# Package and group fields the subopt plotter expects, filled from user fields or left empty.
+_SUBOPT_FIELDS = (
+    "ctd",
+    "algorithm",
+    "backend",
+    "count_only",
+    "delta",
+    "energy_model",
+    "lonely_pairs",
+    "sorted_strucs",
+    "strucs",
+    "time_secs",
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class Rna:
+    name: str
+    seq: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class Program:
+    name: str
+    # Command line with {seq}, {name} and {length} placeholders.
+    template: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class Job:
+    program: Program
+    rna: Rna
+    run_idx: int
+    stdin: bool = False
+    count_output: bool = False
+    timeout: float | None = None
+    # Seconds between /proc samples of the running process tree, or None to not sample.
+    sample_interval: float | None = None
+    # Seconds between recorded output line counts and times, or None to not record them.
+    # Needs count_output.
+    emission_interval: float | None = None
+
+
+@dataclass(kw_only=True)
+class RunResult:
+    real_sec: float = 0.0
+    user_sec: float = 0.0
+    sys_sec: float = 0.0
+    maxrss_bytes: int = 0
+    output_lines: int = 0
+    failed: bool = False
+    # Columns of SAMPLE_COLUMNS, if the job was sampled.
+    samples: dict[str, list[float]] | None = None
+    # Columns of EMISSION_COLUMNS, if emissions were recorded.
+    emissions: dict[str, list[float]] | None = None
+
+
+SAMPLE_COLUMNS = ("time_sec", "rss_bytes", "cpu_sec")
+# Number of lines output so far, and when the last of them was read.
+EMISSION_COLUMNS = ("struc_idx", "time_sec")
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def read_fasta(path: Path) -> list[Rna]:
+    rnas = []
+    name: str | None = None
+    seq: list[str] = []
+    for raw in path.read_text().splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith(">"):
+            if name is not None:
+                rnas.append(Rna(name=name, seq="".join(seq)))
+            name, seq = line[1:].strip(), []
+        elif name is None:
+            raise ValueError(f"Sequence before first header in {path}.")
+        else:
+            seq.append(line)
+    if name is not None:
+        rnas.append(Rna(name=name, seq="".join(seq)))
+    return rnas
+
+
+def job_args(job: Job) -> list[str]:
+    return shlex.split(
+        job.program.template.format(seq=job.rna.seq, name=job.rna.name, length=len(job.rna.seq))
+    )
+
+
+def _drain(stream: IO[bytes], result: RunResult) -> None:
+    for _ in stream:
+        result.output_lines += 1
+
+
+def _drain_timed(stream: IO[bytes], result: RunResult, start: float, interval: float) -> None:
+    """Counts lines like _drain, recording the count and time of the first line, of a line
+    every `interval` seconds and of the last line. Both ends of any gap longer than `interval`
+    are recorded too, so stalls are measured exactly while a steady stream costs little."""
+    emissions = result.emissions = {c: [] for c in EMISSION_COLUMNS}
+
+    def record(idx: int, t: float) -> None:
+        if not emissions["struc_idx"] or emissions["struc_idx"][-1] != idx:
+            emissions["struc_idx"].append(idx)
+            emissions["time_sec"].append(t)
+
+    last = recorded = 0.0
+    for _ in stream:
+        now = time.perf_counter() - start
+        if result.output_lines and now - last > interval:
+            record(result.output_lines, last)
+        result.output_lines += 1
+        if result.output_lines == 1 or now - recorded >= interval or now - last > interval:
+            record(result.output_lines, now)
+            recorded = now
+        last = now
+    if result.output_lines:
+        record(result.output_lines, last)
+
+
+def _read_usage(pid: int) -> tuple[int, float, list[int]]:
+    stat = Path(f"/proc/{pid}/stat").read_bytes()
+    # Skip past the command name, which may contain spaces. fields[0] is field 3 of proc(5).
+    fields = stat[stat.rindex(b")") + 2 :].split()
+    # utime, stime and the cutime, cstime of already reaped children.
+    ticks = int(fields[11]) + int(fields[12]) + int(fields[13]) + int(fields[14])
+    children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    return int(fields[21]) * _PAGE_SIZE, ticks / _CLK_TCK, [int(c) for c in children]
+
+
+def tree_usage(pid: int) -> tuple[int, float] | None:
+    """Returns RSS and CPU seconds summed over `pid` and its descendants, or None if `pid` has
+    gone. Programs are often started through wrappers, so the root alone is not enough."""
+    rss, cpu = 0, 0.0
+    stack = [pid]
+    while stack:
+        p = stack.pop()
+        try:
+            p_rss, p_cpu, children = _read_usage(p)
+        except (OSError, ValueError, IndexError):
+            if p == pid:
+                return None
+            continue
+        rss += p_rss
+        cpu += p_cpu
+        stack.extend(children)
+    return rss, cpu
+
+
+def _sample(
+    pid: int, start: float, interval: float, stop: threading.Event, samples: dict[str, list[float]]
+) -> None:
+    while True:
+        usage = tree_usage(pid)
+        if usage is None:
+            break
+        samples["time_sec"].append(time.perf_counter() - start)
+        samples["rss_bytes"].append(usage[0])
+        samples["cpu_sec"].append(usage[1])
+        if stop.wait(interval):
+            break
+
+
+def _kill_unless_reaped(pid: int, lock: threading.Lock, reaped: threading.Event) -> None:
+    # Kill the whole process group, since descendants of a wrapper may hold the output pipe
+    # open. Signal directly: Popen.kill polls first, which could reap the child under wait4.
+    # The group id stays valid until the child, its leader, is reaped.
+    with lock:
+        if not reaped.is_set():
+            os.killpg(pid, signal.SIGKILL)
+
+
+def run_job(job: Job) -> RunResult:
+    """Runs one job and measures it with wait4, so the rusage is exactly that of the child."""
+    result = RunResult()
+    start = time.perf_counter()
+    try:
+        proc = subprocess.Popen(
+            job_args(job),
+            stdin=subprocess.PIPE if job.stdin else subprocess.DEVNULL,
+            stdout=subprocess.PIPE if job.count_output else subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            # Its own process group, so a timeout can kill everything it starts.
+            process_group=0,
+        )
+    except OSError:
+        result.failed = True
+        return result
+
+    reap_lock = threading.Lock()
+    reaped = threading.Event()
+    timer = (
+        threading.Timer(job.timeout, _kill_unless_reaped, (proc.pid, reap_lock, reaped))
+        if job.timeout
+        else None
+    )
+    if timer:
+        timer.start()
+    stop = threading.Event()
+    sampler = None
+    if job.sample_interval:
+        result.samples = {c: [] for c in SAMPLE_COLUMNS}
+        sampler = threading.Thread(
+            target=_sample, args=(proc.pid, start, job.sample_interval, stop, result.samples)
+        )
+        sampler.start()
+    try:
+        if proc.stdin:
+            try:
+                proc.stdin.write(f"{job.rna.seq}\n".encode())
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        if proc.stdout and job.emission_interval:
+            _drain_timed(proc.stdout, result, start, job.emission_interval)
+        elif proc.stdout:
+            _drain(proc.stdout, result)
+        # Wait without reaping first. Until it is reaped the pid cannot be reused, so a timeout
+        # firing before the lock is taken only signals the exited child.
+        os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+        with reap_lock:
+            reaped.set()
+            _, status, rusage = os.wait4(proc.pid, 0)
+    finally:
+        if timer:
+            timer.cancel()
+        stop.set()
+        if sampler:
+            sampler.join()
+    result.real_sec = time.perf_counter() - start
+    # Tell Popen the child was reaped so it does not try to wait for it again.
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    result.user_sec = rusage.ru_utime
+    result.sys_sec = rusage.ru_stime
+    # ru_maxrss is in KiB on Linux.
+    result.maxrss_bytes = rusage.ru_maxrss * 1024
+    result.failed = proc.returncode != 0
+    return result
+
+
+def make_record(
+    job: Job,
+    result: RunResult,
+    *,
+    schema: str,
+    dataset: str,
+    fields: dict[str, str],
+    samples_path: str | None = None,
+    emissions_path: str | None = None,
+) -> dict[str, Any]:
+    """Builds an NDJSON record with exactly the columns the fold or subopt plotters read."""
+    perf = {
+        "real_sec": result.real_sec,
+        "user_sec": result.user_sec,
+        "sys_sec": result.sys_sec,
+        "maxrss_bytes": result.maxrss_bytes,
+        "failed": result.failed,
+    }
+    if schema == "fold":
+        record: dict[str, Any] = {
+            "dataset": dataset,
+            "program": job.program.name,
+            "name": job.rna.name,
+            "length": len(job.rna.seq),
+            "run_idx": job.run_idx,
+            **perf,
+        }
+    elif schema == "subopt":
+        record = {
+            "dataset": dataset,
+            "package_name": job.program.name,
+            **dict.fromkeys(_SUBOPT_FIELDS, ""),
+            "rna_name": job.rna.name,
+            "rna_length": len(job.rna.seq),
+            "run_idx": job.run_idx,
+            "output_strucs": result.output_lines,
+            # Only known when the program reports search statistics itself.
+            "nodes": None,
+            "expansions": None,
+            **perf,
+        }
+    else:
+        raise ValueError(f"Unknown schema: {schema}")
+    if samples_path is not None:
+        record["samples_path"] = samples_path
+    if emissions_path is not None:
+        record["emissions_path"] = emissions_path
+    record.update(fields)
+    return record
+
+
+def make_jobs(programs: list[Program], rnas: list[Rna], runs: int, **kwargs: Any) -> list[Job]:
+    # Interleave programs so slow drift of the host affects all of them equally.
+    return [
+        Job(program=program, rna=rna, run_idx=run_idx, **kwargs)
+        for run_idx in range(runs)
+        for rna in rnas
+        for program in programs
+    ]
+
+
+def write_record(f: IO[str], record: dict[str, Any]) -> None:
+    f.write(json.dumps(record) + "\n")
+    f.flush()
@@ -0,0 +1,53 @@
+# Copyright 2026 Eliot Courtney.
+import re
+from collections.abc import Mapping
+from pathlib import Path
+
+import polars as pl
+
+from memernaex.benchmark.runner import Job
+
+SAMPLES_SCHEMA = {"time_sec": pl.Float64, "rss_bytes": pl.Int64, "cpu_sec": pl.Float64}
+EMISSIONS_SCHEMA = {"struc_idx": pl.Int64, "time_sec": pl.Float64}
+
+
+def samples_file_name(job_idx: int, job: Job) -> str:
+    name = re.sub(r"[^\w.-]", "_", f"{job.program.name}_{job.rna.name}_{job.run_idx}")
+    return f"{job_idx:06d}_{name}.parquet"
+
+
+def write_samples(samples: dict[str, list[float]], path: Path) -> None:
+    pl.DataFrame(samples, schema=SAMPLES_SCHEMA).write_parquet(path, compression="zstd")
+
+
+def write_emissions(emissions: dict[str, list[float]], path: Path) -> None:
+    pl.DataFrame(emissions, schema=EMISSIONS_SCHEMA).write_parquet(path, compression="zstd")
+
+
+def _read_run_files(
+    records: pl.DataFrame,
+    base_dir: Path,
+    keys: list[str],
+    column: str,
+    schema: Mapping[str, type[pl.DataType]],
+) -> pl.DataFrame:
+    frames = []
+    if column in records.columns:
+        for row in records.filter(pl.col(column).is_not_null()).iter_rows(named=True):
+            path = base_dir / row[column]
+            frames.append(pl.read_parquet(path).with_columns(pl.lit(row[k]).alias(k) for k in keys))
+    if not frames:
+        return pl.DataFrame(schema={**schema, **{k: records.schema[k] for k in keys}})
+    return pl.concat(frames)
+
+
+def read_samples(records: pl.DataFrame, base_dir: Path, keys: list[str]) -> pl.DataFrame:
+    """Reads the samples of every record with a samples_path into one frame, tagged with the
+    record's `keys` columns. Relative paths are relative to `base_dir`. Records without a
+    samples_path column give an empty frame."""
+    return _read_run_files(records, base_dir, keys, "samples_path", SAMPLES_SCHEMA)
+
+
+def read_emissions(records: pl.DataFrame, base_dir: Path, keys: list[str]) -> pl.DataFrame:
+    """Like read_samples, for the output emission times of records with an emissions_path."""
+    return _read_run_files(records, base_dir, keys, "emissions_path", EMISSIONS_SCHEMA)
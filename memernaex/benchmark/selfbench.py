@@ -0,0 +1,176 @@
+# Copyright 2026 Eliot Courtney.
+import hashlib
+import resource
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import polars as pl
+
+from memernaex.analysis.aggregate import Aggregation, aggregate
+from memernaex.analysis.complexity import ComplexityFitter
+from memernaex.analysis.data import Var, read_var_data
+from memernaex.benchmark.memory import reset_peak_rss, status_bytes
+from memernaex.benchmark.synthetic import SyntheticConfig, write_synthetic
+from memernaex.experiments.fold.accuracy_plotter import FoldAccuracyPlotter
+from memernaex.experiments.fold.perf_plotter import FoldPerfPlotter
+from memernaex.experiments.subopt import perf_plotter as subopt
+from memernaex.plot.plots import plot_mean_quantity
+from memernaex.plot.util import save_figure
+
+STAGES = ("ingest", "aggregate", "fit", "render")
+
+
+@dataclass(frozen=True, kw_only=True)
+class _SchemaSpec:
+    """What each stage does with data of one schema, mirroring its plotter."""
+
+    vars: type | ModuleType
+    keys: list[str]
+    values: list[str]
+    program: Var
+    length: Var
+    y: Var
+
+
+_SPECS = {
+    "fold-perf": _SchemaSpec(
+        vars=FoldPerfPlotter,
+        keys=["dataset", "program", "length"],
+        values=["real_sec", "user_sec", "sys_sec", "maxrss_bytes"],
+        program=FoldPerfPlotter.VAR_PROGRAM,
+        length=FoldPerfPlotter.VAR_LENGTH,
+        y=FoldPerfPlotter.VAR_REAL_SEC,
+    ),
+    "fold-accuracy": _SchemaSpec(
+        vars=FoldAccuracyPlotter,
+        keys=["dataset", "program", "family"],
+        values=["ppv", "sensitivity", "f1"],
+        program=FoldAccuracyPlotter.VAR_PROGRAM,
+        length=FoldAccuracyPlotter.VAR_LENGTH,
+        y=FoldAccuracyPlotter.VAR_REAL_SEC,
+    ),
+    "subopt": _SchemaSpec(
+        vars=subopt,
+        keys=[*subopt.PACKAGE_VARS, *subopt.GROUP_VARS, subopt.VAR_RNA_LENGTH.id],
+        values=["output_strucs", "real_sec", "maxrss_bytes"],
+        program=subopt.VAR_PACKAGE_NAME,
+        length=subopt.VAR_RNA_LENGTH,
+        y=subopt.VAR_REAL_SEC,
+    ),
+}
+
+
+@dataclass(frozen=True, kw_only=True)
+class StageTiming:
+    real_sec: float
+    user_sec: float
+    sys_sec: float
+    # Peak RSS increase over the stage, if the platform can reset the peak.
+    maxrss_bytes: int | None
+
+
+def time_stage(fn: Callable[[], Any]) -> tuple[Any, StageTiming]:
+    can_reset = reset_peak_rss()
+    before = status_bytes("VmRSS") if can_reset else 0
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    result = fn()
+    real_sec = time.perf_counter() - start
+    end = resource.getrusage(resource.RUSAGE_SELF)
+    return result, StageTiming(
+        real_sec=real_sec,
+        user_sec=end.ru_utime - usage.ru_utime,
+        sys_sec=end.ru_stime - usage.ru_stime,
+        maxrss_bytes=max(status_bytes("VmHWM") - before, 0) if can_reset else None,
+    )
+
+
+def dataset_path(config: SyntheticConfig, data_dir: Path) -> Path:
+    """Generated files are keyed by their config so they are reused across runs."""
+    digest = hashlib.sha256(repr(config).encode()).hexdigest()[:12]
+    return data_dir / f"{config.schema}_{config.rows}_{digest}.ndjson"
+
+
+@dataclass(frozen=True, kw_only=True)
+class _StageInput:
+    spec: _SchemaSpec
+    df: pl.DataFrame
+    figure_path: Path
+
+
+def _aggregate(inp: _StageInput) -> pl.DataFrame:
+    return aggregate(inp.df, inp.spec.keys, inp.spec.values, Aggregation())
+
+
+def _fit(inp: _StageInput) -> str:
+    # One program's mean time per length, as the complexity analyses fit.
+    spec = inp.spec
+    program = inp.df[spec.program.id].min()
+    fit_df = (
+        inp.df.filter(pl.col(spec.program.id) == program)
+        .group_by(spec.length.id)
+        .agg(pl.col(spec.y.id).mean())
+        .sort(spec.length.id)
+    )
+    name, _ = ComplexityFitter(df=fit_df, xs=spec.length, y=spec.y).fit()
+    return name
+
+
+def _render(inp: _StageInput) -> None:
+    spec = inp.spec
+    save_figure(plot_mean_quantity(inp.df, spec.program, spec.length, spec.y), inp.figure_path)
+
+
+# Stages after ingestion, which work on the ingested data.
+_STAGE_FNS: dict[str, Callable[[_StageInput], Any]] = {
+    "aggregate": _aggregate,
+    "fit": _fit,
+    "render": _render,
+}
+
+
+def run_self_benchmark(
+    configs: list[SyntheticConfig],
+    *,
+    data_dir: Path,
+    scratch_dir: Path,
+    stages: tuple[str, ...] = STAGES,
+    runs: int = 3,
+) -> Iterator[dict[str, Any]]:
+    """Times each stage on synthetic data of each config, `runs` times. Yields one record per
+    stage run in the fold benchmark layout: the program is schema/stage and the length is the
+    row count, so results of two versions can be compared with compare-runs."""
+    for config in configs:
+        path = dataset_path(config, data_dir)
+        if not path.exists():
+            write_synthetic(config, path)
+        spec = _SPECS[config.schema]
+        df = None
+        for run_idx in range(runs):
+            for stage in stages:
+                if stage == "ingest":
+                    df, timing = time_stage(partial(read_var_data, spec.vars, path))
+                else:
+                    if df is None:
+                        df = read_var_data(spec.vars, path)
+                    inp = _StageInput(
+                        spec=spec, df=df, figure_path=scratch_dir / f"{path.stem}.png"
+                    )
+                    _, timing = time_stage(partial(_STAGE_FNS[stage], inp))
+                yield {
+                    "dataset": "self-benchmark",
+                    "program": f"{config.schema}/{stage}",
+                    "name": f"{config.schema}-{config.rows}",
+                    "length": config.rows,
+                    "run_idx": run_idx,
+                    "real_sec": timing.real_sec,
+                    "user_sec": timing.user_sec,
+                    "sys_sec": timing.sys_sec,
+                    "maxrss_bytes": timing.maxrss_bytes,
+                    "failed": False,
+                }
@@ -0,0 +1,191 @@
+# Copyright 2026 Eliot Courtney.
+import math
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+SCHEMAS = ("fold-perf", "fold-accuracy", "subopt")
+SUBOPT_DELTAS = ("1", "2", "5")
+
+# Target rows per generated chunk. Fixed so the output is a function of the config alone.
+_CHUNK_ROWS = 1 << 20
+
+
+@dataclass(frozen=True, kw_only=True)
+class SyntheticConfig:
+    schema: str
+    rows: int
+    programs: int = 4
+    min_length: int = 50
+    max_length: int = 2000
+    runs: int = 3
+    families: int = 10
+    # Standard deviation of the log-normal noise on measured quantities.
+    noise: float = 0.1
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.schema not in SCHEMAS:
+            raise ValueError(f"Unknown schema {self.schema}, expected one of {SCHEMAS}.")
+
+    def rows_per_rna(self) -> int:
+        # Accuracy datasets score each RNA once per program.
+        return self.programs * (1 if self.schema == "fold-accuracy" else self.runs)
+
+
+@dataclass(frozen=True, kw_only=True)
+class _ProgramModel:
+    """Per program scaling laws: time = scale * (length / 100)^exponent and
+    memory = base + mem_scale * length^2. Accuracy is offset from each RNA's difficulty."""
+
+    names: list[str]
+    scale: npt.NDArray[np.float64]
+    exponent: npt.NDArray[np.float64]
+    mem_base: npt.NDArray[np.float64]
+    mem_scale: npt.NDArray[np.float64]
+    accuracy: npt.NDArray[np.float64]
+
+
+def _program_model(config: SyntheticConfig) -> _ProgramModel:
+    rng = np.random.default_rng(config.seed)
+    n = config.programs
+    return _ProgramModel(
+        names=[f"program{i}" for i in range(n)],
+        scale=rng.lognormal(np.log(0.01), 0.5, n),
+        exponent=rng.uniform(2.0, 3.0, n),
+        mem_base=rng.uniform(2e6, 2e7, n),
+        mem_scale=rng.uniform(4.0, 64.0, n),
+        accuracy=rng.normal(0.0, 0.05, n),
+    )
+
+
+def _noise(rng: np.random.Generator, sigma: float, n: int) -> npt.NDArray[np.float64]:
+    return rng.lognormal(0.0, sigma, n)
+
+
+def _chunk(
+    config: SyntheticConfig, model: _ProgramModel, rna_start: int, rna_stop: int
+) -> pl.DataFrame:
+    rng = np.random.default_rng([config.seed, rna_start])
+    rnas = np.arange(rna_start, rna_stop)
+    num_rnas = len(rnas)
+    lengths = np.exp(
+        rng.uniform(np.log(config.min_length), np.log(config.max_length + 1), num_rnas)
+    ).astype(np.int64)
+    runs = 1 if config.schema == "fold-accuracy" else config.runs
+
+    # Rows are ordered by RNA, then program, then run.
+    per_rna = config.programs * runs
+    rna_idx = np.repeat(np.arange(num_rnas), per_rna)
+    prog = np.tile(np.repeat(np.arange(config.programs), runs), num_rnas)
+    run_idx = np.tile(np.arange(runs), num_rnas * config.programs)
+    n = len(rna_idx)
+    length = lengths[rna_idx]
+    program = np.array(model.names)[prog]
+
+    real_sec = (
+        model.scale[prog] * (length / 100.0) ** model.exponent[prog] * _noise(rng, config.noise, n)
+    )
+    maxrss = (
+        model.mem_base[prog] + model.mem_scale[prog] * length.astype(np.float64) ** 2
+    ) * _noise(rng, config.noise / 4, n)
+    user_frac = rng.uniform(0.9, 1.0, n)
+
+    if config.schema == "fold-perf":
+        return pl.DataFrame(
+            {
+                "dataset": "synthetic",
+                "program": program,
+                "name": np.char.add("rna", rnas[rna_idx].astype(str)),
+                "length": length,
+                "run_idx": run_idx,
+                "real_sec": real_sec,
+                "user_sec": real_sec * user_frac,
+                "sys_sec": real_sec * (1 - user_frac),
+                "maxrss_bytes": maxrss.astype(np.int64),
+                "failed": np.zeros(n, dtype=bool),
+            }
+        )
+    if config.schema == "fold-accuracy":
+        family = np.char.add("family", (rnas % config.families).astype(str))[rna_idx]
+        # Longer RNAs are harder to predict.
+        difficulty = rng.beta(5, 3, num_rnas) - 0.1 * np.log10(lengths / 100.0)
+        base = difficulty[rna_idx] + model.accuracy[prog]
+        sensitivity = np.clip(base + rng.normal(0, config.noise, n), 0.0, 1.0)
+        ppv = np.clip(base + rng.normal(0, config.noise, n), 0.0, 1.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            f1 = np.where(sensitivity + ppv > 0, 2 * sensitivity * ppv / (sensitivity + ppv), 0.0)
+        return pl.DataFrame(
+            {
+                "dataset": "synthetic",
+                "program": program,
+                "name": np.char.add(np.char.add(family, "_"), rnas[rna_idx].astype(str)),
+                "family": family,
+                "length": length,
+                "sensitivity": sensitivity,
+                "ppv": ppv,
+                "f1": f1,
+                "real_sec": real_sec,
+                "maxrss_bytes": maxrss.astype(np.int64),
+            }
+        )
+
+    # Subopt: each RNA is run at one delta. Structure counts grow exponentially in delta and
+    # length, and time and memory grow with the number of structures.
+    delta_idx = rng.integers(0, len(SUBOPT_DELTAS), num_rnas)[rna_idx]
+    delta = np.array(SUBOPT_DELTAS, dtype=np.float64)[delta_idx]
+    log_strucs = np.minimum(delta * np.log(length) * 0.8, np.log(1e7))
+    output_strucs = np.exp(log_strucs + rng.normal(0, config.noise, n)).astype(np.int64)
+    expansions = output_strucs * length // 10
+    subopt_sec = real_sec * 0.01 + output_strucs * length * 1e-8 * _noise(rng, config.noise, n)
+    return pl.DataFrame(
+        {
+            "dataset": "synthetic",
+            "package_name": program,
+            "ctd": "none",
+            "algorithm": "iterative",
+            "backend": "base",
+            "count_only": "false",
+            "delta": np.array(SUBOPT_DELTAS)[delta_idx],
+            "energy_model": "t04",
+            "lonely_pairs": "false",
+            "sorted_strucs": "true",
+            "strucs": "",
+            "time_secs": "",
+            "rna_name": np.char.add("rna", rnas[rna_idx].astype(str)),
+            "rna_length": length,
+            "run_idx": run_idx,
+            "output_strucs": output_strucs,
+            "nodes": expansions * 2,
+            "expansions": expansions,
+            "real_sec": subopt_sec,
+            "user_sec": subopt_sec * user_frac,
+            "sys_sec": subopt_sec * (1 - user_frac),
+            "maxrss_bytes": (maxrss + output_strucs * length / 4).astype(np.int64),
+            "failed": np.zeros(n, dtype=bool),
+        }
+    )
+
+
+def generate(config: SyntheticConfig) -> Iterator[pl.DataFrame]:
+    """Yields `config.rows` synthetic benchmark rows in chunks, with the columns the plotters
+    for the schema declare, so sizes well beyond memory can be written."""
+    model = _program_model(config)
+    per_rna = config.rows_per_rna()
+    num_rnas = math.ceil(config.rows / per_rna)
+    rnas_per_chunk = max(1, _CHUNK_ROWS // per_rna)
+    remaining = config.rows
+    for start in range(0, num_rnas, rnas_per_chunk):
+        df = _chunk(config, model, start, min(start + rnas_per_chunk, num_rnas))
+        yield df.head(remaining)
+        remaining -= min(len(df), remaining)
+
+
+def write_synthetic(config: SyntheticConfig, path: Path) -> None:
+    with path.open("wb") as f:
+        for df in generate(config):
+            df.write_ndjson(f)
@@ -0,0 +1,86 @@
+# Copyright 2026 Eliot Courtney.
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any
+
+import polars as pl
+import RNA
+
+from memernaex.analysis.accuracy import accuracy_frame, score_pairs
+from memernaex.analysis.structure import Structure, dbs_to_pairs
+from memernaex.benchmark.memory import reset_peak_rss, status_bytes
+
+# Per worker process state, set up once by _init_worker.
+_worker: dict[str, Any] = {}
+
+
+@dataclass(frozen=True, kw_only=True)
+class ViennaParams:
+    dangles: int = 2
+    no_lp: bool = False
+    temperature: float = 37.0
+
+    def program_name(self) -> str:
+        return f"ViennaRNA-d{self.dangles}" + ("-noLP" if self.no_lp else "")
+
+
+def _init_worker(params: ViennaParams) -> None:
+    md = RNA.md()
+    md.dangles = params.dangles
+    md.noLP = int(params.no_lp)
+    md.temperature = params.temperature
+    _worker["md"] = md
+
+
+def _fold(seq: str) -> tuple[str, float, int | None]:
+    """Folds one sequence, returning the MFE structure, wall time and peak RSS increase."""
+    can_reset = reset_peak_rss()
+    before = status_bytes("VmRSS")
+    start = time.perf_counter()
+    fc = RNA.fold_compound(seq.upper().replace("T", "U"), _worker["md"])
+    db, _ = fc.mfe()
+    real_sec = time.perf_counter() - start
+    maxrss = max(status_bytes("VmHWM") - before, 0) if can_reset else None
+    del fc
+    return db, real_sec, maxrss
+
+
+def _fold_chunk(seqs: list[str]) -> list[tuple[str, float, int | None]]:
+    return [_fold(seq) for seq in seqs]
+
+
+def fold_and_score(
+    refs: list[Structure],
+    *,
+    params: ViennaParams,
+    dataset: str,
+    program: str | None = None,
+    families: dict[str, str] | None = None,
+    slip: bool = False,
+    jobs: int = 1,
+    chunk_size: int = 16,
+) -> Iterator[pl.DataFrame]:
+    """Folds every reference sequence with ViennaRNA on `jobs` workers, each of which sets up
+    its model details once, and yields fold accuracy rows for each chunk as it finishes.
+
+    maxrss_bytes is the peak RSS increase of the worker while folding that sequence."""
+    chunks = [refs[k : k + chunk_size] for k in range(0, len(refs), chunk_size)]
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(params,)
+    ) as pool:
+        futures = {pool.submit(_fold_chunk, [r.seq for r in chunk]): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            dbs, real_sec, maxrss = zip(*future.result(), strict=True)
+            scores = score_pairs([r.pairs for r in chunk], dbs_to_pairs(list(dbs)), slip=slip)
+            yield accuracy_frame(
+                chunk,
+                scores,
+                dataset=dataset,
+                program=program or params.program_name(),
+                families=families,
+                real_sec=list(real_sec),
+                maxrss_bytes=list(maxrss),
+            )
@@ -0,0 +1,89 @@
+# Copyright 2026 Eliot Courtney.
+import io
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from memernaex.energy.tables import EnergyTables, write_atomic
+
+BUNDLE_NAME = "energy_model.bundle"
+BUNDLE_MAGIC = b"MRNAEXEM"
+BUNDLE_VERSION = 1
+
+# Magic, version, index length in bytes.
+_HEADER = struct.Struct("<8sII")
+_ALIGN = 64
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def _bundle_arrays(tables: EnergyTables) -> dict[str, np.ndarray]:
+    arrays = {name: table.astype("<f8") for name, table in tables.arrays().items()}
+    arrays["hairpin_seqs"] = np.array(list(tables.hairpin), dtype=np.bytes_)
+    arrays["hairpin_values"] = np.array(list(tables.hairpin.values()), dtype="<f8")
+    return arrays
+
+
+def write_bundle(tables: EnergyTables, path: Path) -> None:
+    """Writes all tables into one file: a fixed header, a JSON index of the arrays and then
+    each array's raw little-endian data, 64 byte aligned so it can be memory mapped."""
+    arrays = _bundle_arrays(tables)
+    index = []
+    offsets = []
+    # Offsets in the index depend on the index size, so lay out relative to the data start.
+    offset = 0
+    for name, arr in arrays.items():
+        offsets.append(offset)
+        index.append(
+            {
+                "name": name,
+                "dtype": arr.dtype.str,
+                "shape": list(arr.shape),
+                "offset": offset,
+                "nbytes": arr.nbytes,
+            }
+        )
+        offset = _align(offset + arr.nbytes)
+    index_bytes = json.dumps(index).encode()
+    data_start = _align(_HEADER.size + len(index_bytes))
+
+    buf = io.BytesIO()
+    buf.write(_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index_bytes)))
+    buf.write(index_bytes)
+    for offset, arr in zip(offsets, arrays.values(), strict=True):
+        buf.seek(data_start + offset)
+        buf.write(np.ascontiguousarray(arr).tobytes())
+    write_atomic(path, buf.getvalue())
+
+
+def read_bundle(path: Path) -> dict[str, np.ndarray]:
+    """Memory maps a bundle and returns read-only zero-copy views of its arrays."""
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    if len(mm) < _HEADER.size:
+        raise ValueError(f"{path} is too small to be an energy model bundle.")
+    magic, version, index_len = _HEADER.unpack(mm[: _HEADER.size].tobytes())
+    if magic != BUNDLE_MAGIC:
+        raise ValueError(f"{path} is not an energy model bundle.")
+    if version != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported bundle version {version} in {path}.")
+    index = json.loads(mm[_HEADER.size : _HEADER.size + index_len].tobytes())
+    data_start = _align(_HEADER.size + index_len)
+
+    arrays = {}
+    for entry in index:
+        start = data_start + entry["offset"]
+        raw = mm[start : start + entry["nbytes"]]
+        arrays[entry["name"]] = raw.view(np.dtype(entry["dtype"])).reshape(entry["shape"])
+    return arrays
+
+
+def load_bundle(path: Path) -> EnergyTables:
+    arrays = read_bundle(path)
+    seqs = arrays.pop("hairpin_seqs")
+    values = arrays.pop("hairpin_values")
+    hairpin = dict(zip((s.decode() for s in seqs.tolist()), values.tolist(), strict=True))
+    return EnergyTables(hairpin=hairpin, **arrays)
@@ -0,0 +1,51 @@
+# Copyright 2026 Eliot Courtney.
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any
+
+from memernaex.energy.bundle import BUNDLE_NAME, write_bundle
+from memernaex.energy.rnastructure import detect_format, num_sources, parse_source
+from memernaex.energy.tables import EnergyTables, write_data_files
+
+
+def _write_outputs(tables: EnergyTables, out: Path, bundle: bool) -> Path:
+    out.mkdir(parents=True, exist_ok=True)
+    write_data_files(tables, out)
+    if bundle:
+        write_bundle(tables, out / BUNDLE_NAME)
+    return out
+
+
+def convert_rnastructure_dirs(
+    inps: list[Path], out: Path, *, bundle: bool = False, jobs: int | None = None
+) -> list[Path]:
+    """Converts each RNAstructure data table directory into out / <directory name>.
+
+    Every table source of every directory is parsed as a separate task on a process pool, and
+    a directory is written as soon as all its sources are done.
+    """
+    names = [inp.name for inp in inps]
+    if len(set(names)) != len(names):
+        raise ValueError("Input directory names must be unique.")
+    formats = {inp: detect_format(inp) for inp in inps}
+
+    parts: dict[Path, dict[str, Any]] = defaultdict(dict)
+    remaining = {inp: num_sources(fmt) for inp, fmt in formats.items()}
+    written = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        parse_futures: dict[Future[dict[str, Any]], Path] = {
+            pool.submit(parse_source, inp, fmt, idx): inp
+            for inp, fmt in formats.items()
+            for idx in range(num_sources(fmt))
+        }
+        write_futures = []
+        for future in as_completed(parse_futures):
+            inp = parse_futures[future]
+            parts[inp] |= future.result()
+            remaining[inp] -= 1
+            if remaining[inp] == 0:
+                tables = EnergyTables(**parts.pop(inp))
+                write_futures.append(pool.submit(_write_outputs, tables, out / inp.name, bundle))
+        written = [future.result() for future in write_futures]
+    return written
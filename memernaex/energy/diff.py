@@ -0,0 +1,110 @@
+# Copyright 2026 Eliot Courtney.
+from dataclasses import fields
+
+import numpy as np
+import polars as pl
+
+from memernaex.energy.tables import LENGTH_TABLES, MAX, EnergyTables, Table, table_keys
+
+
+def _stack(tables: list[Table]) -> Table:
+    # Length tables can differ in size between models, so pad them with undefined entries.
+    size = max(len(t) for t in tables)
+    out = np.full((len(tables), size), np.nan)
+    for i, t in enumerate(tables):
+        out[i, : len(t)] = t
+    return out
+
+
+def _aligned(
+    name: str, baseline: EnergyTables, candidates: list[EnergyTables]
+) -> tuple[np.ndarray, Table, Table]:
+    """Returns the keys, baseline values and stacked candidate values of a table, flattened."""
+    if name == "hairpin":
+        seqs = sorted(set(baseline.hairpin).union(*(c.hairpin for c in candidates)))
+        base = np.array([baseline.hairpin.get(k, np.nan) for k in seqs])
+        cand = np.array([[c.hairpin.get(k, np.nan) for k in seqs] for c in candidates])
+        return np.array(seqs, dtype=np.str_), base, cand.reshape(len(candidates), len(seqs))
+    tables = [getattr(m, name) for m in (baseline, *candidates)]
+    if name in LENGTH_TABLES:
+        stacked = _stack(tables)
+        keys = table_keys(name, stacked[0])
+    else:
+        stacked = np.stack([t.ravel() for t in tables])
+        keys = table_keys(name, tables[0])
+    return keys, stacked[0], stacked[1:]
+
+
+def diff_energy_tables(
+    baseline: EnergyTables, candidates: list[EnergyTables], names: list[str], top_k: int = 5
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Compares each candidate against the baseline, table by table.
+
+    An entry is changed if it became defined or undefined, became or stopped being MAX, or its
+    value changed. Deltas are only taken over entries that are finite in both models. Returns a
+    per (candidate, table) summary and the top changed motifs of each.
+    """
+    summaries = []
+    tops = []
+    for f in fields(EnergyTables):
+        keys, base, cand = _aligned(f.name, baseline, candidates)
+        base_nan, cand_nan = np.isnan(base), np.isnan(cand)
+        base_max, cand_max = base == MAX, cand == MAX
+        finite = ~(base_nan | cand_nan | base_max | cand_max)
+        delta = np.where(finite, cand - base, 0.0)
+        changed = (base_nan != cand_nan) | (base_max != cand_max) | (delta != 0)
+
+        n_delta = (delta != 0).sum(axis=1)
+        abs_delta = np.abs(delta)
+        zeros = np.zeros(len(names))
+        summaries.append(
+            pl.DataFrame(
+                {
+                    "candidate": names,
+                    "table": f.name,
+                    "entries": (~(base_nan & cand_nan)).sum(axis=1),
+                    "changed": changed.sum(axis=1),
+                    "max_abs_delta": abs_delta.max(axis=1, initial=0.0),
+                    "mean_delta": np.divide(
+                        delta.sum(axis=1), n_delta, where=n_delta > 0, out=zeros
+                    ),
+                    "mean_abs_delta": np.divide(
+                        abs_delta.sum(axis=1), n_delta, where=n_delta > 0, out=zeros.copy()
+                    ),
+                }
+            )
+        )
+
+        # Rank non-numeric changes above any numeric delta.
+        score = np.where(changed & ~finite, np.inf, np.where(changed, abs_delta, -1.0))
+        k = min(top_k, score.shape[1])
+        if k == 0:
+            continue
+        top = np.argpartition(-score, k - 1, axis=1)[:, :k]
+        rows = np.repeat(np.arange(len(names)), k)
+        cols = top.ravel()
+        keep = score[rows, cols] >= 0
+        rows, cols = rows[keep], cols[keep]
+        tops.append(
+            pl.DataFrame(
+                {
+                    "candidate": np.array(names)[rows],
+                    "table": f.name,
+                    "motif": keys[cols],
+                    "baseline": base[cols],
+                    "value": cand[rows, cols],
+                    "delta": np.where(finite[rows, cols], delta[rows, cols], np.nan),
+                    "score": score[rows, cols],
+                }
+            )
+        )
+
+    summary = pl.concat(summaries)
+    top_changes = (
+        pl.concat(tops)
+        .sort(["candidate", "table", "score"], descending=[False, False, True])
+        .drop("score")
+        if tops
+        else pl.DataFrame()
+    )
+    return summary, top_changes
@@ -0,0 +1,18 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+from memernaex.energy.bundle import BUNDLE_NAME, load_bundle
+from memernaex.energy.rnastructure import parse_rnastructure_tables
+from memernaex.energy.tables import EnergyTables, read_data_files
+
+
+def load_energy_tables(path: Path) -> EnergyTables:
+    """Loads tables from a bundle file, or a directory of a bundle, memerna .data files or
+    RNAstructure data tables, in that order of preference."""
+    if path.is_file():
+        return load_bundle(path)
+    if (path / BUNDLE_NAME).is_file():
+        return load_bundle(path / BUNDLE_NAME)
+    if (path / "stacking.data").is_file():
+        return read_data_files(path)
+    return parse_rnastructure_tables(path)
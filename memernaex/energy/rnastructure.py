@@ -0,0 +1,298 @@
+# Copyright 2016 Eliot Courtney.
+import re
+from collections.abc import Callable, Iterable
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from memernaex.energy.tables import BASE_IDX, MAX, EnergyTables, Table, new_table
+
+_SPACES_RE = re.compile(r" +")
+_BASES_RE = re.compile(r"[GUAC]")
+_MAP_RE = re.compile(r"([GUAC]+)\s*(\S+)")
+_LOOP_RE = re.compile(r"(\d+)\s+([0-9.\-+]+)\s+([0-9.\-+]+)\s+([0-9.\-+]+)")
+_58_DANGLE_HEADER_RE = re.compile(r"(\s*5\' --> 3\'\s*){4}")
+_58_2X2_HEADER_RE = re.compile(r"(\s*3\' <-- 5\'\s*){4}")
+_58_INTERNAL_HEADER_RE = re.compile(r"(\s*5\' --> 3\'\s*){6}")
+_58_2X2_INTERNAL_HEADER_RE = re.compile(r"\s*5\' ------> 3\'\s*")
+_6_HEADER = "5' --> 3'"
+_6_2X2_INTERNAL_HEADER = "5' ------> 3'"
+
+
+# Tables are mostly a small set of distinct values, so cache the validation.
+@lru_cache(maxsize=4096)
+def parse_value(val: str, default: float = MAX) -> float:
+    if val == ".":
+        return default
+    if val[0] == "+":
+        val = val[1:]
+    if str(float(val)) != val:
+        raise ValueError(f"invalid number: {val}")
+    return float(val)
+
+
+def _parse_values(vals: Iterable[str], default: float = MAX) -> Table:
+    return np.fromiter((parse_value(v, default) for v in vals), dtype=np.float64)
+
+
+def _parse_matrix(lines: list[str], cols: int, skip: int = 0) -> Table:
+    return np.array([_parse_values(line.split()[skip : skip + cols]) for line in lines])
+
+
+def _lines(data: str) -> list[str]:
+    return [i.strip() for i in _SPACES_RE.sub(" ", data).split("\n")]
+
+
+def _bases(line: str, count: int, name: str) -> list[int]:
+    bases = _BASES_RE.findall(line)
+    if len(bases) != count:
+        raise ValueError(f"invalid {name}: {bases}")
+    return [BASE_IDX[b] for b in bases]
+
+
+# Functions for RNAstructure ~5.8
+# Converts ordering of dangles.
+def parse_58_dangle_file(data: str) -> tuple[Table, Table]:
+    lines = _lines(data)
+    out = (new_table(3), new_table(3))
+    idx = 0
+    for i, line in enumerate(lines):
+        if not _58_DANGLE_HEADER_RE.match(line):
+            continue
+        out_idx = 0 if "X" in lines[i + 1] else 1
+        # Values are ordered by (m, c) and keyed by (idx, c, m).
+        values = _parse_values(lines[i + 4].split()[:16])
+        out[out_idx][idx % 4] = values.reshape(4, 4).T
+        idx += 1
+    return out
+
+
+def parse_58_2x2_file(data: str) -> Table:
+    lines = _lines(data)
+    out = new_table(4)
+    idx = 0
+    for i, line in enumerate(lines):
+        if not _58_2X2_HEADER_RE.match(line):
+            continue
+        # Rows are r, columns are (m, c), keyed by (idx, r, c, m).
+        matrix = _parse_matrix(lines[i + 1 : i + 5], 16).reshape(4, 4, 4)
+        out[idx] = matrix.transpose(0, 2, 1)
+        idx += 1
+    return out
+
+
+def parse_58_1x1_internal_loop(data: str) -> Table:
+    lines = _lines(data)
+    out = new_table(6)
+    for i, line in enumerate(lines):
+        if not _58_INTERNAL_HEADER_RE.match(line):
+            continue
+        t3prime = _bases(lines[i + 2], 12, "t3prime")
+        t5prime = _bases(lines[i + 3], 12, "t5prime")
+        matrix = _parse_matrix(lines[i + 6 : i + 10], 24).reshape(4, 6, 4)
+        for m in range(6):
+            out[t3prime[2 * m], :, t3prime[2 * m + 1], t5prime[2 * m + 1], :, t5prime[2 * m]] = (
+                matrix[:, m]
+            )
+    return out
+
+
+def parse_58_1x2_internal_loop(data: str) -> Table:
+    lines = _lines(data)
+    out = new_table(7)
+    for i, line in enumerate(lines):
+        if not _58_INTERNAL_HEADER_RE.match(line):
+            continue
+        t3prime = _bases(lines[i + 2], 12, "t3prime")
+        t5prime = _bases(lines[i + 3], 12, "t5prime")
+        extra = _bases(lines[i + 4], 6, "extra")
+        matrix = _parse_matrix(lines[i + 6 : i + 10], 24).reshape(4, 6, 4)
+        for m in range(6):
+            out[
+                t3prime[2 * m],
+                :,
+                t3prime[2 * m + 1],
+                t5prime[2 * m + 1],
+                extra[m],
+                :,
+                t5prime[2 * m],
+            ] = matrix[:, m]
+    return out
+
+
+def _set_2x2_internal_block(
+    out: Table, t3prime: list[int], t5prime: list[int], matrix: Table
+) -> None:
+    # Rows are (x1, x2), columns are (y1, y2), keyed by (t3, x1, y1, t3, t5, y2, x2, t5).
+    matrix = matrix.reshape(4, 4, 4, 4)
+    out[t3prime[0], :, :, t3prime[1], t5prime[1], :, :, t5prime[0]] = matrix.transpose(0, 2, 3, 1)
+
+
+def parse_58_2x2_internal_loop(data: str) -> Table:
+    lines = _lines(data)
+    out = new_table(8)
+    # Skip first example.
+    for i in range(15, len(lines)):
+        if not _58_2X2_INTERNAL_HEADER_RE.match(lines[i]):
+            continue
+        t3prime = _bases(lines[i + 1], 2, "t3prime")
+        t5prime = _bases(lines[i + 2], 2, "t5prime")
+        _set_2x2_internal_block(out, t3prime, t5prime, _parse_matrix(lines[i + 4 : i + 20], 16))
+    return out
+
+
+def parse_58_map_file(data: str) -> dict[str, float]:
+    return {seq: parse_value(val) for seq, val in _MAP_RE.findall(data)}
+
+
+def parse_58_loop_file(data: str) -> tuple[Table, Table, Table]:
+    rows = _LOOP_RE.findall(data)
+    size = max((int(row[0]) for row in rows), default=-1) + 1
+    out = (np.full(size, np.nan), np.full(size, np.nan), np.full(size, np.nan))
+    for length, *vals in rows:
+        for table, val in zip(out, vals, strict=True):
+            table[int(length)] = parse_value(val, 0.0)
+    return out
+
+
+# Functions for RNAstructure 6.x
+def parse_6_2x2_file(data: str) -> Table:
+    lines = _lines(data)
+    out = new_table(4)
+    for i in range(5, len(lines)):
+        if _6_HEADER not in lines[i]:
+            continue
+        t3prime = BASE_IDX[_BASES_RE.findall(lines[i + 1])[0]]
+        t5prime = BASE_IDX[_BASES_RE.findall(lines[i + 2])[0]]
+        out[t3prime, :, :, t5prime] = _parse_matrix(lines[i + 8 : i + 12], 4, skip=1)
+    return out
+
+
+def parse_6_1x1_internal_loop(data: str) -> Table:
+    lines = _lines(data)
+    out = new_table(6)
+    for i in range(10, len(lines)):
+        if _6_HEADER not in lines[i]:
+            continue
+        t3prime = [BASE_IDX[b] for b in _BASES_RE.findall(lines[i + 2])]
+        t5prime = [BASE_IDX[b] for b in _BASES_RE.findall(lines[i + 3])]
+        matrix = _parse_matrix(lines[i + 10 : i + 14], 4, skip=1)
+        out[t3prime[0], :, t3prime[1], t5prime[1], :, t5prime[0]] = matrix
+    return out
+
+
+def parse_6_1x2_internal_loop(data: str) -> Table:
+    lines = _lines(data)
+    out = new_table(7)
+    for i in range(10, len(lines)):
+        if _6_HEADER not in lines[i]:
+            continue
+        t3prime = [BASE_IDX[b] for b in _BASES_RE.findall(lines[i + 2])]
+        t5prime = [BASE_IDX[b] for b in _BASES_RE.findall(lines[i + 3])]
+        extra = [BASE_IDX[b] for b in _BASES_RE.findall(lines[i + 4])]
+        matrix = _parse_matrix(lines[i + 10 : i + 14], 4, skip=1)
+        out[t3prime[0], :, t3prime[1], t5prime[1], extra[0], :, t5prime[0]] = matrix
+    return out
+
+
+def parse_6_2x2_internal_loop(data: str) -> Table:
+    lines = _lines(data)
+    out = new_table(8)
+    # Skip first example.
+    for i in range(15, len(lines)):
+        if _6_2X2_INTERNAL_HEADER not in lines[i]:
+            continue
+        t3prime = _bases(lines[i + 1], 2, "t3prime")
+        t5prime = _bases(lines[i + 2], 2, "t5prime")
+        _set_2x2_internal_block(
+            out, t3prime, t5prime, _parse_matrix(lines[i + 9 : i + 25], 16, skip=1)
+        )
+    return out
+
+
+def _parse_hairpin(*data: str) -> dict[str, Any]:
+    hairpin: dict[str, float] = {}
+    for d in data:
+        hairpin |= parse_58_map_file(d)
+    return {"hairpin": hairpin}
+
+
+def _parse_loop(data: str) -> dict[str, Any]:
+    internal, bulge, hairpin = parse_58_loop_file(data)
+    return {
+        "internal_initiation": internal,
+        "bulge_initiation": bulge,
+        "hairpin_initiation": hairpin,
+    }
+
+
+def _parse_dangle(data: str) -> dict[str, Any]:
+    dangle3, dangle5 = parse_58_dangle_file(data)
+    return {"dangle3": dangle3, "dangle5": dangle5}
+
+
+def _parse_one(name: str, parse: Callable[[str], Table], data: str) -> dict[str, Any]:
+    return {name: parse(data)}
+
+
+# Input files and the function parsing them into tables, for each supported RNAstructure layout.
+# Sources are independent, so they can be parsed in parallel and merged into EnergyTables.
+_SOURCES: dict[str, tuple[tuple[tuple[str, ...], Callable[..., dict[str, Any]]], ...]] = {
+    "6": (
+        (("rna.triloop.dg", "rna.tloop.dg", "rna.hexaloop.dg"), _parse_hairpin),
+        (("rna.stack.dg",), partial(_parse_one, "stacking", parse_6_2x2_file)),
+        (("rna.tstack.dg",), partial(_parse_one, "terminal", parse_6_2x2_file)),
+        (("rna.loop.dg",), _parse_loop),
+        (("rna.int11.dg",), partial(_parse_one, "internal_1x1", parse_6_1x1_internal_loop)),
+        (("rna.int21.dg",), partial(_parse_one, "internal_1x2", parse_6_1x2_internal_loop)),
+        (("rna.int22.dg",), partial(_parse_one, "internal_2x2", parse_6_2x2_internal_loop)),
+        (("rna.dangle.dg",), _parse_dangle),
+    ),
+    "5.8": (
+        (("triloop.dat", "tloop.dat", "hexaloop.dat"), _parse_hairpin),
+        (("stack.dat",), partial(_parse_one, "stacking", parse_58_2x2_file)),
+        (("tstack.dat",), partial(_parse_one, "terminal", parse_58_2x2_file)),
+        (("loop.dat",), _parse_loop),
+        (("int11.dat",), partial(_parse_one, "internal_1x1", parse_58_1x1_internal_loop)),
+        (("int21.dat",), partial(_parse_one, "internal_1x2", parse_58_1x2_internal_loop)),
+        (("int22.dat",), partial(_parse_one, "internal_2x2", parse_58_2x2_internal_loop)),
+        (("dangle.dat",), _parse_dangle),
+    ),
+}
+
+FORMATS = tuple(_SOURCES)
+
+
+def detect_format(inp: Path) -> str:
+    """Detects the RNAstructure data table layout of a directory from its file names."""
+    for fmt, sources in _SOURCES.items():
+        if all((inp / name).is_file() for files, _ in sources for name in files):
+            return fmt
+    raise ValueError(f"{inp} does not contain RNAstructure {' or '.join(FORMATS)} data tables.")
+
+
+def num_sources(fmt: str) -> int:
+    return len(_SOURCES[fmt])
+
+
+def parse_source(inp: Path, fmt: str, idx: int) -> dict[str, Any]:
+    files, parse = _SOURCES[fmt][idx]
+    return parse(*((inp / name).read_text() for name in files))
+
+
+def parse_rnastructure_tables(inp: Path, fmt: str | None = None) -> EnergyTables:
+    fmt = fmt or detect_format(inp)
+    parts: dict[str, Any] = {}
+    for idx in range(num_sources(fmt)):
+        parts |= parse_source(inp, fmt, idx)
+    return EnergyTables(**parts)
+
+
+def parse_rnastructure_58_tables(inp: Path) -> EnergyTables:
+    return parse_rnastructure_tables(inp, "5.8")
+
+
+def parse_rnastructure_6_tables(inp: Path) -> EnergyTables:
+    return parse_rnastructure_tables(inp, "6")
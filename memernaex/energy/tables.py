@@ -0,0 +1,155 @@
+# Copyright 2026 Eliot Courtney.
+import functools
+import itertools
+import uuid
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+MAX = 0x0F0F0F0F
+ORDER = "ACGU"
+BASE_IDX = {b: i for i, b in enumerate(ORDER)}
+
+Table = npt.NDArray[np.float64]
+
+
+def new_table(ndim: int) -> Table:
+    return np.full((len(ORDER),) * ndim, np.nan)
+
+
+@dataclass(kw_only=True)
+class EnergyTables:
+    """Energy tables as float64 arrays with one axis per nucleotide, in ORDER.
+
+    Entries the source does not define are NaN and infinite entries are MAX. Initiation
+    tables are indexed by loop length instead of nucleotide.
+    """
+
+    hairpin: dict[str, float]
+    stacking: Table
+    terminal: Table
+    internal_initiation: Table
+    bulge_initiation: Table
+    hairpin_initiation: Table
+    internal_1x1: Table
+    internal_1x2: Table
+    internal_2x2: Table
+    dangle3: Table
+    dangle5: Table
+
+    def arrays(self) -> dict[str, Table]:
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "hairpin"}
+
+
+LENGTH_TABLES = ("internal_initiation", "bulge_initiation", "hairpin_initiation")
+NUC_TABLE_NDIM = {
+    "stacking": 4,
+    "terminal": 4,
+    "internal_1x1": 6,
+    "internal_1x2": 7,
+    "internal_2x2": 8,
+    "dangle3": 3,
+    "dangle5": 3,
+}
+
+# Maps ASCII codes of ORDER to their index, and everything else to -1.
+_CODE_IDX = np.full(256, -1, dtype=np.int64)
+_CODE_IDX[np.frombuffer(ORDER.encode(), dtype=np.uint8)] = np.arange(len(ORDER))
+
+
+@functools.cache
+def nuc_keys(ndim: int) -> npt.NDArray[np.str_]:
+    # itertools.product enumerates in the same order as a C-order ravel.
+    return np.array(["".join(p) for p in itertools.product(ORDER, repeat=ndim)])
+
+
+def _format_value(val: float) -> str:
+    return "MAX" if val == MAX else str(val)
+
+
+def _format_lines(keys: npt.NDArray[np.str_], vals: Table) -> str:
+    # Format each distinct value once and build the lines with vectorized string ops.
+    uniq, inv = np.unique(vals, return_inverse=True)
+    suffixes = np.array([f" {_format_value(v)}\n" for v in uniq.tolist()], dtype=np.str_)
+    return "".join(np.char.add(keys, suffixes[inv]).tolist())
+
+
+def format_nuc_table(table: Table) -> str:
+    flat = table.ravel()
+    mask = ~np.isnan(flat)
+    return _format_lines(nuc_keys(table.ndim)[mask], flat[mask])
+
+
+def format_length_table(table: Table) -> str:
+    idx = np.flatnonzero(~np.isnan(table))
+    return _format_lines(idx.astype(str), table[idx])
+
+
+def format_map_table(table: dict[str, float]) -> str:
+    return "".join(f"{k} {_format_value(v)}\n" for k, v in table.items())
+
+
+def to_data_texts(tables: EnergyTables) -> dict[str, str]:
+    """Serializes each table into memerna's .data text format, keyed by table name."""
+    texts = {"hairpin": format_map_table(tables.hairpin)}
+    for name, table in tables.arrays().items():
+        texts[name] = (
+            format_length_table(table) if name in LENGTH_TABLES else format_nuc_table(table)
+        )
+    return texts
+
+
+def table_keys(name: str, table: Table) -> npt.NDArray[np.str_]:
+    """Returns the .data key of every entry of `table`, in C order."""
+    if name in LENGTH_TABLES:
+        return np.arange(len(table)).astype(str)
+    return nuc_keys(table.ndim)
+
+
+def _read_data_text(text: str) -> tuple[list[str], Table]:
+    tokens = text.split()
+    vals = np.array([MAX if v == "MAX" else float(v) for v in tokens[1::2]], dtype=np.float64)
+    return tokens[0::2], vals
+
+
+def read_data_files(inp: Path) -> EnergyTables:
+    """Reads tables back from the .data text files written by write_data_files."""
+    parts: dict[str, Any] = {}
+    keys, vals = _read_data_text((inp / "hairpin.data").read_text())
+    parts["hairpin"] = dict(zip(keys, vals.tolist(), strict=True))
+    for f in fields(EnergyTables):
+        if f.name == "hairpin":
+            continue
+        keys, vals = _read_data_text((inp / f"{f.name}.data").read_text())
+        if f.name in LENGTH_TABLES:
+            lengths = np.array(keys, dtype=np.int64)
+            table = np.full(lengths.max(initial=-1) + 1, np.nan)
+            table[lengths] = vals
+        else:
+            ndim = NUC_TABLE_NDIM[f.name]
+            codes = np.frombuffer("".join(keys).encode(), dtype=np.uint8).reshape(-1, ndim)
+            idx = _CODE_IDX[codes]
+            if (idx < 0).any():
+                raise ValueError(f"Invalid key in {inp / f'{f.name}.data'}.")
+            table = new_table(ndim)
+            table[tuple(idx.T)] = vals
+        parts[f.name] = table
+    return EnergyTables(**parts)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Writes via a temporary file in the same directory so readers never see a partial file."""
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def write_data_files(tables: EnergyTables, out: Path) -> None:
+    for name, text in to_data_texts(tables).items():
+        write_atomic(out / f"{name}.data", text.encode())
@@ -4,12 +4,15 @@ from pathlib import Path
 import polars as pl
 from matplotlib import ticker
 from rnapy.util.format import human_size
-from scipy.stats import ttest_rel
 
 from memernaex.analysis.data import Var, read_var_data
+from memernaex.analysis.resampling import resample_comparisons
+from memernaex.analysis.stats import paired_t_test
 from memernaex.plot.plots import plot_mean_quantity
 from memernaex.plot.util import save_figure, set_style
 
+METRICS = ["ppv", "sensitivity", "f1"]
+
 
 class FoldAccuracyPlotter:
     VAR_NAME = Var(id="name", name="Name", dtype=pl.String)
@@ -28,10 +31,27 @@ class FoldAccuracyPlotter:
     VAR_PROGRAM = Var(id="program", name="Program", dtype=pl.String)
     df: pl.DataFrame
     output_dir: Path
+    resamples: int
+    alpha: float
+    seed: int
+    jobs: int
 
-    def __init__(self, input_path: Path, output_dir: Path) -> None:
+    def __init__(
+        self,
+        input_path: Path,
+        output_dir: Path,
+        *,
+        resamples: int = 10000,
+        alpha: float = 0.05,
+        seed: int = 0,
+        jobs: int = 1,
+    ) -> None:
         self.df = read_var_data(self.__class__, input_path)
         self.output_dir = output_dir
+        self.resamples = resamples
+        self.alpha = alpha
+        self.seed = seed
+        self.jobs = jobs
         set_style()
 
     def _path(self, plot_name: str) -> Path:
@@ -43,43 +63,95 @@ class FoldAccuracyPlotter:
             f = plot_mean_quantity(df, self.VAR_PROGRAM, self.VAR_LENGTH, y_var)
             save_figure(f, self._path(f"{dataset_name}_{y_var.id}"))
 
-    def _get_parent_rnas(self, df: pl.DataFrame) -> list[str]:
-        domained = df.filter(df["name"].str.contains("(?i)domain"))["name"].to_list()
-        parents = set()
-        for name in domained:
-            parent = "_".join(name.split("_")[:-1])
-            if parent not in df["name"].to_list():
-                raise ValueError(f"Parent {parent} not found in dataframe.")
-            parents.add(parent)
-        return list(parents)
+    def _get_parent_rnas(self, df: pl.DataFrame) -> pl.DataFrame:
+        """Returns the dataset and name of every RNA that is split into domains in `df`."""
+        parents = (
+            df.filter(pl.col("name").str.contains("(?i)domain"))
+            .select(
+                pl.col("dataset"),
+                pl.col("name").str.extract(r"^(.*)_[^_]*$").fill_null("").alias("name"),
+            )
+            .unique()
+        )
+        missing = parents.join(df.select("dataset", "name"), on=["dataset", "name"], how="anti")
+        if len(missing):
+            raise ValueError(f"Parent {missing['name'][0]} not found in dataframe.")
+        return parents
 
     def _filter_df(self, df: pl.DataFrame) -> pl.DataFrame:
-        parents = self._get_parent_rnas(df)
-        return df.filter(~df["name"].is_in(parents))
+        return df.join(self._get_parent_rnas(df), on=["dataset", "name"], how="anti")
 
-    def run(self) -> None:
-        for group, df in self.df.group_by("dataset"):
-            dataset_name = str(group[0])
-            print(f"Dataset: {dataset_name}")
-            filtered_df = self._filter_df(df)
-            for program_name, program_df in filtered_df.group_by("program"):
-                print(f"dataset {dataset_name} program {program_name}")
-                for var in ["ppv", "sensitivity", "f1"]:
-                    means = program_df.group_by("family").mean()[var]
-                    print(means)
-                    print(means.mean())
-                print()
+    def _average_repeats(self, df: pl.DataFrame) -> pl.DataFrame:
+        """Averages the metrics of RNAs scored more than once for a program, such as from
+        concatenated score files, since the paired comparisons need one result per RNA."""
+        keys = ["dataset", "program", "family", "name"]
+        repeats = df.filter(pl.len().over(keys) > 1)
+        if repeats.is_empty():
+            return df
+        example = repeats.row(0, named=True)
+        print(
+            f"Averaging {len(repeats)} rows that repeat an RNA of a program, e.g. "
+            f"{example['program']} on {example['name']} in {example['dataset']}."
+        )
+        return df.group_by(keys, maintain_order=True).agg(
+            pl.col(METRICS).mean(), pl.exclude(*keys, *METRICS).first()
+        )
+
+    def _family_metrics(self, df: pl.DataFrame) -> tuple[pl.DataFrame, pl.DataFrame]:
+        family = (
+            df.group_by("dataset", "program", "family")
+            .agg(pl.len().alias("n"), pl.col(METRICS).mean())
+            .sort("dataset", "program", "family")
+        )
+        # Macro average: each family counts equally regardless of its size.
+        macro = (
+            family.group_by("dataset", "program")
+            .agg(pl.len().alias("families"), pl.col("n").sum(), pl.col(METRICS).mean())
+            .sort("dataset", "program")
+        )
+        return family, macro
 
-            df1 = self._filter_df(df.filter(pl.col("program") == "memerna-t04p2-TODO"))
-            df2 = self._filter_df(df.filter(pl.col("program") == "memerna-t22p2-TODO"))
-            df1_by_family = dict(df1.group_by("family"))
-            df2_by_family = dict(df2.group_by("family"))
-            families = set(df1_by_family.keys()).intersection(df2_by_family.keys())
-            for var in ["ppv", "sensitivity", "f1"]:
-                print(f"paired t-tests for {var}:")
-                for family in families:
-                    d1 = df1_by_family[family][var].to_numpy()
-                    d2 = df2_by_family[family][var].to_numpy()
-                    t_statistic, p_value = ttest_rel(d1, d2)
-                    print(f"Family {family}: t-statistic={t_statistic}, p-value={p_value}")
-                print()
+    def _compare_programs(self, df: pl.DataFrame) -> pl.DataFrame:
+        """Paired t-tests on per RNA differences for every pair of programs, family and
+        metric, as one tidy table."""
+        long = df.unpivot(
+            on=METRICS, index=["dataset", "program", "name", "family"], variable_name="metric"
+        )
+        pairs = (
+            long.join(long, on=["dataset", "name", "family", "metric"], suffix="_b")
+            .filter(pl.col("program") < pl.col("program_b"))
+            .rename({"program": "program_a"})
+        )
+        groups = (
+            pairs.group_by("dataset", "program_a", "program_b", "family", "metric")
+            .agg(
+                pl.len().alias("n"),
+                (pl.col("value") - pl.col("value_b")).mean().alias("mean_diff"),
+                (pl.col("value") - pl.col("value_b")).std().alias("std"),
+            )
+            .sort("dataset", "program_a", "program_b", "metric", "family")
+        )
+        t, p = paired_t_test(
+            groups["n"].to_numpy(), groups["mean_diff"].to_numpy(), groups["std"].to_numpy()
+        )
+        return groups.drop("std").with_columns(pl.Series("t", t), pl.Series("p", p))
+
+    def run(self) -> None:
+        df = self._average_repeats(self._filter_df(self.df))
+        family, macro = self._family_metrics(df)
+        comparisons = self._compare_programs(df)
+        resampled = resample_comparisons(
+            df,
+            metrics=METRICS,
+            resamples=self.resamples,
+            alpha=self.alpha,
+            seed=self.seed,
+            jobs=self.jobs,
+        )
+        family.write_csv(self.output_dir / "family_accuracy.csv")
+        macro.write_csv(self.output_dir / "macro_accuracy.csv")
+        comparisons.write_csv(self.output_dir / "program_comparisons.csv")
+        resampled.write_csv(self.output_dir / "program_resampling.csv")
+        with pl.Config(tbl_rows=-1, tbl_cols=-1):
+            print(macro)
+            print(resampled)
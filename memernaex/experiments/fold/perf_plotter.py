@@ -5,12 +5,14 @@ import polars as pl
 from matplotlib import ticker
 from rnapy.util.format import human_size
 
+from memernaex.analysis.aggregate import Aggregation, aggregate
 from memernaex.analysis.data import Var, read_var_data
 from memernaex.plot.plots import plot_mean_log_quantity, plot_mean_quantity
 from memernaex.plot.util import save_figure, set_style
 
 
 class FoldPerfPlotter:
+    VAR_DATASET = Var(id="dataset", name="Dataset", dtype=pl.String)
     VAR_NAME = Var(id="name", name="Name", dtype=pl.String)
     VAR_LENGTH = Var(id="length", name="Length (nuc)", dtype=pl.Int64)
     VAR_REAL_SEC = Var(id="real_sec", name="Wall time (s)", dtype=pl.Float64)
@@ -23,12 +25,19 @@ class FoldPerfPlotter:
         formatter=ticker.FuncFormatter(lambda x, _: human_size(x, False)),
     )
     VAR_PROGRAM = Var(id="program", name="Program", dtype=pl.String)
+    VAR_RUN_IDX = Var(id="run_idx", name="Run Index", dtype=pl.Int64)
+    # Identifies a record, so records read twice can be dropped.
+    RUN_KEYS = (VAR_DATASET.id, VAR_PROGRAM.id, VAR_NAME.id, VAR_RUN_IDX.id)
     df: pl.DataFrame
     output_dir: Path
+    aggregation: Aggregation
 
-    def __init__(self, input_path: Path, output_dir: Path) -> None:
+    def __init__(
+        self, input_path: Path, output_dir: Path, aggregation: Aggregation | None = None
+    ) -> None:
         self.df = read_var_data(self.__class__, input_path)
         self.output_dir = output_dir
+        self.aggregation = aggregation or Aggregation()
         set_style()
 
     def _path(self, name: str) -> Path:
@@ -37,23 +46,56 @@ class FoldPerfPlotter:
     def _plot_quantity(self, df: pl.DataFrame, name: str) -> None:
         y_vars = [self.VAR_REAL_SEC, self.VAR_MAXRSS_BYTES]
         for y_var in y_vars:
-            f = plot_mean_quantity(df, self.VAR_PROGRAM, self.VAR_LENGTH, y_var)
+            f = plot_mean_quantity(
+                df, self.VAR_PROGRAM, self.VAR_LENGTH, y_var, aggregation=self.aggregation
+            )
             save_figure(f, self._path(name + y_var.id))
 
+    def _plot_dataset(self, dataset_name: str, df: pl.DataFrame) -> None:
+        self._plot_quantity(df, dataset_name)
+
+        # Also plot random dataset without RNAstructure and ViennaRNA-d3
+        if dataset_name == "random":
+            subset_df = df.filter(
+                ~pl.col("program").is_in(["RNAstructure", "ViennaRNA-d3", "ViennaRNA-d3-noLP"])
+            )
+            self._plot_quantity(subset_df, f"{dataset_name}_subset_")
+
+        y_vars = [self.VAR_REAL_SEC, self.VAR_MAXRSS_BYTES]
+        for y_var in y_vars:
+            f = plot_mean_log_quantity(
+                df, self.VAR_PROGRAM, self.VAR_LENGTH, y_var, aggregation=self.aggregation
+            )
+            save_figure(f, self._path(f"{dataset_name}_{y_var.id}_log"))
+
+    def _report_noisy(self) -> None:
+        keys = [self.VAR_DATASET.id, self.VAR_PROGRAM.id, self.VAR_LENGTH.id]
+        values = [self.VAR_REAL_SEC.id, self.VAR_MAXRSS_BYTES.id]
+        df = aggregate(self.df, keys, values, self.aggregation)
+        noisy = df.filter(pl.col("noisy"))
+        if len(noisy):
+            # Cells to re-run: repeats disagree by more than the CV threshold.
+            print(f"{len(noisy)} of {len(df)} cells are noisy, see noisy_cells.csv")
+            noisy.sort(keys).write_csv(self.output_dir / "noisy_cells.csv")
+
+    def update(self, df: pl.DataFrame, reset: bool) -> None:
+        """Adds newly appended records, or replaces all records on reset, and re-plots only
+        the datasets they touch, since every figure is of one dataset."""
+        if reset:
+            self.df = df
+        else:
+            # Records read just before watching started may be read again.
+            df = df.join(self.df, on=self.RUN_KEYS, how="anti")
+            self.df = pl.concat([self.df, df], how="diagonal_relaxed")
+        datasets = sorted(df["dataset"].unique().to_list())
+        for dataset_name in datasets:
+            self._plot_dataset(dataset_name, self.df.filter(pl.col("dataset") == dataset_name))
+        if datasets:
+            print(f"Updated {len(datasets)} datasets with {len(df)} records: {datasets}")
+            self._report_noisy()
+
     def run(self) -> None:
         # Plot quantities
         for group, df in self.df.group_by("dataset"):
-            dataset_name = str(group[0])
-            self._plot_quantity(df, dataset_name)
-
-            # Also plot random dataset without RNAstructure and ViennaRNA-d3
-            if dataset_name == "random":
-                subset_df = df.filter(
-                    ~pl.col("program").is_in(["RNAstructure", "ViennaRNA-d3", "ViennaRNA-d3-noLP"])
-                )
-                self._plot_quantity(subset_df, f"{dataset_name}_subset_")
-
-            y_vars = [self.VAR_REAL_SEC, self.VAR_MAXRSS_BYTES]
-            for y_var in y_vars:
-                f = plot_mean_log_quantity(df, self.VAR_PROGRAM, self.VAR_LENGTH, y_var)
-                save_figure(f, self._path(f"{dataset_name}_{y_var.id}_log"))
+            self._plot_dataset(str(group[0]), df)
+        self._report_noisy()
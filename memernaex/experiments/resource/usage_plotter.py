@@ -0,0 +1,139 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+from matplotlib import pyplot as plt
+from matplotlib import ticker
+from rnapy.util.format import human_size
+
+from memernaex.analysis.data import Var
+from memernaex.benchmark.samples import read_samples
+from memernaex.plot.plots import plot_mean_quantity
+from memernaex.plot.util import get_color, save_figure, set_style, set_up_axis_2d
+
+VAR_TIME_SEC = Var(id="time_sec", name="Time (s)", dtype=pl.Float64)
+VAR_TIME_FRAC = Var(id="time_frac", name="Fraction of run time", dtype=pl.Float64)
+VAR_RSS_BYTES = Var(
+    id="rss_bytes",
+    name="RSS (B)",
+    dtype=pl.Int64,
+    formatter=ticker.FuncFormatter(lambda x, _: human_size(x, False)),
+)
+VAR_CPU_UTIL = Var(id="cpu_util", name="CPU utilization (cores)", dtype=pl.Float64)
+VAR_PEAK_TIME_FRAC = Var(id="peak_time_frac", name="Peak RSS time fraction", dtype=pl.Float64)
+VAR_PROGRAM = Var(id="program", name="Program", dtype=pl.String)
+VAR_LENGTH = Var(id="length", name="Length (nuc)", dtype=pl.Int64)
+
+# Column names of the fold and subopt benchmark schemas, normalized to program and length.
+_SCHEMA_COLUMNS = {"fold": ("program", "length"), "subopt": ("package_name", "rna_length")}
+_RUN_KEYS = [VAR_PROGRAM.id, VAR_LENGTH.id, "dataset", "name", "run_idx"]
+
+
+class ResourceUsagePlotter:
+    df: pl.DataFrame
+    output_dir: Path
+    max_lengths: int
+
+    def __init__(self, input_path: Path, output_dir: Path, max_lengths: int = 6) -> None:
+        self.output_dir = output_dir
+        self.max_lengths = max_lengths
+
+        records = pl.read_ndjson(input_path)
+        schema = "fold" if "program" in records.columns else "subopt"
+        program, length = _SCHEMA_COLUMNS[schema]
+        name = "name" if schema == "fold" else "rna_name"
+        records = records.filter(~pl.col("failed")).select(
+            pl.col(program).cast(pl.String).alias(VAR_PROGRAM.id),
+            pl.col(length).cast(pl.Int64).alias(VAR_LENGTH.id),
+            pl.col("dataset").cast(pl.String),
+            pl.col(name).cast(pl.String).alias("name"),
+            pl.col("run_idx").cast(pl.Int64),
+            # Absent if no run was sampled.
+            pl.col("^samples_path$"),
+        )
+
+        df = read_samples(records, input_path.parent, _RUN_KEYS).sort([*_RUN_KEYS, "time_sec"])
+        self.df = df.with_columns(
+            (pl.col("time_sec") / pl.col("time_sec").max().over(_RUN_KEYS)).alias(VAR_TIME_FRAC.id),
+            (pl.col("cpu_sec").diff() / pl.col("time_sec").diff())
+            .over(_RUN_KEYS)
+            .alias(VAR_CPU_UTIL.id),
+        )
+        set_style()
+
+    def _path(self, name: str) -> Path:
+        return self.output_dir / f"{name}.png"
+
+    def _plot_runs(self, df: pl.DataFrame, x: Var, color_by: Var, title: str, path: Path) -> None:
+        f, axes = plt.subplots(2, sharex=True)
+        lengths = df[VAR_LENGTH.id].unique().sort()
+        cmap = plt.get_cmap("viridis")
+        labelled = set()
+        for run_key, run_df in df.group_by(_RUN_KEYS, maintain_order=True):
+            program, length = str(run_key[0]), int(run_key[1])
+            if color_by == VAR_PROGRAM:
+                label, color = program, get_color(program)
+            else:
+                label = str(length)
+                pos = int(np.searchsorted(lengths.to_numpy(), length))
+                color = cmap(pos / max(len(lengths) - 1, 1))
+            kwargs = {"color": color, "alpha": 0.7, "linewidth": 1.0}
+            if label not in labelled:
+                kwargs["label"] = label
+                labelled.add(label)
+            axes[0].plot(run_df[x.id], run_df[VAR_RSS_BYTES.id], **kwargs)
+            axes[1].plot(run_df[x.id], run_df[VAR_CPU_UTIL.id], **kwargs)
+        set_up_axis_2d(axes[0], (x, VAR_RSS_BYTES))
+        set_up_axis_2d(axes[1], (x, VAR_CPU_UTIL), legend=False)
+        axes[0].set_xlabel("")
+        f.suptitle(title)
+        f.set_size_inches(8, 6)
+        save_figure(f, path)
+
+    def _plot_by_length(self) -> None:
+        lengths = self.df[VAR_LENGTH.id].unique().sort()
+        if len(lengths) > self.max_lengths:
+            idx = np.linspace(0, len(lengths) - 1, self.max_lengths).round().astype(int)
+            lengths = lengths.gather(np.unique(idx))
+        for length in lengths:
+            df = self.df.filter(pl.col(VAR_LENGTH.id) == length)
+            self._plot_runs(
+                df,
+                VAR_TIME_SEC,
+                VAR_PROGRAM,
+                f"Length {length}",
+                self._path(f"usage_length_{length}"),
+            )
+
+    def _plot_by_program(self) -> None:
+        for (program,), df in self.df.group_by(VAR_PROGRAM.id):
+            self._plot_runs(
+                df, VAR_TIME_FRAC, VAR_LENGTH, str(program), self._path(f"usage_{program}")
+            )
+
+    def _peaks(self) -> pl.DataFrame:
+        # Where in each run the peak happens separates DP fill, traceback and output phases.
+        return (
+            self.df.group_by(_RUN_KEYS)
+            .agg(
+                pl.col(VAR_RSS_BYTES.id).max().alias("peak_rss_bytes"),
+                pl.col(VAR_TIME_FRAC.id)
+                .get(pl.col(VAR_RSS_BYTES.id).arg_max())
+                .alias(VAR_PEAK_TIME_FRAC.id),
+                pl.col(VAR_TIME_SEC.id).max().alias("real_sec"),
+                pl.len().alias("samples"),
+            )
+            .sort(_RUN_KEYS)
+        )
+
+    def run(self) -> None:
+        if self.df.is_empty():
+            print("No samples found. Run the benchmark with --sample-interval.")
+            return
+        self._plot_by_length()
+        self._plot_by_program()
+        peaks = self._peaks()
+        peaks.write_csv(self.output_dir / "peak_rss.csv")
+        f = plot_mean_quantity(peaks, VAR_PROGRAM, VAR_LENGTH, VAR_PEAK_TIME_FRAC)
+        save_figure(f, self._path("peak_time_frac"))
@@ -0,0 +1,189 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+from matplotlib import pyplot as plt
+
+from memernaex.analysis.aggregate import Aggregation, aggregate
+from memernaex.analysis.complexity import ComplexityFitter
+from memernaex.analysis.data import Var, scan_var_data, with_vars
+from memernaex.benchmark.samples import read_emissions
+from memernaex.experiments.subopt import perf_plotter
+from memernaex.experiments.subopt.perf_plotter import (
+    GROUP_VARS,
+    VAR_FAILED,
+    VAR_PACKAGE,
+    VAR_RNA_LENGTH,
+    VAR_RNA_NAME,
+    VAR_RUN_IDX,
+)
+from memernaex.plot.plots import plot_quantity_stats, quantity_stats
+from memernaex.plot.util import get_color, save_figure, set_style, set_up_axis_2d
+
+VAR_STRUC_IDX = Var(id="struc_idx", name="Structures output", dtype=pl.Int64)
+VAR_TIME_SEC = Var(id="time_sec", name="Time (s)", dtype=pl.Float64)
+VAR_THROUGHPUT = Var(id="throughput", name="Structures per second", dtype=pl.Float64)
+VAR_FIRST_STRUC_SEC = Var(
+    id="first_struc_sec", name="Time to first structure (s)", dtype=pl.Float64
+)
+VAR_LATENCY_P50_SEC = Var(
+    id="latency_p50_sec", name="Median inter-structure latency (s)", dtype=pl.Float64
+)
+VAR_LATENCY_P99_SEC = Var(
+    id="latency_p99_sec", name="p99 inter-structure latency (s)", dtype=pl.Float64
+)
+
+LATENCY_VARS: tuple[Var, ...] = (VAR_FIRST_STRUC_SEC, VAR_LATENCY_P50_SEC, VAR_LATENCY_P99_SEC)
+
+_RUN_KEYS = [VAR_PACKAGE.id, *GROUP_VARS, VAR_RNA_NAME.id, VAR_RNA_LENGTH.id, VAR_RUN_IDX.id]
+# Fewer lengths than this do not tell complexity models apart.
+_MIN_FIT_LENGTHS = 4
+
+
+def _weighted_quantile(value: str, weight: str, q: float) -> pl.Expr:
+    order = pl.col(value).arg_sort()
+    weights = pl.col(weight).gather(order)
+    return pl.col(value).gather(order).filter(weights.cum_sum() >= q * weights.sum()).first()
+
+
+class SuboptLatencyPlotter:
+    """Analyzes when subopt runs output their structures, from the emissions run-benchmark
+    records with --emission-interval. Between two recorded points every structure is taken to
+    have the mean latency of the interval. Gaps longer than the emission interval are always
+    recorded at both ends, so latency percentiles are exact for stalls and within the
+    interval otherwise."""
+
+    df: pl.DataFrame
+    output_dir: Path
+    aggregation: Aggregation
+    max_lengths: int
+
+    def __init__(
+        self,
+        input_path: Path,
+        output_dir: Path,
+        aggregation: Aggregation | None = None,
+        max_lengths: int = 6,
+    ) -> None:
+        self.output_dir = output_dir
+        self.aggregation = aggregation or Aggregation()
+        self.max_lengths = max_lengths
+
+        lf = scan_var_data(perf_plotter, input_path).filter(~pl.col(VAR_FAILED.id))
+        records = with_vars(lf, perf_plotter, [VAR_PACKAGE.id]).collect()
+        set_style()
+        # Runs benchmarked without --emission-interval have no emissions_path.
+        if "emissions_path" not in records.columns or records["emissions_path"].is_null().all():
+            self.df = pl.DataFrame()
+            return
+        df = read_emissions(records, input_path.parent, _RUN_KEYS).sort(
+            [*_RUN_KEYS, VAR_STRUC_IDX.id]
+        )
+        self.df = df.with_columns(
+            (pl.col(VAR_STRUC_IDX.id).diff() / pl.col(VAR_TIME_SEC.id).diff())
+            .over(_RUN_KEYS)
+            .alias(VAR_THROUGHPUT.id)
+        )
+
+    def _path(self, name: str) -> Path:
+        return self.output_dir / f"{name}.png"
+
+    def metrics(self) -> pl.DataFrame:
+        """Time to first structure and inter-structure latency percentiles of each run."""
+        first = self.df.group_by(_RUN_KEYS).agg(
+            pl.col(VAR_TIME_SEC.id).first().alias(VAR_FIRST_STRUC_SEC.id),
+            pl.col(VAR_STRUC_IDX.id).last().alias("output_strucs"),
+        )
+        # Each interval between recorded points stands for as many structures as it spans.
+        intervals = self.df.with_columns(
+            pl.col(VAR_STRUC_IDX.id).diff().over(_RUN_KEYS).alias("interval_strucs"),
+            pl.col(VAR_TIME_SEC.id).diff().over(_RUN_KEYS).alias("interval_sec"),
+        ).drop_nulls("interval_strucs")
+        latencies = (
+            intervals.with_columns(
+                (pl.col("interval_sec") / pl.col("interval_strucs")).alias("latency")
+            )
+            .group_by(_RUN_KEYS)
+            .agg(
+                _weighted_quantile("latency", "interval_strucs", 0.5).alias(VAR_LATENCY_P50_SEC.id),
+                _weighted_quantile("latency", "interval_strucs", 0.99).alias(
+                    VAR_LATENCY_P99_SEC.id
+                ),
+            )
+        )
+        return first.join(latencies, on=_RUN_KEYS, how="left").sort(_RUN_KEYS)
+
+    def _plot_metrics(self, metrics: pl.DataFrame) -> None:
+        stats = quantity_stats(
+            metrics, [*GROUP_VARS, VAR_PACKAGE.id], VAR_RNA_LENGTH, LATENCY_VARS, self.aggregation
+        ).collect()
+        for group, df in stats.group_by(GROUP_VARS):
+            group_name = "_".join(str(x) for x in group)
+            for var in LATENCY_VARS:
+                f = plot_quantity_stats(df, VAR_PACKAGE, VAR_RNA_LENGTH, var)
+                save_figure(f, self._path(f"latency_{group_name}_{var.id}"))
+
+    def _plot_throughput(self, df: pl.DataFrame, title: str, path: Path) -> None:
+        f, axes = plt.subplots(2, sharex=True)
+        labelled = set()
+        for run_key, run_df in df.group_by(_RUN_KEYS, maintain_order=True):
+            package = str(run_key[0])
+            kwargs = {"color": get_color(package), "alpha": 0.7, "linewidth": 1.0}
+            if package not in labelled:
+                kwargs["label"] = package
+                labelled.add(package)
+            axes[0].plot(run_df[VAR_TIME_SEC.id], run_df[VAR_STRUC_IDX.id], **kwargs)
+            axes[1].step(run_df[VAR_TIME_SEC.id], run_df[VAR_THROUGHPUT.id], where="pre", **kwargs)
+        set_up_axis_2d(axes[0], (VAR_TIME_SEC, VAR_STRUC_IDX))
+        set_up_axis_2d(axes[1], (VAR_TIME_SEC, VAR_THROUGHPUT), legend=False)
+        axes[0].set_xlabel("")
+        f.suptitle(title)
+        f.set_size_inches(8, 6)
+        save_figure(f, path)
+
+    def _plot_throughput_by_length(self) -> None:
+        for group, group_df in self.df.group_by(GROUP_VARS):
+            group_name = "_".join(str(x) for x in group)
+            lengths = group_df[VAR_RNA_LENGTH.id].unique().sort()
+            if len(lengths) > self.max_lengths:
+                idx = np.linspace(0, len(lengths) - 1, self.max_lengths).round().astype(int)
+                lengths = lengths.gather(np.unique(idx))
+            for length in lengths:
+                self._plot_throughput(
+                    group_df.filter(pl.col(VAR_RNA_LENGTH.id) == length),
+                    f"{group_name} length {length}",
+                    self._path(f"throughput_{group_name}_length_{length}"),
+                )
+
+    def _fit_metrics(self, metrics: pl.DataFrame) -> None:
+        values = [v.id for v in LATENCY_VARS]
+        df = aggregate(
+            metrics, [*GROUP_VARS, VAR_PACKAGE.id, VAR_RNA_LENGTH.id], values, self.aggregation
+        )
+        for group, group_df in df.group_by([*GROUP_VARS, VAR_PACKAGE.id]):
+            for var in LATENCY_VARS:
+                name = "_".join(str(x) for x in group) + f"_{var.id}"
+                fit_df = group_df.drop_nulls(var.id)
+                if fit_df[VAR_RNA_LENGTH.id].n_unique() < _MIN_FIT_LENGTHS:
+                    print(f"{name}: too few lengths to fit.")
+                    continue
+                fitter = ComplexityFitter(
+                    df=fit_df.sort(VAR_RNA_LENGTH.id), xs=VAR_RNA_LENGTH, y=var
+                )
+                model, result = fitter.fit()
+                print(f"{name}: best model {model}")
+                (self.output_dir / f"{name}.txt").write_text(
+                    f"Best model: {model}\n{result.fit_report()}\n"
+                )
+                save_figure(fitter.plot(model), self._path(name))
+
+    def run(self) -> None:
+        if self.df.is_empty():
+            print("No emissions found. Run the benchmark with --emission-interval.")
+            return
+        metrics = self.metrics()
+        metrics.write_csv(self.output_dir / "latency.csv")
+        self._plot_metrics(metrics)
+        self._plot_throughput_by_length()
+        self._fit_metrics(metrics)
@@ -1,38 +1,39 @@
 # Copyright 2022 Eliot Courtney.
 import sys
 from pathlib import Path
+from types import ModuleType
 
 import polars as pl
 from matplotlib import pyplot as plt
 from matplotlib import ticker
 from rnapy.util.format import human_size
 
+from memernaex.analysis.aggregate import Aggregation, aggregate_lazy
 from memernaex.analysis.complexity import ComplexityFitter
-from memernaex.analysis.data import Var, read_var_data
-from memernaex.plot.plots import plot_mean_quantity
+from memernaex.analysis.data import Var, collect, scan_var_data, with_vars
+from memernaex.experiments.subopt.schema import (
+    GROUP_VARS,
+    PACKAGE_VARS,
+    VAR_ALGORITHM,
+    VAR_BACKEND,
+    VAR_COUNT_ONLY,
+    VAR_CTD,
+    VAR_DATASET,
+    VAR_DELTA,
+    VAR_ENERGY_MODEL,
+    VAR_LONELY_PAIRS,
+    VAR_PACKAGE,
+    VAR_PACKAGE_NAME,
+    VAR_RNA_LENGTH,
+    VAR_RNA_NAME,
+    VAR_RUN_IDX,
+    VAR_SORTED_STRUCS,
+    VAR_STRUCS,
+    VAR_TIME_SECS,
+)
+from memernaex.plot.plots import plot_quantity_stats, quantity_stats
 from memernaex.plot.util import save_figure, set_style
-
-# Package variables
-VAR_ALGORITHM = Var(id="algorithm", name="Algorithm", dtype=pl.String)
-VAR_BACKEND = Var(id="backend", name="Backend", dtype=pl.String)
-VAR_CTD = Var(id="ctd", name="CTD", dtype=pl.String)
-VAR_PACKAGE_NAME = Var(id="package_name", name="Package Name", dtype=pl.String)
-VAR_PACKAGE = Var(id="package", name="Program", dtype=pl.String, derived=True)
-
-# Group variables
-VAR_COUNT_ONLY = Var(id="count_only", name="Count Only", dtype=pl.String)
-VAR_DATASET = Var(id="dataset", name="Dataset", dtype=pl.String)
-VAR_DELTA = Var(id="delta", name="Delta", dtype=pl.String)
-VAR_ENERGY_MODEL = Var(id="energy_model", name="Energy Model", dtype=pl.String)
-VAR_LONELY_PAIRS = Var(id="lonely_pairs", name="Lonely Pairs", dtype=pl.String)
-VAR_SORTED_STRUCS = Var(id="sorted_strucs", name="Sorted Structures", dtype=pl.String)
-VAR_STRUCS = Var(id="strucs", name="Structures", dtype=pl.String)
-VAR_TIME_SECS = Var(id="time_secs", name="Time (s)", dtype=pl.String)
-
-# Independent variables
-VAR_RNA_NAME = Var(id="rna_name", name="RNA Name", dtype=pl.String)
-VAR_RNA_LENGTH = Var(id="rna_length", name="Length (nuc)", dtype=pl.Int64)
-VAR_RUN_IDX = Var(id="run_idx", name="Run Index", dtype=pl.Int64)
+from memernaex.profiling import span
 
 # Dependent variables
 VAR_OUTPUT_STRUCS = Var(id="output_strucs", name="Output Structures", dtype=pl.Int64)
@@ -49,24 +50,48 @@ VAR_FAILED = Var(id="failed", name="Failed", dtype=pl.Boolean)
 VAR_NODES = Var(id="nodes", name="Nodes", dtype=pl.Int64)
 VAR_EXPANSIONS = Var(id="expansions", name="Expansions", dtype=pl.Int64)
 VAR_STRUCS_PER_SEC = Var(
-    id="strucs_per_sec", name="Structures per second", dtype=pl.Float64, derived=True
+    id="strucs_per_sec",
+    name="Structures per second",
+    dtype=pl.Float64,
+    expr=pl.col(VAR_OUTPUT_STRUCS.id) / pl.col(VAR_REAL_SEC.id),
+)
+VAR_BASES_PER_BYTE = Var(
+    id="bases_per_byte",
+    name="Bases per byte",
+    dtype=pl.Float64,
+    expr=pl.col(VAR_OUTPUT_STRUCS.id) * pl.col(VAR_RNA_LENGTH.id) / pl.col(VAR_MAXRSS_BYTES.id),
 )
-VAR_BASES_PER_BYTE = Var(id="bases_per_byte", name="Bases per byte", dtype=pl.Float64, derived=True)
-
-PACKAGE_VARS: list[str] = [VAR_PACKAGE_NAME.id, VAR_CTD.id, VAR_ALGORITHM.id, VAR_BACKEND.id]
-
-GROUP_VARS: list[str] = [
-    VAR_COUNT_ONLY.id,
-    VAR_DATASET.id,
-    VAR_DELTA.id,
-    VAR_ENERGY_MODEL.id,
-    VAR_LONELY_PAIRS.id,
-    VAR_SORTED_STRUCS.id,
-    VAR_STRUCS.id,
-    VAR_TIME_SECS.id,
-]
 
-INDEPENDENT_VARS: list[str] = [VAR_RNA_NAME.id, VAR_RNA_LENGTH.id, VAR_RUN_IDX.id]
+# Every var of subopt records, including the run columns of schema. Importing those here also
+# keeps this module a complete var source.
+VARS: list[Var] = [
+    VAR_ALGORITHM,
+    VAR_BACKEND,
+    VAR_CTD,
+    VAR_PACKAGE_NAME,
+    VAR_PACKAGE,
+    VAR_COUNT_ONLY,
+    VAR_DATASET,
+    VAR_DELTA,
+    VAR_ENERGY_MODEL,
+    VAR_LONELY_PAIRS,
+    VAR_SORTED_STRUCS,
+    VAR_STRUCS,
+    VAR_TIME_SECS,
+    VAR_RNA_NAME,
+    VAR_RNA_LENGTH,
+    VAR_RUN_IDX,
+    VAR_OUTPUT_STRUCS,
+    VAR_MAXRSS_BYTES,
+    VAR_USER_SEC,
+    VAR_SYS_SEC,
+    VAR_REAL_SEC,
+    VAR_FAILED,
+    VAR_NODES,
+    VAR_EXPANSIONS,
+    VAR_STRUCS_PER_SEC,
+    VAR_BASES_PER_BYTE,
+]
 
 DEPENDENT_VARS: list[str] = [
     VAR_OUTPUT_STRUCS.id,
@@ -81,51 +106,123 @@ DEPENDENT_VARS: list[str] = [
 STATS_DEPENDENT_VARS: list[str] = [*DEPENDENT_VARS, VAR_NODES.id, VAR_EXPANSIONS.id]
 
 
+# Identifies a record, so records read twice can be dropped.
+RUN_KEYS: list[str] = [*PACKAGE_VARS, *GROUP_VARS, VAR_RNA_NAME.id, VAR_RUN_IDX.id]
+
+
+def _clean(lf: pl.LazyFrame) -> pl.LazyFrame:
+    return (
+        # Remove any rows with failed true.
+        lf.filter(~pl.col(VAR_FAILED.id))
+        # Remove any rows with real time less than 0.1 seconds for numeric stability.
+        .filter(pl.col(VAR_REAL_SEC.id) > 0.1)
+    )
+
+
 class SuboptPerfPlotter:
-    df: pl.DataFrame
+    """With `streaming`, records are never held in memory. Each query streams through the
+    input and materializes only its aggregated cells, so peak memory is bounded by the
+    number of cells, plus the repeats of one cell for the median, trimmed and mad
+    aggregations, rather than by the input size."""
+
+    # None when streaming, in which case queries scan the input.
+    df: pl.DataFrame | None
+    scan: pl.LazyFrame
     is_stats: bool
     output_dir: Path
+    aggregation: Aggregation
+    streaming: bool
 
-    def __init__(self, input_path: Path, output_dir: Path, is_stats: bool) -> None:
+    def __init__(
+        self,
+        input_path: Path,
+        output_dir: Path,
+        is_stats: bool,
+        aggregation: Aggregation | None = None,
+        *,
+        streaming: bool = False,
+    ) -> None:
         self.output_dir = output_dir
         self.is_stats = is_stats
-        self.df = read_var_data(sys.modules[type(self).__module__], input_path)
-
-        # Remove any rows with failed true.
-        self.df = self.df.filter(~pl.col(VAR_FAILED.id))
-
-        # Remove any rows with real time less than 0.1 seconds for numeric stability.
-        self.df = self.df.filter(pl.col(VAR_REAL_SEC.id) > 0.1)
-
-        # Add column for program identifier.
-        self.df = self.df.with_columns(
-            pl.format("{}-{}-{}-{}", *PACKAGE_VARS).alias(VAR_PACKAGE.id),
-            (pl.col(VAR_OUTPUT_STRUCS.id) / pl.col(VAR_REAL_SEC.id)).alias(VAR_STRUCS_PER_SEC.id),
-            (
-                pl.col(VAR_OUTPUT_STRUCS.id)
-                * pl.col(VAR_RNA_LENGTH.id)
-                / pl.col(VAR_MAXRSS_BYTES.id)
-            ).alias(VAR_BASES_PER_BYTE.id),
-        )
+        self.aggregation = aggregation or Aggregation()
+        self.streaming = streaming
+        self.scan = _clean(scan_var_data(self._vars(), input_path))
+        self.df = None
+        if not streaming:
+            with span("read_var_data", cat="io", path=str(input_path)) as s:
+                self.df = self.scan.collect()
+                s.rows = len(self.df)
 
         set_style()
 
+    def _vars(self) -> ModuleType:
+        return sys.modules[type(self).__module__]
+
     def _path(self, name: str) -> Path:
         return self.output_dir / f"{name}.png"
 
-    def _plot_quantity(self, name: str) -> None:
-        for group, df in self.df.group_by(GROUP_VARS):
+    def _query(self, ids: list[str], within: pl.DataFrame | None = None) -> pl.LazyFrame:
+        """The records with the derived vars in `ids` computed, optionally only those that
+        match a row of `within`."""
+        lf = self.scan if self.df is None else self.df.lazy()
+        if within is not None:
+            lf = lf.join(within.lazy(), on=within.columns, how="semi")
+        return with_vars(lf, self._vars(), ids)
+
+    def _aggregate(self, values: list[str], packages: pl.DataFrame | None = None) -> pl.DataFrame:
+        with span("aggregate", cat="aggregate", method=self.aggregation.method) as s:
+            df = collect(
+                aggregate_lazy(
+                    self._query(values, packages),
+                    PACKAGE_VARS + GROUP_VARS + [VAR_RNA_LENGTH.id],
+                    values,
+                    self.aggregation,
+                ),
+                streaming=self.streaming,
+            )
+            s.rows = len(df)
+        noisy = df.filter(pl.col("noisy"))
+        if len(noisy) and packages is None:
+            # Cells to re-run: repeats disagree by more than the CV threshold.
+            print(f"{len(noisy)} of {len(df)} cells are noisy, see noisy_cells.csv")
+            noisy.sort(PACKAGE_VARS + GROUP_VARS + [VAR_RNA_LENGTH.id]).write_csv(
+                self.output_dir / "noisy_cells.csv"
+            )
+        return df
+
+    def _plot_quantity(self, name: str, groups: pl.DataFrame | None = None) -> None:
+        y_vars = (VAR_STRUCS_PER_SEC, VAR_BASES_PER_BYTE, VAR_MAXRSS_BYTES)
+        # One pass computes the cells of every figure.
+        with span("quantity_stats", cat="aggregate") as s:
+            stats = collect(
+                quantity_stats(
+                    self._query([VAR_PACKAGE.id] + [v.id for v in y_vars], groups),
+                    [*GROUP_VARS, VAR_PACKAGE.id],
+                    VAR_RNA_LENGTH,
+                    y_vars,
+                    self.aggregation,
+                ),
+                streaming=self.streaming,
+            )
+            s.rows = len(stats)
+        for group, df in stats.group_by(GROUP_VARS):
             group_name = "_".join(str(x) for x in group)
-            y_vars = [VAR_STRUCS_PER_SEC, VAR_BASES_PER_BYTE, VAR_MAXRSS_BYTES]
             for y_var in y_vars:
-                f = plot_mean_quantity(df, VAR_PACKAGE, VAR_RNA_LENGTH, y_var)
+                f = plot_quantity_stats(df, VAR_PACKAGE, VAR_RNA_LENGTH, y_var)
                 save_figure(f, self._path(f"{name}_{group_name}_{y_var.id}"))
 
-    def _analyze_complexity(self) -> None:
-        # Average all dependent variables.
-        df = self.df.group_by(PACKAGE_VARS + GROUP_VARS + [VAR_RNA_LENGTH.id]).agg(
-            pl.col(DEPENDENT_VARS).mean()
-        )
+    def _analyze_complexity(
+        self,
+        values: list[str],
+        dependents: list[Var],
+        *,
+        packages: pl.DataFrame | None = None,
+        save: bool = False,
+    ) -> None:
+        """Fits complexity models of each dependent per package. Shows each fit, or with
+        `save` writes its figure and report to the output directory."""
+        # Aggregate repeats of all dependent variables.
+        df = self._aggregate(values, packages)
 
         # Filter out rows with RNA length less than 100 to avoid noise.
         # Just a heuristic.
@@ -137,7 +234,7 @@ class SuboptPerfPlotter:
         for group, group_df in df.group_by(PACKAGE_VARS):
             for split_var in [VAR_DELTA, VAR_STRUCS]:
                 split_df = group_df.filter(pl.col(split_var.id).str.len_chars() > 0)
-                for dependent in [VAR_REAL_SEC, VAR_MAXRSS_BYTES]:
+                for dependent in dependents:
                     group_name = (
                         "_".join(str(x) for x in group) + f"_{split_var.id}" + f"_{dependent.id}"
                     )
@@ -150,51 +247,52 @@ class SuboptPerfPlotter:
                     )
                     name, result = fitter.fit()
                     print(f"Best model: {name}")
+                    if save:
+                        (self.output_dir / f"{group_name}.txt").write_text(
+                            f"Best model: {name}\n{result.fit_report()}\n"
+                        )
+                        save_figure(fitter.plot(name), self._path(group_name))
+                        continue
                     print(result.fit_report())
                     print()
                     f = fitter.plot(name)
                     f.show()
                     plt.show(block=True)
 
-    def _analyze_stats(self) -> None:
-        # Average all dependent variables.
-        df = self.df.group_by(PACKAGE_VARS + GROUP_VARS + [VAR_RNA_LENGTH.id]).agg(
-            pl.col(STATS_DEPENDENT_VARS).mean()
-        )
-
-        # Filter out rows with RNA length less than 100 to avoid noise.
-        # Just a heuristic.
-        df = df.filter(pl.col(VAR_RNA_LENGTH.id) >= 100)
+    def _fit_vars(self) -> tuple[list[str], list[Var]]:
+        if self.is_stats:
+            return STATS_DEPENDENT_VARS, [VAR_NODES, VAR_EXPANSIONS, VAR_OUTPUT_STRUCS]
+        return DEPENDENT_VARS, [VAR_REAL_SEC, VAR_MAXRSS_BYTES]
 
-        # Filter out rows with no structures generated.
-        df = df.filter(pl.col(VAR_OUTPUT_STRUCS.id) > 0)
+    def render(self, records: pl.DataFrame | None = None) -> None:
+        """Writes the quantity figures and complexity fits that depend on `records`, by
+        default all of them. Figures are per group and fits per package."""
+        groups = packages = None
+        if records is not None:
+            groups = records.select(GROUP_VARS).unique()
+            packages = records.select(PACKAGE_VARS).unique()
+        self._plot_quantity("quantity", groups)
+        self._analyze_complexity(*self._fit_vars(), packages=packages, save=True)
 
-        for group, group_df in df.group_by(PACKAGE_VARS):
-            for split_var in [VAR_DELTA, VAR_STRUCS]:
-                split_df = group_df.filter(pl.col(split_var.id).str.len_chars() > 0)
-                for dependent in [VAR_NODES, VAR_EXPANSIONS, VAR_OUTPUT_STRUCS]:
-                    group_name = (
-                        "_".join(str(x) for x in group) + f"_{split_var.id}" + f"_{dependent.id}"
-                    )
-                    print(group_name)
-                    if len(split_df) == 0:
-                        print("No data for this group.")
-                        continue
-                    fitter = ComplexityFitter(
-                        df=split_df, xs=(VAR_RNA_LENGTH, split_var), y=dependent
-                    )
-                    name, result = fitter.fit()
-                    print(f"Best model: {name}")
-                    print(result.fit_report())
-                    print()
-                    f = fitter.plot(name)
-                    f.show()
-                    plt.show(block=True)
+    def update(self, df: pl.DataFrame, reset: bool) -> None:
+        """Adds newly appended records, or replaces all records on reset, and re-renders only
+        the figures and fits of the groups and packages they touch."""
+        df = _clean(df.lazy()).collect()
+        if self.df is None:
+            # Queries scan the input, so they already see the new records.
+            self.render(None if reset else df)
+            return
+        if reset:
+            self.df = df
+            self.render()
+            return
+        # Records read just before watching started may be read again.
+        df = df.join(self.df, on=RUN_KEYS, how="anti")
+        if df.is_empty():
+            return
+        self.df = pl.concat([self.df, df], how="diagonal_relaxed")
+        self.render(df)
 
     def run(self) -> None:
         # self._plot_quantity("quantity")
-        # self._analyze_complexity()
-        if self.is_stats:
-            self._analyze_stats()
-        else:
-            self._analyze_complexity()
+        self._analyze_complexity(*self._fit_vars())
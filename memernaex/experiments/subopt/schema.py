@@ -0,0 +1,50 @@
+# Copyright 2026 Eliot Courtney.
+# Columns identifying a subopt benchmark run, apart from the plotting stack so that code which
+# only needs the column names does not import it.
+import polars as pl
+
+from memernaex.analysis.data import Var
+
+# Package variables
+VAR_ALGORITHM = Var(id="algorithm", name="Algorithm", dtype=pl.String)
+VAR_BACKEND = Var(id="backend", name="Backend", dtype=pl.String)
+VAR_CTD = Var(id="ctd", name="CTD", dtype=pl.String)
+VAR_PACKAGE_NAME = Var(id="package_name", name="Package Name", dtype=pl.String)
+VAR_PACKAGE = Var(
+    id="package",
+    name="Program",
+    dtype=pl.String,
+    expr=pl.format(
+        "{}-{}-{}-{}", VAR_PACKAGE_NAME.id, VAR_CTD.id, VAR_ALGORITHM.id, VAR_BACKEND.id
+    ),
+)
+
+# Group variables
+VAR_COUNT_ONLY = Var(id="count_only", name="Count Only", dtype=pl.String)
+VAR_DATASET = Var(id="dataset", name="Dataset", dtype=pl.String)
+VAR_DELTA = Var(id="delta", name="Delta", dtype=pl.String)
+VAR_ENERGY_MODEL = Var(id="energy_model", name="Energy Model", dtype=pl.String)
+VAR_LONELY_PAIRS = Var(id="lonely_pairs", name="Lonely Pairs", dtype=pl.String)
+VAR_SORTED_STRUCS = Var(id="sorted_strucs", name="Sorted Structures", dtype=pl.String)
+VAR_STRUCS = Var(id="strucs", name="Structures", dtype=pl.String)
+VAR_TIME_SECS = Var(id="time_secs", name="Time (s)", dtype=pl.String)
+
+# Independent variables
+VAR_RNA_NAME = Var(id="rna_name", name="RNA Name", dtype=pl.String)
+VAR_RNA_LENGTH = Var(id="rna_length", name="Length (nuc)", dtype=pl.Int64)
+VAR_RUN_IDX = Var(id="run_idx", name="Run Index", dtype=pl.Int64)
+
+PACKAGE_VARS: list[str] = [VAR_PACKAGE_NAME.id, VAR_CTD.id, VAR_ALGORITHM.id, VAR_BACKEND.id]
+
+GROUP_VARS: list[str] = [
+    VAR_COUNT_ONLY.id,
+    VAR_DATASET.id,
+    VAR_DELTA.id,
+    VAR_ENERGY_MODEL.id,
+    VAR_LONELY_PAIRS.id,
+    VAR_SORTED_STRUCS.id,
+    VAR_STRUCS.id,
+    VAR_TIME_SECS.id,
+]
+
+INDEPENDENT_VARS: list[str] = [VAR_RNA_NAME.id, VAR_RNA_LENGTH.id, VAR_RUN_IDX.id]
@@ -1,66 +1,120 @@
 import dataclasses
 
+import numpy as np
 import polars as pl
 import seaborn as sns
 import statsmodels.api as sm
 import statsmodels.formula.api as smf
 from matplotlib import pyplot as plt
+from matplotlib.colors import LogNorm
 from matplotlib.figure import Figure
 
-from memernaex.analysis.data import Var
+from memernaex.analysis.aggregate import Aggregation, aggregate_expr
+from memernaex.analysis.data import Var, collect
 from memernaex.plot.util import get_color, get_marker, get_subplot_grid, set_up_figure_2d
+from memernaex.profiling import traced
 
 
-def plot_mean_quantity(
-    df: pl.DataFrame, group_var: Var, x: Var, ys: tuple[Var, ...] | Var
+def quantity_stats(
+    data: pl.DataFrame | pl.LazyFrame,
+    keys: list[str],
+    x: Var,
+    ys: tuple[Var, ...],
+    aggregation: Aggregation,
+) -> pl.LazyFrame:
+    """Per cell of `keys` and `x`, each y aggregated over repeats along with its range as
+    `<y>_low` and `<y>_high`. Collecting it materializes only these cells."""
+    return (
+        data.lazy()
+        .group_by([*keys, x.id])
+        .agg(
+            *(aggregate_expr(y.id, aggregation) for y in ys),
+            *(pl.min(y.id).alias(f"{y.id}_low") for y in ys),
+            *(pl.max(y.id).alias(f"{y.id}_high") for y in ys),
+        )
+    )
+
+
+def _by_group(stats: pl.DataFrame, group_var: Var) -> list[tuple[str, pl.DataFrame]]:
+    groups = stats.sort(group_var.id).partition_by(group_var.id, as_dict=True, maintain_order=True)
+    return [(str(group[0]), group_df) for group, group_df in groups.items()]
+
+
+@traced("figure")
+def plot_quantity_stats(
+    stats: pl.DataFrame, group_var: Var, x: Var, ys: tuple[Var, ...] | Var
 ) -> Figure:
+    """Plots quantity_stats keyed by `group_var`: one line per group and y, with its range."""
     if not isinstance(ys, tuple):
         ys = (ys,)
     f, ax = plt.subplots(1)
 
-    for group, group_df in df.group_by(group_var.id):
-        group_name = str(group[0])
+    for group_name, group_df in _by_group(stats, group_var):
+        agg_df = group_df.sort(x.id)
         for y in ys:
-            agg_df = (
-                group_df.group_by(x.id)
-                .agg(
-                    pl.mean(y.id).alias(y.id), pl.min(y.id).alias("low"), pl.max(y.id).alias("high")
-                )
-                .sort(x.id)
-            )
-
             sns.lineplot(
                 data=agg_df,
                 x=x.id,
                 y=y.id,
-                label=group,
+                label=group_name,
                 ax=ax,
                 color=get_color(group_name),
                 **get_marker(group_name),
             )
             ax.fill_between(
-                agg_df[x.id], agg_df["low"], agg_df["high"], alpha=0.2, color=get_color(group_name)
+                agg_df[x.id],
+                agg_df[f"{y.id}_low"],
+                agg_df[f"{y.id}_high"],
+                alpha=0.2,
+                color=get_color(group_name),
             )
 
     set_up_figure_2d(f, varz=(x, ys[0]))
     return f
 
 
+@traced("figure")
+def plot_mean_quantity(
+    df: pl.DataFrame | pl.LazyFrame,
+    group_var: Var,
+    x: Var,
+    ys: tuple[Var, ...] | Var,
+    *,
+    aggregation: Aggregation | None = None,
+    streaming: bool = False,
+) -> Figure:
+    aggregation = aggregation or Aggregation()
+    if not isinstance(ys, tuple):
+        ys = (ys,)
+    stats = collect(quantity_stats(df, [group_var.id], x, ys, aggregation), streaming=streaming)
+    return plot_quantity_stats(stats, group_var, x, ys)
+
+
+@traced("figure")
 def plot_mean_log_quantity(
-    df: pl.DataFrame, group_var: Var, x: Var, y: Var, logx: bool = True, logy: bool = True
+    df: pl.DataFrame | pl.LazyFrame,
+    group_var: Var,
+    x: Var,
+    y: Var,
+    logx: bool = True,
+    logy: bool = True,
+    *,
+    aggregation: Aggregation | None = None,
+    streaming: bool = False,
 ) -> Figure:
+    aggregation = aggregation or Aggregation()
     ep = 1e-2
-    group_count = df.select(pl.col(group_var.id).n_unique()).item()
-    f, axes = get_subplot_grid(group_count, sharex=True, sharey=True)
+    stats = collect(quantity_stats(df, [group_var.id], x, (y,), aggregation), streaming=streaming)
+    groups = _by_group(stats, group_var)
+    f, axes = get_subplot_grid(len(groups), sharex=True, sharey=True)
 
     if logx:
         x = dataclasses.replace(x, name=f"log({x.name})")
     if logy:
         y = dataclasses.replace(y, name=f"log({y.name})")
 
-    for i, (group, group_df) in enumerate(df.group_by(group_var.id)):
-        group_name = str(group[0])
-        df_model = group_df.group_by(x.id).agg(pl.mean(y.id)).filter(pl.col(y.id) > ep)
+    for i, (group_name, group_df) in enumerate(groups):
+        df_model = group_df.select(x.id, y.id).filter(pl.col(y.id) > ep)
         if logx:
             df_model = df_model.with_columns(pl.col(x.id).log10())
         if logy:
@@ -95,3 +149,17 @@ def plot_mean_log_quantity(
 
     set_up_figure_2d(f, varz=(x, y))
     return f
+
+
+@traced("figure")
+def plot_error_heatmap(heatmap: np.ndarray, n: int) -> Figure:
+    f, ax = plt.subplots(1)
+    positive = heatmap[heatmap > 0]
+    norm = LogNorm(vmin=positive.min(), vmax=positive.max()) if len(positive) else None
+    im = ax.imshow(heatmap, norm=norm, cmap="viridis", extent=(0, n, n, 0), interpolation="none")
+    ax.grid(visible=False)
+    f.colorbar(im, ax=ax, label="Max absolute difference")
+    ax.set_xlabel("j")
+    ax.set_ylabel("i")
+    f.suptitle("Base pair probability error", y=1.00)
+    return f
@@ -11,6 +11,7 @@ from mpl_toolkits.mplot3d import Axes3D
 from rnapy.util.util import stable_hash
 
 from memernaex.analysis.data import Var
+from memernaex.profiling import span
 
 
 def set_style() -> None:
@@ -81,9 +82,10 @@ def get_marker(name: int | str) -> dict[str, Any]:
 
 
 def save_figure(f: Figure, path: Path) -> None:
-    f.tight_layout()
-    f.savefig(path, dpi=300)
-    plt.close(f)
+    with span("save_figure", cat="encode", path=str(path)):
+        f.tight_layout()
+        f.savefig(path, dpi=300)
+        plt.close(f)
 
 
 def set_up_axis_2d(ax: Axes, varz: tuple[Var, Var], legend: bool = True) -> None:
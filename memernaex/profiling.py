@@ -0,0 +1,195 @@
+# Copyright 2026 Eliot Courtney.
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ParamSpec, TypeVar
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def _rss_bytes() -> int | None:
+    try:
+        with Path("/proc/self/statm").open() as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return None
+
+
+@dataclass(kw_only=True)
+class Span:
+    name: str
+    cat: str
+    # Set by the caller when the stage processes a table.
+    rows: int | None = None
+    args: dict[str, Any] = field(default_factory=dict)
+    start_ns: int = 0
+    wall_sec: float = 0.0
+    cpu_sec: float = 0.0
+    rss_delta_bytes: int | None = None
+    tid: int = 0
+
+
+@dataclass(kw_only=True)
+class Profiler:
+    cprofile: bool = False
+    spans: list[Span] = field(default_factory=list)
+    # cProfile results of outermost spans on the main thread, by span name. Only one cProfile
+    # can run at a time, so nested spans are covered by their outermost span's profile.
+    profiles: dict[str, list[cProfile.Profile]] = field(default_factory=lambda: defaultdict(list))
+    local: threading.local = field(default_factory=threading.local)
+    start_ns: int = field(default_factory=time.perf_counter_ns)
+
+
+_active: dict[str, Profiler] = {}
+
+
+def start_profiling(*, cprofile: bool = False) -> Profiler:
+    profiler = _active["profiler"] = Profiler(cprofile=cprofile)
+    return profiler
+
+
+@contextmanager
+def span(name: str, *, cat: str = "stage", rows: int | None = None, **args: Any) -> Iterator[Span]:
+    """Times a stage: wall time, CPU time of the process and change in RSS. Costs almost
+    nothing unless profiling was started."""
+    s = Span(name=name, cat=cat, rows=rows, args=args)
+    profiler = _active.get("profiler")
+    if profiler is None:
+        yield s
+        return
+    depth = getattr(profiler.local, "depth", 0)
+    main = threading.current_thread() is threading.main_thread()
+    prof = cProfile.Profile() if profiler.cprofile and depth == 0 and main else None
+    rss = _rss_bytes()
+    cpu = time.process_time()
+    s.start_ns = time.perf_counter_ns()
+    profiler.local.depth = depth + 1
+    if prof is not None:
+        prof.enable()
+    try:
+        yield s
+    finally:
+        if prof is not None:
+            prof.disable()
+            profiler.profiles[name].append(prof)
+        profiler.local.depth = depth
+        s.wall_sec = (time.perf_counter_ns() - s.start_ns) / 1e9
+        s.cpu_sec = time.process_time() - cpu
+        end_rss = _rss_bytes()
+        s.rss_delta_bytes = None if rss is None or end_rss is None else end_rss - rss
+        s.tid = threading.get_native_id()
+        profiler.spans.append(s)
+
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+def traced(cat: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Wraps every call of a function in a span named after it."""
+
+    def decorator(fn: Callable[P, R]) -> Callable[P, R]:
+        @functools.wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with span(fn.__qualname__, cat=cat):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _chrome_trace(profiler: Profiler) -> dict[str, Any]:
+    pid = os.getpid()
+    events = []
+    for s in profiler.spans:
+        args = {"cpu_sec": s.cpu_sec, "rss_delta_bytes": s.rss_delta_bytes, **s.args}
+        if s.rows is not None:
+            args["rows"] = s.rows
+        events.append(
+            {
+                "name": s.name,
+                "cat": s.cat,
+                "ph": "X",
+                "ts": (s.start_ns - profiler.start_ns) / 1e3,
+                "dur": s.wall_sec * 1e6,
+                "pid": pid,
+                "tid": s.tid,
+                "args": args,
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def summarize(spans: list[Span]) -> list[dict[str, Any]]:
+    """Totals per span name, slowest first. Nested spans are also counted in their parents."""
+    groups: dict[str, list[Span]] = defaultdict(list)
+    for s in spans:
+        groups[s.name].append(s)
+    rows = []
+    for name, group in groups.items():
+        deltas = [s.rss_delta_bytes for s in group if s.rss_delta_bytes is not None]
+        counts = [s.rows for s in group if s.rows is not None]
+        rows.append(
+            {
+                "name": name,
+                "cat": group[0].cat,
+                "calls": len(group),
+                "wall_sec": sum(s.wall_sec for s in group),
+                "cpu_sec": sum(s.cpu_sec for s in group),
+                "max_rss_delta_mib": max(deltas) / 2**20 if deltas else None,
+                "rows": sum(counts) if counts else None,
+            }
+        )
+    return sorted(rows, key=lambda r: r["wall_sec"], reverse=True)
+
+
+def _format_cell(val: Any) -> str:
+    if val is None:
+        return ""
+    return f"{val:.3f}" if isinstance(val, float) else str(val)
+
+
+def format_summary(rows: list[dict[str, Any]]) -> str:
+    header = ["name", "cat", "calls", "wall_sec", "cpu_sec", "max_rss_delta_mib", "rows"]
+    cells = [header, *([_format_cell(r[h]) for h in header] for r in rows)]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+    # Text columns are left aligned and numeric columns right aligned.
+    return "\n".join(
+        "  ".join(
+            c.ljust(w) if i < 2 else c.rjust(w)
+            for i, (c, w) in enumerate(zip(row, widths, strict=True))
+        )
+        for row in cells
+    )
+
+
+def finish_profiling(trace_path: Path) -> str:
+    """Stops profiling, writes the Chrome trace to `trace_path` and returns a summary table.
+    With cProfile enabled, also dumps pstats of the slowest outermost stage next to it."""
+    profiler = _active.pop("profiler", None)
+    if profiler is None:
+        raise ValueError("Profiling was not started.")
+    trace_path.write_text(json.dumps(_chrome_trace(profiler)))
+    summary = summarize(profiler.spans)
+    lines = [format_summary(summary)]
+    hottest = next((r["name"] for r in summary if r["name"] in profiler.profiles), None)
+    if hottest is not None:
+        profiles = profiler.profiles[hottest]
+        stats = pstats.Stats(profiles[0])
+        for prof in profiles[1:]:
+            stats.add(prof)
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in hottest)
+        stats_path = trace_path.with_name(f"{trace_path.stem}.{safe}.prof")
+        stats.dump_stats(stats_path)
+        lines.append(f"cProfile stats of {hottest} written to {stats_path}")
+    return "\n".join(lines)
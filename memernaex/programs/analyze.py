@@ -0,0 +1,69 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import click
+import cloup
+
+from memernaex.analysis.pipeline import Pipeline
+from memernaex.analysis.workqueue import WorkQueue
+
+
+@cloup.command()
+@cloup.argument(
+    "config_path", type=cloup.Path(dir_okay=False, exists=True, path_type=Path), required=True
+)
+@cloup.option(
+    "--output-dir",
+    type=cloup.Path(file_okay=False, writable=True, path_type=Path),
+    help="Overrides output_dir in the config.",
+)
+@cloup.option(
+    "--cache-dir",
+    type=cloup.Path(file_okay=False, writable=True, path_type=Path),
+    help="Overrides cache_dir in the config.",
+)
+@cloup.option("--no-cache", is_flag=True, help="Run every needed step, ignoring the cache.")
+@cloup.option(
+    "--step",
+    "steps",
+    multiple=True,
+    help="Only produce these steps. Default: all figures, fits and steps with an output.",
+)
+@cloup.option(
+    "-j",
+    "--jobs",
+    type=cloup.IntRange(min=1),
+    help="Concurrent steps. Default: jobs in the config, or the number of CPUs.",
+)
+@cloup.option(
+    "--queue",
+    "queue_dir",
+    type=cloup.Path(file_okay=False, path_type=Path),
+    help="Work queue directory, e.g. on a shared filesystem. Fits and figures are split into "
+    "a task per group there, which this process and any work-queue workers run.",
+)
+def analyze(
+    config_path: Path,
+    output_dir: Path | None,
+    cache_dir: Path | None,
+    no_cache: bool,
+    steps: tuple[str, ...],
+    jobs: int | None,
+    queue_dir: Path | None,
+) -> None:
+    """Runs the inputs, filters, aggregations, fits and figures declared in a TOML config as
+    one job, reading each input once and reusing cached results of unchanged steps."""
+    try:
+        pipeline = Pipeline(
+            config_path,
+            output_dir=output_dir,
+            cache_dir=cache_dir,
+            use_cache=not no_cache,
+            jobs=jobs,
+            queue=WorkQueue(queue_dir) if queue_dir is not None else None,
+        )
+        modes = pipeline.run(list(steps) if steps else None)
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
+    ran = sum(mode == "run" for mode in modes.values())
+    click.echo(f"Ran {ran} steps and loaded {len(modes) - ran} from the cache.", err=True)
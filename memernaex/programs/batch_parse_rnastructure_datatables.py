@@ -0,0 +1,45 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import click
+import cloup
+
+from memernaex.energy.bundle import BUNDLE_NAME
+from memernaex.energy.convert import convert_rnastructure_dirs
+
+
+@cloup.command()
+@cloup.argument(
+    "inps",
+    type=cloup.Path(file_okay=False, exists=True, resolve_path=True, path_type=Path),
+    nargs=-1,
+    required=True,
+)
+@cloup.option(
+    "-o",
+    "--output",
+    "out",
+    type=cloup.Path(file_okay=False, writable=True, resolve_path=True, path_type=Path),
+    required=True,
+    help="Each input directory is written to a subdirectory of the same name.",
+)
+@cloup.option(
+    "--bundle",
+    is_flag=True,
+    help=f"Also write all tables into a memory-mappable binary {BUNDLE_NAME}.",
+)
+@cloup.option(
+    "-j",
+    "--jobs",
+    type=cloup.IntRange(min=1),
+    help="Number of worker processes. Default: all CPUs.",
+)
+def batch_parse_rnastructure_datatables(
+    inps: tuple[Path, ...], out: Path, bundle: bool, jobs: int | None
+) -> None:
+    try:
+        written = convert_rnastructure_dirs(list(inps), out, bundle=bundle, jobs=jobs)
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
+    for path in written:
+        click.echo(path)
@@ -1,9 +1,16 @@
 # Copyright 2021 Eliot Courtney.
 import decimal
+import itertools
+import tempfile
 from pathlib import Path
 
 import click
 import cloup
+import numpy as np
+
+from memernaex.analysis.partition import compare_matrices, iter_float_chunks, load_square_matrix
+
+_PRECISIONS: dict[str, type[np.floating]] = {"double": np.float64, "extended": np.longdouble}
 
 
 def _read_decimals(path: Path) -> list[decimal.Decimal]:
@@ -18,16 +25,11 @@ def _read_decimals(path: Path) -> list[decimal.Decimal]:
         raise click.ClickException(f"Invalid numeric value in {path}.") from exc
 
 
-@cloup.command()
-@cloup.argument(
-    "p0",
-    type=cloup.Path(dir_okay=False, exists=True, readable=True, resolve_path=True, path_type=Path),
-)
-@cloup.argument(
-    "p1",
-    type=cloup.Path(dir_okay=False, exists=True, readable=True, resolve_path=True, path_type=Path),
-)
-def compare_partition(p0: Path, p1: Path) -> None:
+def _format(val: np.floating) -> str:
+    return np.format_float_positional(val, precision=20, unique=False, trim="k")
+
+
+def _compare_exact(p0: Path, p1: Path) -> None:
     vals0 = _read_decimals(p0)
     vals1 = _read_decimals(p1)
 
@@ -41,5 +43,155 @@ def compare_partition(p0: Path, p1: Path) -> None:
     n = decimal.Decimal(len(diffs))
     rms = (sum(d * d for d in diffs) / n).sqrt()
     largest_diff = max(abs(d) for d in diffs)
+    largest_rel_diff = max(
+        (
+            abs(d) / max(abs(a), abs(b))
+            for d, a, b in zip(diffs, vals0, vals1, strict=True)
+            if a or b
+        ),
+        default=decimal.Decimal(0),
+    )
     click.echo(f"rms: {rms:.20f}")
     click.echo(f"largest diff: {largest_diff:.20f}")
+    click.echo(f"largest rel diff: {largest_rel_diff:.20f}")
+
+
+def _compare_fast(p0: Path, p1: Path, dtype: type[np.floating], chunk_size: int) -> None:
+    n0 = n1 = 0
+    sum_sq = dtype(0)
+    largest_diff = dtype(0)
+    largest_rel_diff = dtype(0)
+    chunks0 = iter_float_chunks(p0, dtype, chunk_size)
+    chunks1 = iter_float_chunks(p1, dtype, chunk_size)
+    for c0, c1 in itertools.zip_longest(chunks0, chunks1):
+        n0 += 0 if c0 is None else len(c0)
+        n1 += 0 if c1 is None else len(c1)
+        if c0 is None or c1 is None or len(c0) != len(c1):
+            # Keep counting so the error reports the full lengths.
+            continue
+        diff = np.abs(c0 - c1)
+        denom = np.maximum(np.abs(c0), np.abs(c1))
+        rel = np.divide(diff, denom, out=np.zeros_like(diff), where=denom > 0)
+        sum_sq += np.dot(diff, diff)
+        largest_diff = max(largest_diff, diff.max())
+        largest_rel_diff = max(largest_rel_diff, rel.max())
+
+    if n0 == 0 or n1 == 0:
+        raise click.ClickException("Input files must contain at least one value.")
+
+    if n0 != n1:
+        raise click.ClickException(f"Input lengths do not match: {n0} vs {n1}.")
+
+    rms = np.sqrt(sum_sq / dtype(n0))
+    click.echo(f"rms: {_format(rms)}")
+    click.echo(f"largest diff: {_format(largest_diff)}")
+    click.echo(f"largest rel diff: {_format(largest_rel_diff)}")
+
+
+def _compare_matrix(
+    p0: Path, p1: Path, top_k: int, output_dir: Path | None, chunk_size: int
+) -> None:
+    # Tables and plots are only needed here, so the scalar comparisons skip these imports.
+    import polars as pl  # noqa: PLC0415
+
+    from memernaex.plot.plots import plot_error_heatmap  # noqa: PLC0415
+    from memernaex.plot.util import save_figure  # noqa: PLC0415
+
+    with tempfile.TemporaryDirectory() as scratch:
+        m0 = load_square_matrix(p0, Path(scratch), chunk_size)
+        m1 = load_square_matrix(p1, Path(scratch), chunk_size)
+        report = compare_matrices(m0, m1, top_k=top_k)
+
+    click.echo(f"n: {report.n}")
+    click.echo(f"rms: {report.rms:.20f}")
+    click.echo(f"largest diff: {report.largest_diff:.20f}")
+    click.echo(f"largest rel diff: {report.largest_rel_diff:.20f}")
+    top = pl.DataFrame(
+        {
+            "i": report.top_i,
+            "j": report.top_j,
+            "p0": report.top_p0,
+            "p1": report.top_p1,
+            "abs_diff": np.abs(report.top_p0 - report.top_p1),
+        }
+    )
+    rows = pl.DataFrame(
+        {"i": np.arange(report.n), "rms": report.row_rms, "max_abs_diff": report.row_max}
+    )
+    spans = pl.DataFrame(
+        {"span": np.arange(report.n), "rms": report.span_rms, "max_abs_diff": report.span_max}
+    )
+    with pl.Config(tbl_rows=top_k, float_precision=12):
+        click.echo(f"top {top_k} diffs (i <= j):")
+        click.echo(top)
+        click.echo("worst rows:")
+        click.echo(rows.sort("rms", descending=True).head(top_k))
+
+    if output_dir is not None:
+        top.write_csv(output_dir / "top_diffs.csv")
+        rows.write_csv(output_dir / "row_error.csv")
+        spans.write_csv(output_dir / "span_error.csv")
+        f = plot_error_heatmap(report.heatmap, report.n)
+        save_figure(f, output_dir / "error_heatmap.png")
+
+
+@cloup.command()
+@cloup.argument(
+    "p0",
+    type=cloup.Path(dir_okay=False, exists=True, readable=True, resolve_path=True, path_type=Path),
+)
+@cloup.argument(
+    "p1",
+    type=cloup.Path(dir_okay=False, exists=True, readable=True, resolve_path=True, path_type=Path),
+)
+@cloup.option("--exact", is_flag=True, help="Compare with exact decimal arithmetic.")
+@cloup.option(
+    "--precision",
+    type=cloup.Choice(list(_PRECISIONS)),
+    default="double",
+    help="Float precision for the fast path. Extended is long double where available.",
+)
+@cloup.option(
+    "--chunk-size",
+    type=cloup.IntRange(min=1),
+    default=1 << 20,
+    help="Number of values read from each text file at a time in the fast and matrix paths.",
+)
+@cloup.option(
+    "--matrix",
+    is_flag=True,
+    help="Treat inputs as square base pair probability matrices (text or .npy).",
+)
+@cloup.option(
+    "--top-k", type=cloup.IntRange(min=1), default=10, help="Number of worst positions to report."
+)
+@cloup.option(
+    "--output-dir",
+    type=cloup.Path(file_okay=False, exists=True, writable=True, resolve_path=True, path_type=Path),
+    help="Write per-row, per-span and top-k error tables and an error heatmap here.",
+)
+def compare_partition(
+    p0: Path,
+    p1: Path,
+    exact: bool,
+    precision: str,
+    chunk_size: int,
+    matrix: bool,
+    top_k: int,
+    output_dir: Path | None,
+) -> None:
+    if matrix and exact:
+        raise click.UsageError("--exact cannot be used with --matrix.")
+    if matrix and precision != "double":
+        raise click.UsageError("--matrix compares in double precision only.")
+    try:
+        if matrix:
+            _compare_matrix(p0, p1, top_k, output_dir, chunk_size)
+        elif exact:
+            _compare_exact(p0, p1)
+        else:
+            _compare_fast(p0, p1, _PRECISIONS[precision], chunk_size)
+    except OSError as exc:
+        raise click.ClickException(f"Failed to read input: {exc}") from exc
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
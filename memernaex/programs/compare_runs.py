@@ -0,0 +1,66 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import click
+import cloup
+import polars as pl
+
+from memernaex.analysis.regression import CORRECTIONS, METRICS, find_regressions
+
+
+@cloup.command()
+@cloup.argument(
+    "baseline", type=cloup.Path(dir_okay=False, exists=True, path_type=Path), required=True
+)
+@cloup.argument(
+    "candidate", type=cloup.Path(dir_okay=False, exists=True, path_type=Path), required=True
+)
+@cloup.option(
+    "--metric",
+    "metrics",
+    type=cloup.Choice(METRICS),
+    multiple=True,
+    default=["real_sec", "maxrss_bytes"],
+    help="Metrics to test.",
+)
+@cloup.option("--alpha", type=cloup.FloatRange(0, 1, min_open=True), default=0.05)
+@cloup.option(
+    "--min-effect",
+    type=cloup.FloatRange(min=0),
+    default=0.02,
+    help="Smallest relative slowdown counted as a regression.",
+)
+@cloup.option("--correction", type=cloup.Choice(CORRECTIONS), default="holm")
+@cloup.option(
+    "--output-path",
+    type=cloup.Path(dir_okay=False, writable=True, path_type=Path),
+    help="Also write all group results to this CSV.",
+)
+def compare_runs(
+    baseline: Path,
+    candidate: Path,
+    metrics: tuple[str, ...],
+    alpha: float,
+    min_effect: float,
+    correction: str,
+    output_path: Path | None,
+) -> None:
+    """Tests benchmark results for significant regressions against a baseline, and exits with
+    an error if there are any."""
+    result = find_regressions(
+        pl.read_ndjson(baseline),
+        pl.read_ndjson(candidate),
+        metrics=metrics,
+        alpha=alpha,
+        min_effect=min_effect,
+        correction=correction,
+    )
+    if output_path:
+        result.write_csv(output_path)
+    if result.is_empty():
+        raise click.ClickException("No runs could be paired between baseline and candidate.")
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        click.echo(result)
+    regressions = result.filter(pl.col("regression"))
+    if not regressions.is_empty():
+        raise click.ClickException(f"{len(regressions)} significant regressions.")
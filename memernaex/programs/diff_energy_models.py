@@ -0,0 +1,57 @@
+# Copyright 2026 Eliot Courtney.
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import click
+import cloup
+import polars as pl
+
+from memernaex.energy.diff import diff_energy_tables
+from memernaex.energy.load import load_energy_tables
+
+_MODEL_PATH = cloup.Path(exists=True, resolve_path=True, path_type=Path)
+
+
+@cloup.command()
+@cloup.argument("baseline", type=_MODEL_PATH)
+@cloup.argument("candidates", type=_MODEL_PATH, nargs=-1, required=True)
+@cloup.option(
+    "--top-k", type=cloup.IntRange(min=0), default=5, help="Top changed motifs per table."
+)
+@cloup.option(
+    "--output-dir",
+    type=cloup.Path(file_okay=False, exists=True, writable=True, resolve_path=True, path_type=Path),
+    help="Write summary.ndjson and top_changes.ndjson here.",
+)
+@cloup.option(
+    "-j",
+    "--jobs",
+    type=cloup.IntRange(min=1),
+    help="Processes for loading models. Default: all CPUs.",
+)
+def diff_energy_models(
+    baseline: Path,
+    candidates: tuple[Path, ...],
+    top_k: int,
+    output_dir: Path | None,
+    jobs: int | None,
+) -> None:
+    """Compares energy models against a baseline, table by table.
+
+    Models can be bundles, or directories of memerna .data files or RNAstructure data tables.
+    """
+    try:
+        base = load_energy_tables(baseline)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            models = list(pool.map(load_energy_tables, candidates, chunksize=8))
+    except (OSError, ValueError) as exc:
+        raise click.ClickException(f"Failed to load energy model: {exc}") from exc
+
+    summary, top_changes = diff_energy_tables(base, models, [str(c) for c in candidates], top_k)
+    with pl.Config(tbl_rows=-1, tbl_cols=-1, fmt_str_lengths=60):
+        click.echo(summary.filter(pl.col("changed") > 0))
+        if top_k > 0:
+            click.echo(top_changes)
+    if output_dir is not None:
+        summary.write_ndjson(output_dir / "summary.ndjson")
+        top_changes.write_ndjson(output_dir / "top_changes.ndjson")
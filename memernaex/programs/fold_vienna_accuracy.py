@@ -0,0 +1,73 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import click
+import cloup
+
+from memernaex.analysis.structure import read_structures
+from memernaex.benchmark.vienna import ViennaParams, fold_and_score
+from memernaex.programs.score_accuracy import read_families
+
+
+@cloup.command()
+@cloup.option(
+    "--reference",
+    type=cloup.Path(exists=True, path_type=Path),
+    required=True,
+    help="Dot-bracket records file, or a directory of .ct and .db files.",
+)
+@cloup.option("--dangles", type=cloup.IntRange(0, 3), default=2)
+@cloup.option("--no-lp", is_flag=True, help="Disallow lonely pairs.")
+@cloup.option("--temperature", type=float, default=37.0, help="Temperature in Celsius.")
+@cloup.option("--program", help="Program name to record. Default: ViennaRNA-d<dangles>[-noLP].")
+@cloup.option("--dataset", help="Dataset name to record. Default: reference file stem.")
+@cloup.option(
+    "--families",
+    type=cloup.Path(dir_okay=False, exists=True, path_type=Path),
+    help="CSV with name and family columns. Default: name prefix before the first _.",
+)
+@cloup.option("--slip", is_flag=True, help="Count pairs off by one base on one side as correct.")
+@cloup.option("-j", "--jobs", type=cloup.IntRange(min=1), default=1)
+@cloup.option(
+    "--chunk-size", type=cloup.IntRange(min=1), default=16, help="Sequences per pool task."
+)
+@cloup.option(
+    "--output-path", type=cloup.Path(dir_okay=False, writable=True, path_type=Path), required=True
+)
+def fold_vienna_accuracy(
+    reference: Path,
+    dangles: int,
+    no_lp: bool,
+    temperature: float,
+    program: str | None,
+    dataset: str | None,
+    families: Path | None,
+    slip: bool,
+    jobs: int,
+    chunk_size: int,
+    output_path: Path,
+) -> None:
+    """Folds an accuracy dataset with the ViennaRNA bindings and scores it against the
+    references, as fold accuracy NDJSON with per sequence time and memory."""
+    try:
+        refs = list(read_structures(reference, jobs).values())
+    except (OSError, ValueError) as exc:
+        raise click.ClickException(str(exc)) from exc
+    params = ViennaParams(dangles=dangles, no_lp=no_lp, temperature=temperature)
+    family_map = read_families(families)
+    done = 0
+    with output_path.open("wb") as f:
+        for df in fold_and_score(
+            refs,
+            params=params,
+            dataset=dataset or reference.stem,
+            program=program,
+            families=family_map,
+            slip=slip,
+            jobs=jobs,
+            chunk_size=chunk_size,
+        ):
+            df.write_ndjson(f)
+            f.flush()
+            done += len(df)
+            click.echo(f"Folded {done}/{len(refs)}.", err=True)
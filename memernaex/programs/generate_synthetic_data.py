@@ -0,0 +1,48 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import cloup
+
+from memernaex.benchmark.synthetic import SCHEMAS, SyntheticConfig, write_synthetic
+
+
+@cloup.command()
+@cloup.option("--schema", type=cloup.Choice(SCHEMAS), required=True)
+@cloup.option("--rows", type=cloup.IntRange(min=1), required=True)
+@cloup.option("--programs", type=cloup.IntRange(min=1), default=4)
+@cloup.option("--min-length", type=cloup.IntRange(min=1), default=50)
+@cloup.option("--max-length", type=cloup.IntRange(min=1), default=2000)
+@cloup.option("--runs", type=cloup.IntRange(min=1), default=3, help="Repeats per RNA and program.")
+@cloup.option("--families", type=cloup.IntRange(min=1), default=10)
+@cloup.option(
+    "--noise", type=cloup.FloatRange(min=0), default=0.1, help="Log-normal noise on measurements."
+)
+@cloup.option("--seed", type=int, default=0)
+@cloup.option(
+    "--output-path", type=cloup.Path(dir_okay=False, writable=True, path_type=Path), required=True
+)
+def generate_synthetic_data(
+    schema: str,
+    rows: int,
+    programs: int,
+    min_length: int,
+    max_length: int,
+    runs: int,
+    families: int,
+    noise: float,
+    seed: int,
+    output_path: Path,
+) -> None:
+    """Writes synthetic benchmark results with realistic scaling laws and noise."""
+    config = SyntheticConfig(
+        schema=schema,
+        rows=rows,
+        programs=programs,
+        min_length=min_length,
+        max_length=max_length,
+        runs=runs,
+        families=families,
+        noise=noise,
+        seed=seed,
+    )
+    write_synthetic(config, output_path)
@@ -17,6 +17,24 @@ from memernaex.experiments.fold.accuracy_plotter import FoldAccuracyPlotter
     type=cloup.Path(dir_okay=True, file_okay=False, exists=True, path_type=Path),
     required=True,
 )
-def plot_fold_accuracy(input_path: Path, output_dir: Path) -> None:
-    plotter = FoldAccuracyPlotter(input_path, output_dir)
+@cloup.option(
+    "--resamples",
+    type=cloup.IntRange(min=1),
+    default=10000,
+    help="Bootstrap and permutation resamples per program pair comparison.",
+)
+@cloup.option(
+    "--alpha",
+    type=cloup.FloatRange(min=0, max=1, min_open=True, max_open=True),
+    default=0.05,
+    help="Bootstrap confidence intervals cover 1 - alpha.",
+)
+@cloup.option("--seed", type=int, default=0)
+@cloup.option("-j", "--jobs", type=cloup.IntRange(min=1), default=1)
+def plot_fold_accuracy(
+    input_path: Path, output_dir: Path, resamples: int, alpha: float, seed: int, jobs: int
+) -> None:
+    plotter = FoldAccuracyPlotter(
+        input_path, output_dir, resamples=resamples, alpha=alpha, seed=seed, jobs=jobs
+    )
     plotter.run()
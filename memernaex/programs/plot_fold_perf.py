@@ -3,6 +3,8 @@ from pathlib import Path
 
 import cloup
 
+from memernaex.analysis.aggregate import AGGREGATIONS, Aggregation
+from memernaex.analysis.watch import NdjsonTail, follow
 from memernaex.experiments.fold.perf_plotter import FoldPerfPlotter
 
 
@@ -17,6 +19,42 @@ from memernaex.experiments.fold.perf_plotter import FoldPerfPlotter
     type=cloup.Path(dir_okay=True, file_okay=False, exists=True, path_type=Path),
     required=True,
 )
-def plot_fold_perf(input_path: Path, output_dir: Path) -> None:
-    plotter = FoldPerfPlotter(input_path, output_dir)
+@cloup.option(
+    "--aggregation",
+    type=cloup.Choice(AGGREGATIONS),
+    default="mean",
+    help="How to combine repeated runs. mad rejects outliers before taking the mean.",
+)
+@cloup.option(
+    "--cv-threshold",
+    type=cloup.FloatRange(min=0),
+    default=0.1,
+    help="Coefficient of variation above which repeats are flagged as noisy.",
+)
+@cloup.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running and re-plot what new records in the input affect as they are appended.",
+)
+@cloup.option(
+    "--poll-interval",
+    type=cloup.FloatRange(min=0, min_open=True),
+    default=1.0,
+    help="With --watch, seconds between checks of the input if inotify is unavailable.",
+)
+def plot_fold_perf(
+    input_path: Path,
+    output_dir: Path,
+    aggregation: str,
+    cv_threshold: float,
+    watch: bool,
+    poll_interval: float,
+) -> None:
+    # Created before the first read, so no record appended in between is missed.
+    tail = NdjsonTail(input_path, FoldPerfPlotter) if watch else None
+    plotter = FoldPerfPlotter(
+        input_path, output_dir, Aggregation(method=aggregation, cv_threshold=cv_threshold)
+    )
     plotter.run()
+    if tail is not None:
+        follow(tail, plotter.update, poll_interval=poll_interval)
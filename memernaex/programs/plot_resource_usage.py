@@ -0,0 +1,29 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import cloup
+
+from memernaex.experiments.resource.usage_plotter import ResourceUsagePlotter
+
+
+@cloup.command()
+@cloup.option(
+    "--input-path",
+    type=cloup.Path(dir_okay=False, file_okay=True, exists=True, path_type=Path),
+    required=True,
+    help="Benchmark NDJSON written by run-benchmark with --sample-interval.",
+)
+@cloup.option(
+    "--output-dir",
+    type=cloup.Path(dir_okay=True, file_okay=False, exists=True, path_type=Path),
+    required=True,
+)
+@cloup.option(
+    "--max-lengths",
+    type=cloup.IntRange(min=1),
+    default=6,
+    help="Number of lengths to plot all programs for.",
+)
+def plot_resource_usage(input_path: Path, output_dir: Path, max_lengths: int) -> None:
+    plotter = ResourceUsagePlotter(input_path, output_dir, max_lengths)
+    plotter.run()
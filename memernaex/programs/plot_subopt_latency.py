@@ -0,0 +1,42 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import cloup
+
+from memernaex.analysis.aggregate import AGGREGATIONS, Aggregation
+from memernaex.experiments.subopt.latency_plotter import SuboptLatencyPlotter
+
+
+@cloup.command()
+@cloup.option(
+    "--input-path",
+    type=cloup.Path(dir_okay=False, file_okay=True, exists=True, path_type=Path),
+    required=True,
+    help="Subopt benchmark NDJSON written by run-benchmark with --emission-interval.",
+)
+@cloup.option(
+    "--output-dir",
+    type=cloup.Path(dir_okay=True, file_okay=False, exists=True, path_type=Path),
+    required=True,
+)
+@cloup.option(
+    "--aggregation",
+    type=cloup.Choice(AGGREGATIONS),
+    default="mean",
+    help="How to combine the metrics of repeated runs.",
+)
+@cloup.option(
+    "--max-lengths",
+    type=cloup.IntRange(min=1),
+    default=6,
+    help="Number of lengths to plot throughput over time for.",
+)
+def plot_subopt_latency(
+    input_path: Path, output_dir: Path, aggregation: str, max_lengths: int
+) -> None:
+    """Plots and fits time to first structure and inter-structure latency of subopt runs, and
+    their throughput over time."""
+    plotter = SuboptLatencyPlotter(
+        input_path, output_dir, Aggregation(method=aggregation), max_lengths
+    )
+    plotter.run()
@@ -3,6 +3,9 @@ from pathlib import Path
 
 import cloup
 
+from memernaex.analysis.aggregate import AGGREGATIONS, Aggregation
+from memernaex.analysis.watch import NdjsonTail, follow
+from memernaex.experiments.subopt import perf_plotter
 from memernaex.experiments.subopt.perf_plotter import SuboptPerfPlotter
 
 
@@ -18,6 +21,58 @@ from memernaex.experiments.subopt.perf_plotter import SuboptPerfPlotter
     required=True,
 )
 @cloup.option("--is-stats", is_flag=True, help="Whether input is stats about subopt.")
-def plot_subopt_perf(input_path: Path, output_dir: Path, is_stats: bool) -> None:
-    plotter = SuboptPerfPlotter(input_path, output_dir, is_stats)
-    plotter.run()
+@cloup.option(
+    "--aggregation",
+    type=cloup.Choice(AGGREGATIONS),
+    default="mean",
+    help="How to combine repeated runs. mad rejects outliers before taking the mean.",
+)
+@cloup.option(
+    "--cv-threshold",
+    type=cloup.FloatRange(min=0),
+    default=0.1,
+    help="Coefficient of variation above which repeats are flagged as noisy.",
+)
+@cloup.option(
+    "--streaming",
+    is_flag=True,
+    help="Stream through the input for each aggregation instead of loading it, for inputs "
+    "larger than memory. Peak memory is then bounded by the number of aggregated cells.",
+)
+@cloup.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running, writing figures and fits to the output directory, and re-render those "
+    "that new records affect as they are appended to the input.",
+)
+@cloup.option(
+    "--poll-interval",
+    type=cloup.FloatRange(min=0, min_open=True),
+    default=1.0,
+    help="With --watch, seconds between checks of the input if inotify is unavailable.",
+)
+def plot_subopt_perf(
+    input_path: Path,
+    output_dir: Path,
+    is_stats: bool,
+    aggregation: str,
+    cv_threshold: float,
+    streaming: bool,
+    watch: bool,
+    poll_interval: float,
+) -> None:
+    # Created before the first read, so no record appended in between is missed.
+    tail = NdjsonTail(input_path, perf_plotter) if watch else None
+    plotter = SuboptPerfPlotter(
+        input_path,
+        output_dir,
+        is_stats,
+        Aggregation(method=aggregation, cv_threshold=cv_threshold),
+        streaming=streaming,
+    )
+    if tail is None:
+        plotter.run()
+        return
+    # Fits are written to the output directory rather than shown, to keep it current.
+    plotter.render()
+    follow(tail, plotter.update, poll_interval=poll_interval)
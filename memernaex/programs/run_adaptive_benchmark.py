@@ -0,0 +1,118 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import click
+import cloup
+
+from memernaex.benchmark.adaptive import METRICS, AdaptiveScheduler
+from memernaex.benchmark.pool import run_jobs
+from memernaex.benchmark.runner import SCHEMAS, Program, make_record, write_record
+from memernaex.programs.run_benchmark import parse_key_values
+
+
+@cloup.command()
+@cloup.option(
+    "-p",
+    "--program",
+    "programs",
+    multiple=True,
+    required=True,
+    help="NAME=COMMAND, where COMMAND may use {seq}, {name} and {length}.",
+)
+@cloup.option("--min-length", type=cloup.IntRange(min=1), default=100)
+@cloup.option("--max-length", type=cloup.IntRange(min=1), default=1000)
+@cloup.option(
+    "--candidates", type=cloup.IntRange(min=2), default=16, help="Number of candidate lengths."
+)
+@cloup.option("--metric", type=cloup.Choice(METRICS), default="real_sec", help="Quantity to fit.")
+@cloup.option(
+    "--target",
+    type=cloup.FloatRange(min=0, min_open=True),
+    default=0.05,
+    help="Stop once the relative 1 sigma prediction uncertainty is below this everywhere.",
+)
+@cloup.option("--initial-lengths", type=cloup.IntRange(min=2), default=4)
+@cloup.option("--initial-runs", type=cloup.IntRange(min=1), default=2)
+@cloup.option(
+    "--batch-runs", type=cloup.IntRange(min=1), default=8, help="Runs per program per batch."
+)
+@cloup.option("--max-runs", type=cloup.IntRange(min=1), default=200, help="Run budget per program.")
+@cloup.option("--seed", type=int, help="Seed for the random sequences.")
+@cloup.option("-j", "--jobs", type=cloup.IntRange(min=1), default=1, help="Concurrent runs.")
+@cloup.option("--pin-cpus", is_flag=True, help="Pin each concurrent run slot to its own CPU.")
+@cloup.option("--timeout", type=cloup.FloatRange(min=0), help="Kill runs after this many seconds.")
+@cloup.option("--stdin", is_flag=True, help="Also write the sequence to the program's stdin.")
+@cloup.option("--schema", type=cloup.Choice(SCHEMAS), default="fold", help="Output schema.")
+@cloup.option("--field", "fields", multiple=True, help="KEY=VALUE to add to every record.")
+@cloup.option(
+    "--output-path",
+    type=cloup.Path(dir_okay=False, writable=True, path_type=Path),
+    required=True,
+    help="NDJSON file that results are streamed to.",
+)
+def run_adaptive_benchmark(
+    programs: tuple[str, ...],
+    min_length: int,
+    max_length: int,
+    candidates: int,
+    metric: str,
+    target: float,
+    initial_lengths: int,
+    initial_runs: int,
+    batch_runs: int,
+    max_runs: int,
+    seed: int | None,
+    jobs: int,
+    pin_cpus: bool,
+    timeout: float | None,
+    stdin: bool,
+    schema: str,
+    fields: tuple[str, ...],
+    output_path: Path,
+) -> None:
+    """Benchmarks random sequences, choosing lengths and repeats where they most reduce the
+    uncertainty of each program's fitted scaling model."""
+    if min_length >= max_length:
+        raise click.BadParameter("--min-length must be less than --max-length.")
+    progs = [
+        Program(name=k, template=v) for k, v in parse_key_values(programs, "--program").items()
+    ]
+    extra_fields = parse_key_values(fields, "--field")
+    scheduler = AdaptiveScheduler(
+        progs,
+        min_length=min_length,
+        max_length=max_length,
+        num_candidates=candidates,
+        metric=metric,
+        target=target,
+        max_runs=max_runs,
+        seed=seed,
+        stdin=stdin,
+        count_output=schema == "subopt",
+        timeout=timeout,
+    )
+
+    batch = scheduler.initial_batch(initial_lengths, initial_runs)
+    with output_path.open("w") as f:
+        while batch:
+            click.echo(f"Running batch of {len(batch)} jobs.", err=True)
+            try:
+                for job, result in run_jobs(batch, concurrency=jobs, pin_cpus=pin_cpus):
+                    scheduler.add(job, result)
+                    record = make_record(
+                        job, result, schema=schema, dataset="adaptive", fields=extra_fields
+                    )
+                    write_record(f, record)
+            except (ValueError, RuntimeError) as exc:
+                raise click.ClickException(str(exc)) from exc
+            batch = scheduler.next_batch(batch_runs)
+            for name, state in scheduler.states.items():
+                click.echo(
+                    f"  {name}: {state.runs} runs, model {state.fit.model or '-'}, "
+                    f"max rel uncertainty {state.fit.max_rel_uncertainty:.3g}",
+                    err=True,
+                )
+
+    for name, state in scheduler.states.items():
+        params = ", ".join(f"{k} {v:.3g}" for k, v in state.fit.param_rel_stderr.items())
+        click.echo(f"{name}: {state.fit.model} after {state.runs} runs; rel stderr {params}")
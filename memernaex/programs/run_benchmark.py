@@ -0,0 +1,162 @@
+# Copyright 2026 Eliot Courtney.
+import os
+from pathlib import Path
+
+import click
+import cloup
+
+from memernaex.benchmark.pool import run_jobs
+from memernaex.benchmark.runner import (
+    SCHEMAS,
+    Program,
+    make_jobs,
+    make_record,
+    read_fasta,
+    write_record,
+)
+from memernaex.benchmark.samples import samples_file_name, write_emissions, write_samples
+
+
+def parse_key_values(values: tuple[str, ...], what: str) -> dict[str, str]:
+    out = {}
+    for value in values:
+        key, sep, rest = value.partition("=")
+        if not sep or not key:
+            raise click.BadParameter(f"Expected KEY=VALUE for {what}, got {value!r}.")
+        out[key] = rest
+    return out
+
+
+@cloup.command()
+@cloup.option(
+    "--dataset-path",
+    type=cloup.Path(dir_okay=False, exists=True, path_type=Path),
+    required=True,
+    help="FASTA file of sequences to run.",
+)
+@cloup.option("--dataset", help="Dataset name to record. Default: dataset file stem.")
+@cloup.option(
+    "-p",
+    "--program",
+    "programs",
+    multiple=True,
+    required=True,
+    help="NAME=COMMAND, where COMMAND may use {seq}, {name} and {length}.",
+)
+@cloup.option("--runs", type=cloup.IntRange(min=1), default=1, help="Repeats of each run.")
+@cloup.option("-j", "--jobs", type=cloup.IntRange(min=1), default=1, help="Concurrent runs.")
+@cloup.option("--pin-cpus", is_flag=True, help="Pin each concurrent run slot to its own CPU.")
+@cloup.option("--timeout", type=cloup.FloatRange(min=0), help="Kill runs after this many seconds.")
+@cloup.option("--stdin", is_flag=True, help="Also write the sequence to the program's stdin.")
+@cloup.option(
+    "--schema",
+    type=cloup.Choice(SCHEMAS),
+    default="fold",
+    help="Output schema. Subopt counts output lines as output_strucs.",
+)
+@cloup.option(
+    "--field",
+    "fields",
+    multiple=True,
+    help="KEY=VALUE to add to every record, e.g. delta=5 for the subopt schema.",
+)
+@cloup.option(
+    "--sample-interval",
+    type=cloup.FloatRange(min=0, min_open=True),
+    help="Sample RSS and CPU time of each run from /proc every this many seconds.",
+)
+@cloup.option(
+    "--samples-dir",
+    type=cloup.Path(file_okay=False, writable=True, path_type=Path),
+    help="Where to write per run sample Parquet files. Default: <output stem>_samples.",
+)
+@cloup.option(
+    "--emission-interval",
+    type=cloup.FloatRange(min=0, min_open=True),
+    help="With the subopt schema, record how many structures were output by when, at most "
+    "every this many seconds plus around longer gaps. Programs must flush each structure, "
+    "e.g. run them under stdbuf -oL.",
+)
+@cloup.option(
+    "--emissions-dir",
+    type=cloup.Path(file_okay=False, writable=True, path_type=Path),
+    help="Where to write per run emission Parquet files. Default: <output stem>_emissions.",
+)
+@cloup.option(
+    "--output-path",
+    type=cloup.Path(dir_okay=False, writable=True, path_type=Path),
+    required=True,
+    help="NDJSON file that results are streamed to.",
+)
+def run_benchmark(
+    dataset_path: Path,
+    dataset: str | None,
+    programs: tuple[str, ...],
+    runs: int,
+    jobs: int,
+    pin_cpus: bool,
+    timeout: float | None,
+    stdin: bool,
+    schema: str,
+    fields: tuple[str, ...],
+    sample_interval: float | None,
+    samples_dir: Path | None,
+    emission_interval: float | None,
+    emissions_dir: Path | None,
+    output_path: Path,
+) -> None:
+    if emission_interval and schema != "subopt":
+        raise click.UsageError("--emission-interval requires --schema subopt.")
+    try:
+        rnas = read_fasta(dataset_path)
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
+    progs = [
+        Program(name=k, template=v) for k, v in parse_key_values(programs, "--program").items()
+    ]
+    extra_fields = parse_key_values(fields, "--field")
+    job_list = make_jobs(
+        progs,
+        rnas,
+        runs,
+        stdin=stdin,
+        count_output=schema == "subopt",
+        timeout=timeout,
+        sample_interval=sample_interval,
+        emission_interval=emission_interval,
+    )
+    job_idx = {id(job): i for i, job in enumerate(job_list)}
+    if sample_interval:
+        samples_dir = samples_dir or output_path.with_name(f"{output_path.stem}_samples")
+        samples_dir.mkdir(parents=True, exist_ok=True)
+    if emission_interval:
+        emissions_dir = emissions_dir or output_path.with_name(f"{output_path.stem}_emissions")
+        emissions_dir.mkdir(parents=True, exist_ok=True)
+
+    click.echo(f"Running {len(job_list)} jobs with concurrency {jobs}.", err=True)
+    with output_path.open("w") as f:
+        try:
+            for job, result in run_jobs(job_list, concurrency=jobs, pin_cpus=pin_cpus):
+                samples_path = None
+                if samples_dir and result.samples is not None:
+                    path = samples_dir / samples_file_name(job_idx[id(job)], job)
+                    write_samples(result.samples, path)
+                    # Relative to the output so the two can be moved together.
+                    samples_path = os.path.relpath(path, output_path.parent)
+                emissions_path = None
+                if emissions_dir and result.emissions is not None:
+                    path = emissions_dir / samples_file_name(job_idx[id(job)], job)
+                    write_emissions(result.emissions, path)
+                    emissions_path = os.path.relpath(path, output_path.parent)
+                record = make_record(
+                    job,
+                    result,
+                    schema=schema,
+                    dataset=dataset or dataset_path.stem,
+                    fields=extra_fields,
+                    samples_path=samples_path,
+                    emissions_path=emissions_path,
+                )
+                write_record(f, record)
+        except (ValueError, RuntimeError) as exc:
+            raise click.ClickException(str(exc)) from exc
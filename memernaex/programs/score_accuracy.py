@@ -0,0 +1,91 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import click
+import cloup
+import polars as pl
+
+from memernaex.analysis.accuracy import accuracy_frame, score_structures
+from memernaex.analysis.structure import read_structures
+from memernaex.analysis.workqueue import WorkQueue
+
+
+def read_families(path: Path | None) -> dict[str, str]:
+    if path is None:
+        return {}
+    df = pl.read_csv(path, schema_overrides={"name": pl.String, "family": pl.String})
+    return dict(zip(df["name"], df["family"], strict=True))
+
+
+@cloup.command()
+@cloup.option(
+    "--reference",
+    type=cloup.Path(exists=True, path_type=Path),
+    required=True,
+    help="Dot-bracket records file, or a directory of .ct and .db files.",
+)
+@cloup.option(
+    "--predicted",
+    type=cloup.Path(exists=True, path_type=Path),
+    required=True,
+    help="Predictions in the same formats as --reference, matched by name.",
+)
+@cloup.option("--program", required=True, help="Program name to record.")
+@cloup.option("--dataset", help="Dataset name to record. Default: reference file stem.")
+@cloup.option(
+    "--families",
+    type=cloup.Path(dir_okay=False, exists=True, path_type=Path),
+    help="CSV with name and family columns. Default: name prefix before the first _.",
+)
+@cloup.option("--slip", is_flag=True, help="Count pairs off by one base on one side as correct.")
+@cloup.option("-j", "--jobs", type=cloup.IntRange(min=1), default=1)
+@cloup.option(
+    "--queue",
+    "queue_dir",
+    type=cloup.Path(file_okay=False, path_type=Path),
+    help="Score in batches run by this process and any work-queue workers of this directory.",
+)
+@cloup.option(
+    "--output-path", type=cloup.Path(dir_okay=False, writable=True, path_type=Path), required=True
+)
+def score_accuracy(
+    reference: Path,
+    predicted: Path,
+    program: str,
+    dataset: str | None,
+    families: Path | None,
+    slip: bool,
+    jobs: int,
+    queue_dir: Path | None,
+    output_path: Path,
+) -> None:
+    """Scores predicted structures against references into fold accuracy NDJSON."""
+    try:
+        refs = read_structures(reference, jobs)
+        preds = read_structures(predicted, jobs)
+        names = [name for name in refs if name in preds]
+        if not names:
+            raise click.ClickException(
+                f"No predictions in {predicted} match any reference in {reference}."
+            )
+        if missing := len(refs) - len(names):
+            click.echo(f"Warning: {missing} references have no prediction.", err=True)
+        ref_list = [refs[name] for name in names]
+        scores = score_structures(
+            ref_list,
+            [preds[name] for name in names],
+            slip=slip,
+            jobs=jobs,
+            queue=WorkQueue(queue_dir) if queue_dir is not None else None,
+        )
+    except (OSError, ValueError) as exc:
+        raise click.ClickException(str(exc)) from exc
+    df = accuracy_frame(
+        ref_list,
+        scores,
+        dataset=dataset or reference.stem,
+        program=program,
+        families=read_families(families),
+    )
+    df.write_ndjson(output_path)
+    click.echo(f"Scored {len(df)} structures, mean F1 {df.select(pl.col('f1').mean()).item():.4f}.")
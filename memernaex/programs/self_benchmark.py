@@ -0,0 +1,78 @@
+# Copyright 2026 Eliot Courtney.
+import itertools
+import tempfile
+from pathlib import Path
+
+import click
+import cloup
+
+from memernaex.benchmark.runner import write_record
+from memernaex.benchmark.selfbench import STAGES, run_self_benchmark
+from memernaex.benchmark.synthetic import SCHEMAS, SyntheticConfig
+
+
+@cloup.command()
+@cloup.option("--schema", "schemas", type=cloup.Choice(SCHEMAS), multiple=True, default=SCHEMAS)
+@cloup.option(
+    "--rows",
+    "sizes",
+    type=cloup.IntRange(min=1),
+    multiple=True,
+    default=(1000, 10000, 100000),
+    help="Synthetic dataset sizes.",
+)
+@cloup.option("--stage", "stages", type=cloup.Choice(STAGES), multiple=True, default=STAGES)
+@cloup.option("--programs", type=cloup.IntRange(min=1), default=4)
+@cloup.option("--min-length", type=cloup.IntRange(min=1), default=50)
+@cloup.option("--max-length", type=cloup.IntRange(min=1), default=2000)
+@cloup.option("--seed", type=int, default=0)
+@cloup.option("--runs", type=cloup.IntRange(min=1), default=3, help="Timed repeats of each stage.")
+@cloup.option(
+    "--data-dir",
+    type=cloup.Path(file_okay=False, writable=True, path_type=Path),
+    help="Keep generated datasets here and reuse them across runs. Default: a temporary dir.",
+)
+@cloup.option(
+    "--output-path",
+    type=cloup.Path(dir_okay=False, writable=True, path_type=Path),
+    required=True,
+    help="NDJSON file that results are streamed to.",
+)
+def self_benchmark(
+    schemas: tuple[str, ...],
+    sizes: tuple[int, ...],
+    stages: tuple[str, ...],
+    programs: int,
+    min_length: int,
+    max_length: int,
+    seed: int,
+    runs: int,
+    data_dir: Path | None,
+    output_path: Path,
+) -> None:
+    """Times memernaex's own ingestion, aggregation, fitting and rendering on synthetic data.
+    Results use the fold benchmark layout, so two runs can be compared with compare-runs."""
+    configs = [
+        SyntheticConfig(
+            schema=schema,
+            rows=rows,
+            programs=programs,
+            min_length=min_length,
+            max_length=max_length,
+            seed=seed,
+        )
+        for schema, rows in itertools.product(schemas, sorted(sizes))
+    ]
+    with tempfile.TemporaryDirectory() as scratch, output_path.open("w") as f:
+        if data_dir is None:
+            data_dir = Path(scratch)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for record in run_self_benchmark(
+            configs, data_dir=data_dir, scratch_dir=Path(scratch), stages=stages, runs=runs
+        ):
+            write_record(f, record)
+            click.echo(
+                f"{record['program']} rows={record['length']} run={record['run_idx']}: "
+                f"{record['real_sec']:.3f}s",
+                err=True,
+            )
@@ -0,0 +1,52 @@
+# Copyright 2026 Eliot Courtney.
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import click
+import cloup
+
+from memernaex.analysis.workqueue import WorkQueue
+
+
+def _work(queue_dir: Path, wait: bool, poll_interval: float) -> int:
+    queue = WorkQueue(queue_dir)
+    return queue.work(until=(lambda: False) if wait else None, poll_interval=poll_interval)
+
+
+@cloup.command()
+@cloup.argument("queue_dir", type=cloup.Path(file_okay=False, path_type=Path), required=True)
+@cloup.option("-j", "--jobs", type=cloup.IntRange(min=1), default=1, help="Worker processes.")
+@cloup.option(
+    "--wait",
+    is_flag=True,
+    help="Keep waiting for new tasks instead of exiting once the queue is empty.",
+)
+@cloup.option("--poll-interval", type=cloup.FloatRange(min=0.01), default=1.0)
+@cloup.option("--status", is_flag=True, help="Print how many tasks are in each state and exit.")
+@cloup.option(
+    "--clear-done",
+    is_flag=True,
+    help="Delete the results of finished tasks and exit. Only use it while no job is waiting "
+    "on the queue.",
+)
+def work_queue(
+    queue_dir: Path, jobs: int, wait: bool, poll_interval: float, status: bool, clear_done: bool
+) -> None:
+    """Runs tasks from a work queue directory, such as the one given to analyze --queue. Start
+    it on as many hosts as share the directory; each task runs on one of them."""
+    if status:
+        queue = WorkQueue(queue_dir)
+        click.echo(" ".join(f"{state}={n}" for state, n in queue.status().items()))
+        for path in sorted((queue_dir / "failed").iterdir()):
+            click.echo(f"Task {path.name} failed:\n{path.read_text()}", err=True)
+        return
+    if clear_done:
+        click.echo(f"Cleared {WorkQueue(queue_dir).clear_done()} finished tasks.", err=True)
+        return
+    if jobs == 1:
+        ran = _work(queue_dir, wait, poll_interval)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_work, queue_dir, wait, poll_interval) for _ in range(jobs)]
+            ran = sum(f.result() for f in futures)
+    click.echo(f"Ran {ran} tasks.", err=True)
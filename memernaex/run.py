@@ -1,17 +1,15 @@
 #!/usr/bin/env python3
+import functools
+import importlib
 import logging
+from pathlib import Path
 
+import click
 import click_log
 import cloup
 from dotenv import load_dotenv
 
-from memernaex.programs.compare_partition import compare_partition
-from memernaex.programs.crop_image import crop_image
-from memernaex.programs.parse_rnastructure_datatables import parse_rnastructure_datatables
-from memernaex.programs.plot_ensemble import plot_ensemble
-from memernaex.programs.plot_fold_accuracy import plot_fold_accuracy
-from memernaex.programs.plot_fold_perf import plot_fold_perf
-from memernaex.programs.plot_subopt_perf import plot_subopt_perf
+from memernaex.profiling import finish_profiling, start_profiling
 
 CONTEXT_SETTINGS = cloup.Context.settings(
     show_constraints=True,
@@ -25,14 +23,90 @@ logger = logging.getLogger()
 click_log.basic_config(logger)
 
 
-@cloup.group(context_settings=CONTEXT_SETTINGS)
+class LazyCommand(cloup.Command):
+    """Placeholder for a command whose module is only imported once the command is used,
+    so running one subcommand does not pay for importing every other one."""
+
+    def __init__(self, name: str, import_path: str, aliases: tuple[str, ...] = ()) -> None:
+        super().__init__(name, aliases=list(aliases))
+        self.import_path = import_path
+
+    @functools.cached_property
+    def command(self) -> click.Command:
+        module, attr = self.import_path.split(":")
+        cmd: click.Command = getattr(importlib.import_module(f"memernaex.programs.{module}"), attr)
+        return cmd
+
+    def get_short_help_str(self, limit: int = 45) -> str:
+        return self.command.get_short_help_str(limit)
+
+
+class LazyGroup(cloup.Group):
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        cmd = super().get_command(ctx, cmd_name)
+        return cmd.command if isinstance(cmd, LazyCommand) else cmd
+
+
+@cloup.group(cls=LazyGroup, context_settings=CONTEXT_SETTINGS)
 @click_log.simple_verbosity_option(logger)
-def cli() -> None:
-    pass
+@cloup.option(
+    "--profile",
+    "profile_path",
+    type=cloup.Path(dir_okay=False, writable=True, path_type=Path),
+    help="Time the major stages, write a Chrome trace (chrome://tracing, Perfetto) here and "
+    "print a summary.",
+)
+@cloup.option(
+    "--cprofile",
+    is_flag=True,
+    help="With --profile, also write cProfile stats of the slowest stage next to the trace, "
+    "e.g. for snakeviz. Attach py-spy to the process for native frames.",
+)
+@cloup.pass_context
+def cli(ctx: click.Context, profile_path: Path | None, cprofile: bool) -> None:
+    if profile_path is None:
+        if cprofile:
+            raise click.UsageError("--cprofile requires --profile.")
+        return
+    start_profiling(cprofile=cprofile)
+    ctx.call_on_close(lambda: click.echo(finish_profiling(profile_path), err=True))
 
 
-cli.section("Plots", plot_ensemble, plot_fold_accuracy, plot_fold_perf, plot_subopt_perf)
-cli.section("Utilities", compare_partition, crop_image, parse_rnastructure_datatables)
+cli.section(
+    "Plots",
+    LazyCommand("analyze", "analyze:analyze"),
+    LazyCommand("generate-plots", "plot_ensemble:plot_ensemble"),
+    LazyCommand("plot-fold-accuracy", "plot_fold_accuracy:plot_fold_accuracy"),
+    LazyCommand("plot-fold-perf", "plot_fold_perf:plot_fold_perf"),
+    LazyCommand("plot-resource-usage", "plot_resource_usage:plot_resource_usage"),
+    LazyCommand("plot-subopt-latency", "plot_subopt_latency:plot_subopt_latency"),
+    LazyCommand("plot-subopt-perf", "plot_subopt_perf:plot_subopt_perf"),
+)
+cli.section(
+    "Benchmarks",
+    LazyCommand("compare-runs", "compare_runs:compare_runs"),
+    LazyCommand("fold-vienna-accuracy", "fold_vienna_accuracy:fold_vienna_accuracy"),
+    LazyCommand("run-adaptive-benchmark", "run_adaptive_benchmark:run_adaptive_benchmark"),
+    LazyCommand("run-benchmark", "run_benchmark:run_benchmark"),
+    LazyCommand("score-accuracy", "score_accuracy:score_accuracy"),
+    LazyCommand("self-benchmark", "self_benchmark:self_benchmark"),
+)
+cli.section(
+    "Utilities",
+    LazyCommand(
+        "batch-parse-rnastructure-datatables",
+        "batch_parse_rnastructure_datatables:batch_parse_rnastructure_datatables",
+    ),
+    LazyCommand("compare-partition", "compare_partition:compare_partition"),
+    LazyCommand("crop-image", "crop_image:crop_image", aliases=("crop",)),
+    LazyCommand("diff-energy-models", "diff_energy_models:diff_energy_models"),
+    LazyCommand("generate-synthetic-data", "generate_synthetic_data:generate_synthetic_data"),
+    LazyCommand(
+        "parse-rnastructure-datatables",
+        "parse_rnastructure_datatables:parse_rnastructure_datatables",
+    ),
+    LazyCommand("work-queue", "work_queue:work_queue"),
+)
 
 if __name__ == "__main__":
     cli()
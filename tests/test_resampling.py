@@ -0,0 +1,32 @@
+# Copyright 2026 Eliot Courtney.
+import numpy as np
+import polars as pl
+
+from memernaex.analysis.resampling import resample_comparisons
+
+
+def _scores(dataset: str, programs: list[str], rnas: int = 12) -> pl.DataFrame:
+    rng = np.random.default_rng(0)
+    return pl.DataFrame(
+        {
+            "dataset": dataset,
+            "program": np.repeat(programs, rnas),
+            "family": np.tile([f"fam{i % 3}" for i in range(rnas)], len(programs)),
+            "name": np.tile([f"rna{i}" for i in range(rnas)], len(programs)),
+            "f1": rng.random(rnas * len(programs)),
+        }
+    )
+
+
+def test_skips_single_program_datasets() -> None:
+    df = pl.concat([_scores("pair", ["a", "b"]), _scores("single", ["a"])])
+    out = resample_comparisons(df, metrics=["f1"], resamples=50)
+    assert out["dataset"].to_list() == ["pair"]
+    assert out.select("program_a", "program_b").row(0) == ("a", "b")
+    assert 0 < out["p"][0] <= 1
+
+
+def test_no_comparable_datasets() -> None:
+    out = resample_comparisons(_scores("single", ["a"]), metrics=["f1"], resamples=50)
+    assert out.is_empty()
+    assert out.schema["program_a"] == pl.String
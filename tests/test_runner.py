@@ -0,0 +1,116 @@
+# Copyright 2026 Eliot Courtney.
+import shlex
+import sys
+from pathlib import Path
+
+import pytest
+
+from memernaex.benchmark.pool import LauncherPool
+from memernaex.benchmark.runner import Job, Program, Rna, make_record, run_job
+
+# Prints `lines` lines, then sleeps for `sleep` seconds and exits with `code`.
+_STUB = """
+import sys, time
+lines, sleep, code = int(sys.argv[1]), float(sys.argv[2]), int(sys.argv[3])
+for i in range(lines):
+    print(i, flush=True)
+time.sleep(sleep)
+sys.exit(code)
+"""
+
+_PERF_KEYS = {"real_sec", "user_sec", "sys_sec", "maxrss_bytes", "failed"}
+
+
+@pytest.fixture
+def stub(tmp_path: Path) -> Path:
+    path = tmp_path / "stub.py"
+    path.write_text(_STUB)
+    return path
+
+
+def _job(stub: Path, *, sleep: float = 0.0, code: int = 0, **kwargs: object) -> Job:
+    template = f"{shlex.quote(sys.executable)} {shlex.quote(str(stub))} {{length}} {sleep} {code}"
+    return Job(
+        program=Program(name="stub", template=template),
+        rna=Rna(name="rna", seq="GGGAAACCC"),
+        run_idx=0,
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+def test_run_job_counts_output(stub: Path) -> None:
+    result = run_job(_job(stub, count_output=True))
+    assert not result.failed
+    assert result.output_lines == 9
+    assert result.real_sec > 0
+    assert result.maxrss_bytes > 0
+
+
+def test_run_job_nonzero_exit_fails(stub: Path) -> None:
+    assert run_job(_job(stub, code=3)).failed
+
+
+def test_run_job_timeout_kills(stub: Path) -> None:
+    result = run_job(_job(stub, sleep=30.0, timeout=0.5))
+    assert result.failed
+    assert result.real_sec < 10
+
+
+def test_run_job_timeout_kills_wrapped_program() -> None:
+    # The shell's child keeps the output pipe open unless it is killed too.
+    job = Job(
+        program=Program(name="wrapped", template='sh -c "sleep 30; echo x"'),
+        rna=Rna(name="rna", seq="GGGAAACCC"),
+        run_idx=0,
+        count_output=True,
+        timeout=0.5,
+    )
+    result = run_job(job)
+    assert result.failed
+    assert result.real_sec < 10
+
+
+def test_run_job_timeout_after_exit(stub: Path) -> None:
+    # The timeout fires while the finished child may not be reaped yet.
+    result = run_job(_job(stub, timeout=0.001))
+    assert result.real_sec < 10
+
+
+def test_fold_record_schema(stub: Path) -> None:
+    job = _job(stub)
+    record = make_record(job, run_job(job), schema="fold", dataset="ds", fields={"x": "1"})
+    assert set(record) == {"dataset", "program", "name", "length", "run_idx", "x", *_PERF_KEYS}
+    assert record["length"] == 9
+    assert record["program"] == "stub"
+
+
+def test_subopt_record_schema(stub: Path) -> None:
+    job = _job(stub, count_output=True)
+    record = make_record(
+        job, run_job(job), schema="subopt", dataset="ds", fields={"delta": "3"}, samples_path="s"
+    )
+    assert set(record) >= {
+        "package_name",
+        "rna_name",
+        "rna_length",
+        "output_strucs",
+        "samples_path",
+    }
+    assert set(record) >= _PERF_KEYS
+    assert record["output_strucs"] == 9
+    assert record["delta"] == "3"
+
+
+def test_pool_runs_jobs(stub: Path) -> None:
+    with LauncherPool(2) as pool:
+        assert not pool.run(_job(stub, count_output=True)).failed
+        assert pool.run(_job(stub, code=1)).failed
+
+
+def test_pool_replaces_dead_launcher(stub: Path) -> None:
+    with LauncherPool(1) as pool:
+        pool.procs[0].kill()
+        pool.procs[0].wait()
+        with pytest.raises(RuntimeError, match="launcher exited"):
+            pool.run(_job(stub))
+        assert not pool.run(_job(stub)).failed
@@ -0,0 +1,49 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import polars as pl
+
+from memernaex.analysis.data import Var
+from memernaex.analysis.watch import NdjsonTail, follow
+
+_VARS = [Var(id="x", name="X", dtype=pl.Int64)]
+
+
+def test_tail_reads_appended_records(tmp_path: Path) -> None:
+    path = tmp_path / "in.ndjson"
+    path.write_text('{"x": 1}\n')
+    tail = NdjsonTail(path, _VARS)
+    assert tail.read() == (None, False)
+    with path.open("a") as f:
+        f.write('{"x": 2}\n{"x": 3')
+    df, reset = tail.read()
+    assert df is not None
+    assert df["x"].to_list() == [2]
+    assert not reset
+
+
+def test_tail_reset_to_empty_gives_empty_frame(tmp_path: Path) -> None:
+    path = tmp_path / "in.ndjson"
+    path.write_text('{"x": 1}\n')
+    tail = NdjsonTail(path, _VARS)
+    path.write_text("")
+    df, reset = tail.read()
+    assert reset
+    assert df is not None
+    assert df.is_empty()
+    assert df.schema == pl.Schema({"x": pl.Int64})
+
+
+def test_follow_passes_empty_reset(tmp_path: Path) -> None:
+    path = tmp_path / "in.ndjson"
+    path.write_text('{"x": 1}\n')
+    tail = NdjsonTail(path, _VARS)
+    path.write_text("")
+    calls = []
+
+    def update(df: pl.DataFrame, reset: bool) -> None:
+        calls.append((len(df), reset))
+        raise KeyboardInterrupt
+
+    follow(tail, update)
+    assert calls == [(0, True)]
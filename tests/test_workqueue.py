@@ -0,0 +1,27 @@
+# Copyright 2026 Eliot Courtney.
+from pathlib import Path
+
+import pytest
+
+from memernaex.analysis import workqueue
+from memernaex.analysis.workqueue import WorkQueue
+
+_CALL = ("operator:add", (1, 2))
+
+
+def test_task_ids_change_with_code(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    queue = WorkQueue(tmp_path)
+    (task_id,) = queue.submit([_CALL])
+    assert queue.submit([_CALL]) == [task_id]
+    monkeypatch.setattr(workqueue, "_code_fingerprint", lambda _: b"other")
+    assert queue.submit([_CALL]) != [task_id]
+
+
+def test_clear_done_removes_finished_tasks(tmp_path: Path) -> None:
+    queue = WorkQueue(tmp_path)
+    (task_id,) = queue.submit([_CALL])
+    assert queue.work() == 1
+    assert queue.result(task_id) == 3
+    assert queue.clear_done() == 1
+    assert queue.status()["done"] == 0
+    assert not (tmp_path / "tasks" / task_id).exists()